@@ -0,0 +1,89 @@
+# # Bulk file to myCR data format converter
+# 2019/05/06 created by Tom HARA
+import argparse
+import os
+import sys
+
+from fostercauer import __version__, write_mycr
+from fostercauer.bulk import BulkFile, select_networks
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='Bulk2myCRformat.py',
+    usage='Unpack a bulk file (.npz) into myCR data format files.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('input_file', help='specify input filename (.npz)',
+                    action='store', type=str)
+parser.add_argument('output_dir', help='specify output directory, ' +
+                    'receiving "<network name>.txt" files',
+                    action='store', type=str, nargs='?', default=None)
+parser.add_argument('-n', '--name',
+                    help='unpack the networks of this name ' +
+                    '(wildcards allowed, may be repeated). Default: all.',
+                    action='append', type=str, default=None)
+parser.add_argument('-l', '--list',
+                    help='only list the networks',
+                    action='store_true')
+
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def output_name(name, used):
+    """File name of a network unique in used (compared case insensitively
+    as on Windows and macOS), "_2", "_3"... being appended to a name
+    already written.  The name is added to used."""
+    unique = name
+    k = 1
+    while unique.lower() in used:
+        k += 1
+        unique = name + "_" + str(k)
+    used.add(unique.lower())
+    return unique
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    bulk = BulkFile(args.input_file)
+    selected = select_networks(bulk, args.name)
+
+    if args.list:
+        for i in selected:
+            meta = bulk.metadata(i)
+            print("%s\t%s\t%d stages\t%s" %
+                  (meta["name"], meta["topology"] or "-",
+                   bulk.offsets[i+1] - bulk.offsets[i], meta["precision"]))
+        return 0
+    if args.output_dir is None:
+        parser.error("the following arguments are required: output_dir")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    used = set()
+    for i in selected:
+        meta = bulk.metadata(i)
+        c_list, r_list = bulk.network_text(i)
+        header = meta["header"].split("\n") if meta["header"] else []
+        labels = meta["labels"].split("\n") if meta["labels"] else \
+            ("C", "R", "tau")
+        # networks of inputs with the same basename share their name
+        name = output_name(meta["name"], used)
+        if name != meta["name"]:
+            print("%s (network %d) is written as %s.txt" %
+                  (meta["name"], i, name))
+        write_mycr(os.path.join(args.output_dir, name + ".txt"),
+                   c_list, r_list, header=header, labels=labels)
+    print("networks = " + str(len(selected)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
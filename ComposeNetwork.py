@@ -0,0 +1,144 @@
+# # Composition of a thermal path from stacked Cauer / Foster sections
+# 2019/05/06 created by Tom HARA
+import argparse
+import os
+import sys
+
+from fostercauer import __version__, read_mycr, rsum_check, write_mycr
+from fostercauer.cache import add_cache_arguments, cache_from_args
+from fostercauer.compose import Composition
+from fostercauer.convert import DIRECTIONS, method_from_args
+from fostercauer.mycr import result_header
+from fostercauer.verify import add_verify_arguments, format_verify, \
+    verify_conversion, verify_ok
+from fostercauer.zth import add_graph_arguments, draw_zth
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='ComposeNetwork.py',
+    usage='Stack Cauer (or Foster) sections of a thermal path into one ' +
+    'ladder and convert it to a Foster network.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('sections', help='specify section filenames from ' +
+                    'Junction to ambient, "foster:" or "cauer:" before a ' +
+                    'filename sets the network type of that section',
+                    action='store', type=str, nargs='+')
+parser.add_argument('output_file', help='specify output filename ' +
+                    '(Foster network of the path)',
+                    action='store', type=str)
+
+parser.add_argument('-f', '--FosterNetwork',
+                    help='consider sections without "foster:" or ' +
+                    '"cauer:" as Foster networks',
+                    action='store_true')
+parser.add_argument('-C', '--cauer_output',
+                    help='also write the Cauer ladder of the path',
+                    action='store', type=str, default=None)
+parser.add_argument('-r', '--rational_rth',
+                    help='better accuracy but computationally expensive ' +
+                    '(Foster sections)',
+                    action='store_true')
+parser.add_argument('-n', '--numeric',
+                    help='convert Foster sections with the ' +
+                    'floating-point engine',
+                    action='store_true')
+parser.add_argument('-p', '--digits',
+                    help='convert Foster sections with the mpmath engine ' +
+                    'with the given number of significant digits',
+                    action='store', type=int, default=None)
+parser.add_argument('-a', '--adaptive',
+                    help='convert Foster sections with the adaptive ' +
+                    'precision engine',
+                    action='store_true')
+parser.add_argument('-e', '--exact',
+                    help='convert Foster sections in exact rational ' +
+                    'arithmetic (the results of -r, faster)',
+                    action='store_true')
+add_graph_arguments(parser)
+add_cache_arguments(parser)
+add_verify_arguments(parser)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def section_type(section, foster=False):
+    """(filename, foster) of a section argument."""
+    for prefix, value in (("foster:", True), ("cauer:", False)):
+        if section.startswith(prefix):
+            return section[len(prefix):], value
+    return section, foster
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+    method = method_from_args(args)
+    cache = cache_from_args(args)
+
+    composition = Composition(method, args.rational_rth, args.digits or 30,
+                              cache)
+    r_all = list()
+    for section in args.sections:
+        input_file, foster = section_type(section, args.FosterNetwork)
+        c_list, r_list = read_mycr(input_file)
+        hits = cache.hits if cache is not None else 0
+        composition.add_section(c_list, r_list, foster,
+                                os.path.basename(input_file))
+        r_all += list(r_list)
+
+        text = "section %d: %s, %s, stages = %d" % (
+            len(composition), input_file, "foster" if foster else "cauer",
+            len(c_list))
+        if foster and cache is not None:
+            text += ", cache " + ("hit" if cache.hits > hits else "miss")
+        print(text)
+
+    CauerMat = composition.cauer()
+    FosterMat = composition.foster()
+    print("stages = " + str(CauerMat.shape[0]))
+
+    # ## draw Zth curve of the path
+    draw_zth(args, FosterMat[:, 1], FosterMat[:, 2], "OutputCompose_")
+
+    # # Resistance sum value check of the sections and the Foster network
+    Rs_all, Rf_all, ok = rsum_check(r_all, FosterMat[:, 1])
+    print("Rf_all = %g, Rsections_all = %g" % (Rf_all, Rs_all))
+    if not ok:
+        print("Rf_all and Rsections_all don't match, ERROR!!!")
+
+    # # Zth(t) and Z(jw) comparison of the ladder and the Foster network
+    if not args.no_verify:
+        report = verify_conversion(CauerMat[:, 0], CauerMat[:, 1], FosterMat,
+                                   "cauer2foster", round_trip=args.round_trip)
+        print(format_verify(report))
+        if not verify_ok(report, args.tolerance):
+            print("verification error exceeds %g, ERROR!!!" % args.tolerance)
+            ok = False
+
+    # # output results
+    stages = CauerMat.shape[0]
+    write_mycr(args.output_file, FosterMat[:, 0], FosterMat[:, 1],
+               FosterMat[:, 2],
+               header=result_header("Composition results", stages,
+                                    "Cf1 and Rf1") +
+               ["# Sections: " + ", ".join(composition.names)],
+               labels=DIRECTIONS["cauer2foster"][3])
+    if args.cauer_output is not None:
+        write_mycr(args.cauer_output, CauerMat[:, 0], CauerMat[:, 1],
+                   CauerMat[:, 2],
+                   header=result_header("Composition results", stages,
+                                        "Cc1 and Rc1") +
+                   ["# Sections: " + ", ".join(composition.names)],
+                   labels=DIRECTIONS["foster2cauer"][3])
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
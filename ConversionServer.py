@@ -0,0 +1,63 @@
+# # Persistent Foster/Cauer conversion server
+# 2019/05/06 created by Tom HARA
+import argparse
+import sys
+
+from fostercauer import __version__
+from fostercauer.cache import add_cache_arguments, cache_from_args
+from fostercauer.server import ConversionPool, serve_stream, serve_unix
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='ConversionServer.py',
+    usage='Serve Foster/Cauer conversions as JSON lines over stdin/stdout ' +
+    'or a Unix socket.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('--socket',
+                    help='listen on this Unix domain socket ' +
+                    '(default: stdin / stdout)',
+                    action='store', type=str, default=None)
+parser.add_argument('-j', '--workers',
+                    help='number of worker processes ' +
+                    '(default: number of CPUs)',
+                    action='store', type=int, default=None)
+parser.add_argument('--timeout',
+                    help='default time limit of a request [s] ' +
+                    '(default: none)',
+                    action='store', type=float, default=None)
+add_cache_arguments(parser)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    cache = cache_from_args(args)
+    if cache is None:
+        cache_dir, cache_size = None, None
+    else:
+        cache_dir, cache_size = cache.cache_dir, cache.max_bytes
+
+    pool = ConversionPool(args.workers, args.timeout, cache_dir, cache_size)
+    try:
+        if args.socket:
+            print("listening on " + args.socket, file=sys.stderr)
+            serve_unix(pool, args.socket)
+        else:
+            serve_stream(pool, sys.stdin, sys.stdout)
+    finally:
+        pool.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
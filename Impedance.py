@@ -0,0 +1,122 @@
+# # Frequency domain thermal impedance Z(jw)
+# 2019/05/06 created by Tom HARA
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from fostercauer import __version__, read_mycr
+from fostercauer.batch import collect_inputs
+from fostercauer.frequency import freq_grid, impedance_error, \
+    network_impedance, plot_impedance, write_impedance
+from fostercauer.structure import stack_networks
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='Impedance.py',
+    usage='Bode / Nyquist data of the thermal impedance Z(jw) ' +
+    'of Foster or Cauer RC networks.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('input_file', help='specify input filename',
+                    action='store', type=str)
+parser.add_argument('output_file', help='specify output filename ' +
+                    '(.csv or .npz)',
+                    action='store', type=str)
+
+parser.add_argument('-c', '--cauer_input',
+                    help='consider input file as Cauer network. ' +
+                    'Default: Foster Network.',
+                    action='store_true')
+parser.add_argument('-b', '--batch',
+                    help='input_file is a directory, a manifest file ' +
+                    '(one filename per row) or a glob pattern, ' +
+                    'all the networks are evaluated at once',
+                    action='store_true')
+parser.add_argument('--compare',
+                    help='network of the other type (Cauer for Foster ' +
+                    'input and vice versa) to compare Z(jw) with, ' +
+                    'e.g. the conversion result of input_file',
+                    action='store', type=str, default=None)
+parser.add_argument('-t', '--tolerance',
+                    help='largest relative Z(jw) difference of --compare ' +
+                    '(default: 1e-6), exit status is 1 beyond it',
+                    action='store', type=float, default=1e-6)
+parser.add_argument('-g', '--save_graph',
+                    help='save Bode and Nyquist graph images generated ' +
+                    'by matplotlib (.png)',
+                    action='store_true')
+parser.add_argument('-s', '--show_graph',
+                    help='show Bode and Nyquist graph images generated ' +
+                    'by matplotlib (.png)',
+                    action='store_true')
+parser.add_argument('--points',
+                    help='number of frequency points (default: 200)',
+                    action='store', type=int, default=200)
+parser.add_argument('--f_min',
+                    help='start frequency [Hz] (default: a decade below ' +
+                    'the slowest stage)',
+                    action='store', type=float, default=None)
+parser.add_argument('--f_max',
+                    help='end frequency [Hz] (default: a decade above ' +
+                    'the fastest stage)',
+                    action='store', type=float, default=None)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+    foster = not args.cauer_input
+
+    if args.batch:
+        input_files = collect_inputs(args.input_file)
+        if input_files == []:
+            print("no input files: " + args.input_file)
+            return 1
+    else:
+        input_files = [args.input_file]
+
+    c_stack, r_stack = stack_networks([read_mycr(input_file)
+                                       for input_file in input_files])
+    print("networks = " + str(len(input_files)))
+
+    # time constants of Cauer stages are in the same range as Foster ones
+    freq = freq_grid(c_stack * r_stack, args.points, args.f_min, args.f_max)
+    Z = network_impedance(freq, c_stack, r_stack, foster)
+
+    names = [os.path.basename(name) for name in input_files]
+    if args.batch:
+        write_impedance(args.output_file, freq, Z, names)
+    else:
+        write_impedance(args.output_file, freq, Z[0])
+
+    status = 0
+    labels = names
+    if args.compare:
+        c_list, r_list = read_mycr(args.compare)
+        Z_compare = network_impedance(freq, c_list, r_list, not foster)
+        error = float(np.max(impedance_error(Z_compare, Z)))
+        print("max relative Z(jw) difference = %g" % error)
+        if error > args.tolerance:
+            print("the difference exceeds the tolerance %g" % args.tolerance)
+            status = 1
+        Z = np.vstack([Z, Z_compare])
+        labels = names + [os.path.basename(args.compare)]
+
+    if args.save_graph or args.show_graph:
+        plot_impedance(freq, Z, labels, "OutputZjw_", args.save_graph,
+                       args.show_graph)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# # Monte Carlo tolerance analysis of Foster/Cauer conversion
+# 2019/05/06 created by Tom HARA
+import argparse
+import sys
+import time
+
+from fostercauer import __version__, read_mycr
+from fostercauer.convert import DIRECTIONS
+from fostercauer.montecarlo import DISTRIBUTIONS, monte_carlo, write_bands, \
+    write_zth_bands
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='MonteCarlo.py',
+    usage='Percentile bands of the conversion of a network with ' +
+    'tolerances.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('input_file', help='specify input filename',
+                    action='store', type=str)
+parser.add_argument('output_file',
+                    help='CSV file of the percentiles of each converted ' +
+                    'stage',
+                    action='store', type=str)
+
+parser.add_argument('-c', '--cauer_input',
+                    help='consider input file as Cauer network and ' +
+                    'convert to Foster. Default: Foster to Cauer.',
+                    action='store_true')
+parser.add_argument('-N', '--samples', help='number of samples',
+                    action='store', type=int, default=10000)
+parser.add_argument('--c_tol', help='relative tolerance of Cth ' +
+                    '(default: 0.05)',
+                    action='store', type=float, default=0.05)
+parser.add_argument('--r_tol', help='relative tolerance of Rth ' +
+                    '(default: 0.05)',
+                    action='store', type=float, default=0.05)
+parser.add_argument('-d', '--distribution',
+                    help='distribution of the values: the tolerance is ' +
+                    'the standard deviation of normal and lognormal, ' +
+                    'the half width of uniform (default: normal)',
+                    action='store', choices=DISTRIBUTIONS, default='normal')
+parser.add_argument('--seed', help='random seed',
+                    action='store', type=int, default=None)
+parser.add_argument('-p', '--percentiles',
+                    help='comma separated percentiles (default: 5,50,95)',
+                    action='store', type=str, default='5,50,95')
+parser.add_argument('-z', '--zth',
+                    help='also write the percentiles of Zth(t) to this ' +
+                    'CSV file',
+                    action='store', type=str, default=None)
+parser.add_argument('-P', '--power',
+                    help='power [W] of the peak temperature rise ' +
+                    '(default: 1)',
+                    action='store', type=float, default=1.0)
+parser.add_argument('--pulse',
+                    help='pulse length [s] of the peak temperature rise ' +
+                    '(default: steady state)',
+                    action='store', type=float, default=None)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+    direction = "cauer2foster" if args.cauer_input else "foster2cauer"
+    percentiles = [float(p) for p in args.percentiles.split(",")]
+
+    c_list, r_list = read_mycr(args.input_file)
+    print("stages = " + str(len(c_list)))
+
+    time_start = time.perf_counter()
+    result = monte_carlo(c_list, r_list, direction, args.samples,
+                         args.c_tol, args.r_tol, args.distribution,
+                         args.seed, percentiles, power=args.power,
+                         pulse=args.pulse)
+    time_end = time.perf_counter()
+    print("samples = %d, converted = %d, time = %.3f sec" %
+          (args.samples, result["valid"], time_end - time_start))
+    print("peak temperature rise: " +
+          ", ".join("p%g = %.4g K" % (p, v) for p, v
+                    in zip(percentiles, result["peak"])))
+
+    # # output results
+    write_bands(args.output_file, result, DIRECTIONS[direction][3])
+    if args.zth:
+        write_zth_bands(args.zth, result)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
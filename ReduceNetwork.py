@@ -0,0 +1,84 @@
+# # Order reduction of RC networks
+# 2019/05/06 created by Tom HARA
+import argparse
+import sys
+
+from fostercauer import __version__, read_mycr, write_mycr, write_spice
+from fostercauer.convert import DIRECTIONS
+from fostercauer.mycr import result_header
+from fostercauer.reduce import reduce_network
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='ReduceNetwork.py',
+    usage='Reduce Foster/Cauer RC network to fewer stages.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('input_file', help='specify input filename',
+                    action='store', type=str)
+parser.add_argument('output_file', help='specify output filename',
+                    action='store', type=str)
+
+parser.add_argument('-N', '--stages',
+                    help='number of stages of the reduced network',
+                    action='store', type=int, default=None)
+parser.add_argument('-t', '--tolerance',
+                    help='largest Zth error relative to the total Rth, ' +
+                    'the fewest stages within it are searched when -N ' +
+                    'is not given (default: 1e-3)',
+                    action='store', type=float, default=1e-3)
+parser.add_argument('-c', '--cauer_input',
+                    help='consider input file as Cauer network. ' +
+                    'Default: Foster Network.',
+                    action='store_true')
+parser.add_argument('-C', '--cauer_output',
+                    help='write the reduced network as Cauer network. ' +
+                    'Default: Foster Network.',
+                    action='store_true')
+parser.add_argument('--spice',
+                    help='also write the reduced network to this Spice ' +
+                    'SubCircuit file',
+                    action='store', type=str, default=None)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    c_list, r_list = read_mycr(args.input_file)
+    print("stages = " + str(len(c_list)))
+
+    ResultMat, error = reduce_network(c_list, r_list, args.stages,
+                                      args.tolerance, args.cauer_input,
+                                      args.cauer_output)
+    stages = ResultMat.shape[0]
+    print("reduced stages = %d, relative Zth error = %g" % (stages, error))
+    ok = error <= args.tolerance
+    if not ok:
+        print("the error exceeds the tolerance %g, ERROR!!!" % args.tolerance)
+
+    # # output results
+    _, _, first_stage, labels = \
+        DIRECTIONS["foster2cauer" if args.cauer_output else "cauer2foster"]
+    header = result_header("ReduceNetwork results", stages, first_stage)
+    header.append("# Reduced from %s: relative Zth error = %g" %
+                  (args.input_file, error))
+    write_mycr(args.output_file, ResultMat[:, 0], ResultMat[:, 1],
+               ResultMat[:, 2], header=header, labels=labels)
+
+    if args.spice:
+        write_spice(args.spice, ResultMat[:, 0], ResultMat[:, 1],
+                    foster=not args.cauer_output)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,15 @@
 # # Spice SubCircuit format to myCR data format converter
 # 2019/05/06 created by Tom HARA
 import argparse
-import datetime
+import os
+import sys
+
+from fostercauer import __version__, write_mycr
+from fostercauer.spice import read_subckts
+from fostercauer.utils import timestamp
 
 # version of this script
-myVersion = '0.0.01'
+myVersion = __version__
 
 ##############################################################################
 # arg parsing
@@ -18,84 +23,79 @@ parser = argparse.ArgumentParser(
 
 parser.add_argument('input_file', help='specify input filename',
                     action='store', type=str)
-parser.add_argument('output_file', help='specify output filename',
-                    action='store', type=str)
+parser.add_argument('output_file', help='specify output filename ' +
+                    '(a directory when several SubCircuits are extracted)',
+                    action='store', type=str, nargs='?', default=None)
+parser.add_argument('-n', '--name',
+                    help='extract the SubCircuits of this name ' +
+                    '(wildcards allowed, may be repeated). Default: all.',
+                    action='append', type=str, default=None)
+parser.add_argument('-t', '--topology',
+                    help='extract only Foster or Cauer networks',
+                    action='store', choices=['foster', 'cauer'],
+                    default=None)
+parser.add_argument('-l', '--list',
+                    help='only list the RC network SubCircuits',
+                    action='store_true')
 
 parser.add_argument('--version', action='version',
                     version='%(prog)s ' + myVersion)
 
-args = parser.parse_args()
-
-# Input file and output file:
-input_file = args.input_file
-output_file = args.output_file
-
-##############################################################################
 
-"""
-https://stackoverflow.com/questions/13890935/does-pythons-time-time-return-the-local-or-utc-timestamp
-"""
-# time stamp when the script started.
-timestamp = str(datetime.datetime.now()).split('.')[0].replace(":", "-")
-
-with open(input_file, 'r', encoding="utf-8") as fileobj:
-    datastr = fileobj.read()         # read all data from a file
-    adatastr = datastr.rstrip()      # remove the last "\n"
-    datalist = adatastr.split("\n")  # create a list (size: n row * 1 column)
-
-c_list = list()                      # a list for foster network Cth
-r_list = list()                      # a list for foster network Rth
-comment_list = list()                # a list for comment rows
-
-for line in datalist:                # read one row at a time
-    tmplist = line.split()       # split a row into a list
-    # print(tmplist)
-    if tmplist == []:                # skip empty rows
-        continue
-    if tmplist[0][0] == '*':
-        comment_list.append(line)
-        continue
-    if tmplist[0][0:7] == ".SUBCKT":
-        #  Number of Stages = LastNodeNum - 1
-        stages = int(tmplist[3]) - 1
-        print("stages = " + str(stages))
-        continue
-    # start reading actual data
-    if tmplist[0][0] == 'C':
-        c_list.append(float(tmplist[3]))
-    elif tmplist[0][0] == 'R':
-        r_list.append(float(tmplist[3]))
-
-assert len(r_list) == len(c_list), \
-    "error! r_list and c_list has different size!"
-assert len(r_list) == stages,  \
-    "error! r_list size is not equal to # of stages!"
-
-with open(output_file, "w") as fileobj:
-    tmpstring = ""
-    # header
-    tmpstring = "## Spice SubCircuit format to myCR data format\n"
-    fileobj.write(tmpstring)
-    tmpstring = "## Created: " + timestamp + "\n"
-    fileobj.write(tmpstring)
-    tmpstring = "# First stage (C1 and R1) is connected to Junction.\n"
-    fileobj.write(tmpstring)
-    tmpstring = "# Comments from original file:\n"
-    fileobj.write(tmpstring)
-    for comments in comment_list:
-        tmpstring = "# " + comments + "\n"
-        fileobj.write(tmpstring)
-
-    tmpstring = "STAGES=\t" + str(stages) + "\n\n"
-    fileobj.write(tmpstring)
-
-    tmpstring = "# stage" + "\t" + "C" + "\t\t\t" + \
-                "R" + "\t\t\t" + "tau\n"
-    fileobj.write(tmpstring)
-
-    for stageNum, (cval, rval) in enumerate(zip(c_list, r_list), 1):
-        tmpstring = str(stageNum) + "\t" + \
-            str(cval) + "\t" + \
-            str(rval) + "\t" + \
-            str(cval * rval) + "\n"
-        fileobj.write(tmpstring)
+def main(argv=None):
+    args = parser.parse_args(argv)
+    if not args.list and args.output_file is None:
+        parser.error("the following arguments are required: output_file")
+
+    networks = read_subckts(args.input_file, args.name, args.topology)
+    try:
+        return convert_networks(args, networks)
+    except ValueError as err:
+        print(err)
+        return 1
+
+
+def convert_networks(args, networks):
+    """List or write the networks of read_subckts().  Returns the exit
+    status."""
+    if args.list:
+        for name, topology, c_list, _, _ in networks:
+            print("%s\t%s\t%d stages" % (name, topology, len(c_list)))
+        return 0
+
+    # write the first network to output_file, as long as it is the only one
+    first = next(networks, None)
+    if first is None:
+        print("no RC network SubCircuit is found")
+        return 1
+    second = next(networks, None)
+    if second is not None:
+        os.makedirs(args.output_file, exist_ok=True)
+
+    for network in filter(None, [first, second]):
+        write_network(args, network, second is not None)
+    for network in networks:
+        write_network(args, network, True)
+    return 0
+
+
+def write_network(args, network, to_directory):
+    """Write one network of read_subckts() in myCR data format."""
+    name, topology, c_list, r_list, comment_list = network
+    print(name + ": " + topology + " network, stages = " + str(len(c_list)))
+
+    header = ["## Spice SubCircuit format to myCR data format",
+              "## Created: " + timestamp(),
+              "# First stage (C1 and R1) is connected to Junction.",
+              "# SubCircuit " + name + " (" + topology + " network)",
+              "# Comments from original file:"]
+    header += ["# " + comments for comments in comment_list]
+
+    output_file = args.output_file
+    if to_directory:
+        output_file = os.path.join(output_file, name + ".txt")
+    write_mycr(output_file, c_list, r_list, header=header)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# # Structure functions
+# 2019/05/06 created by Tom HARA
+import argparse
+import os
+import sys
+
+from fostercauer import __version__, foster_to_cauer, read_mycr
+from fostercauer.batch import collect_inputs
+from fostercauer.structure import stack_networks, structure_functions, \
+    write_structure
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='StructureFunction.py',
+    usage='Cumulative and differential structure functions ' +
+    'of Cauer RC networks.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('input_file', help='specify input filename',
+                    action='store', type=str)
+parser.add_argument('output_file', help='specify output filename ' +
+                    '(.csv or .npz)',
+                    action='store', type=str)
+
+parser.add_argument('-f', '--foster',
+                    help='input is Foster network, converted to Cauer ' +
+                    'network by the numeric engine first',
+                    action='store_true')
+parser.add_argument('-b', '--batch',
+                    help='input_file is a directory, a manifest file ' +
+                    '(one filename per row) or a glob pattern, ' +
+                    'all the networks are processed at once',
+                    action='store_true')
+parser.add_argument('--points',
+                    help='number of log-spaced Cth points (default: 200)',
+                    action='store', type=int, default=200)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        input_files = collect_inputs(args.input_file)
+        if input_files == []:
+            print("no input files: " + args.input_file)
+            return 1
+    else:
+        input_files = [args.input_file]
+
+    networks = list()
+    for input_file in input_files:
+        c_list, r_list = read_mycr(input_file)
+        if args.foster:
+            CauerMat = foster_to_cauer(c_list, r_list, "numeric")
+            c_list, r_list = CauerMat[:, 0], CauerMat[:, 1]
+        networks.append((c_list, r_list))
+    print("networks = " + str(len(networks)))
+
+    c_stack, r_stack = stack_networks(networks)
+    result = structure_functions(c_stack, r_stack, args.points)
+
+    names = [os.path.basename(name) for name in input_files]
+    write_structure(args.output_file, result, names)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
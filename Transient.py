@@ -0,0 +1,109 @@
+# # Transient junction temperature from a power profile
+# 2019/05/06 created by Tom HARA
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from fostercauer import __version__, cauer_to_foster, read_mycr
+from fostercauer.transient import DEFAULT_CHUNK, ConvolutionSimulator, \
+    FosterSimulator, iter_power_profile, simulate
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='Transient.py',
+    usage='Junction temperature of an RC network under a power profile.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('network_file', help='specify network filename (myCR)',
+                    action='store', type=str)
+parser.add_argument('profile_file',
+                    help='power profile, CSV or .npy of time [s] and ' +
+                    'power [W] (power only with --dt)',
+                    action='store', type=str)
+parser.add_argument('output_file', help='CSV file of time and Tj',
+                    action='store', type=str)
+
+parser.add_argument('-c', '--cauer_input',
+                    help='consider network file as Cauer network, ' +
+                    'converted to Foster network by the numeric engine. ' +
+                    'Default: Foster Network.',
+                    action='store_true')
+parser.add_argument('--dt',
+                    help='sampling interval [s] of a power only profile',
+                    action='store', type=float, default=None)
+parser.add_argument('--ambient',
+                    help='ambient temperature [degC] (default: 25)',
+                    action='store', type=float, default=25.0)
+parser.add_argument('--convolution',
+                    help='FFT convolution with the step response instead ' +
+                    'of the stage by stage update, needs --dt',
+                    action='store_true')
+parser.add_argument('--chunk',
+                    help='profile rows processed at a time ' +
+                    '(default: %d)' % DEFAULT_CHUNK,
+                    action='store', type=int, default=DEFAULT_CHUNK)
+parser.add_argument('--every',
+                    help='write every N-th sample (default: 1)',
+                    action='store', type=int, default=1)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+    if args.convolution and args.dt is None:
+        print("--convolution needs --dt")
+        return 1
+
+    c_list, r_list = read_mycr(args.network_file)
+    print("stages = " + str(len(c_list)))
+    if args.cauer_input:
+        FosterMat = cauer_to_foster(c_list, r_list, "numeric")
+        r_arr, tau_arr = FosterMat[:, 1], FosterMat[:, 2]
+    else:
+        r_arr = r_list.astype(float)
+        tau_arr = c_list.astype(float) * r_arr
+
+    chunk = args.chunk
+    if args.convolution:
+        simulator = ConvolutionSimulator(r_arr, tau_arr, args.dt)
+        # FFT size follows the response length, keep the chunks as long
+        chunk = max(chunk, simulator.length)
+    else:
+        simulator = FosterSimulator(r_arr, tau_arr)
+
+    time_start = time.perf_counter()
+    samples = 0
+    peak = (-np.inf, None)
+    with open(args.output_file, 'w', encoding="utf-8") as fileobj:
+        fileobj.write("t,Tj\n")
+        for tm, Tj in simulate(iter_power_profile(args.profile_file, chunk,
+                                                  args.dt),
+                               simulator, args.ambient):
+            if len(Tj) and np.max(Tj) > peak[0]:
+                k = int(np.argmax(Tj))
+                peak = (Tj[k], tm[k])
+            # every N-th sample of the whole profile
+            first = -samples % args.every
+            np.savetxt(fileobj, np.column_stack([tm, Tj])[first::args.every],
+                       fmt="%.9e", delimiter=",")
+            samples += len(Tj)
+    time_end = time.perf_counter()
+
+    print("samples = %d, time = %.3f sec" % (samples, time_end - time_start))
+    if peak[1] is not None:
+        print("peak Tj = %.6g degC at t = %.6g sec" % peak)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
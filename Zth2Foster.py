@@ -0,0 +1,82 @@
+# # Zth curve to Foster
+# 2019/05/06 created by Tom HARA
+import argparse
+import sys
+
+from fostercauer import __version__, write_mycr
+from fostercauer.fit import fit_error, fit_foster, read_zth_csv
+from fostercauer.mycr import result_header
+from fostercauer.zth import add_graph_arguments, draw_zth
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='Zth2Foster.py',
+    usage='Fit Foster RC network to a measured Zth(t) curve.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('input_file', help='specify input filename ' +
+                    '(CSV of time [s] and Zth [K/W])',
+                    action='store', type=str)
+parser.add_argument('output_file', help='specify output filename',
+                    action='store', type=str)
+
+parser.add_argument('-N', '--stages',
+                    help='maximum number of stages ' +
+                    '(by default, as many as the fit finds)',
+                    action='store', type=int, default=None)
+parser.add_argument('--per_decade',
+                    help='time constants per decade of the fitting grid',
+                    action='store', type=int, default=10)
+parser.add_argument('--tau_min', help='smallest time constant of the grid',
+                    action='store', type=float, default=None)
+parser.add_argument('--tau_max', help='largest time constant of the grid',
+                    action='store', type=float, default=None)
+parser.add_argument('--absolute',
+                    help='minimize the absolute error ' +
+                    '(by default, the error relative to Zth)',
+                    action='store_true')
+parser.add_argument('--no_refine',
+                    help='skip the nonlinear refinement of R and tau',
+                    action='store_true')
+add_graph_arguments(parser)
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    tm, zth = read_zth_csv(args.input_file)
+    print("points = " + str(len(tm)))
+
+    FosterMat = fit_foster(tm, zth, args.stages, args.tau_min, args.tau_max,
+                           args.per_decade, not args.absolute,
+                           not args.no_refine)
+    stages = FosterMat.shape[0]
+    print("stages = " + str(stages))
+
+    rms, worst = fit_error(tm, zth, FosterMat)
+    print("rms error = %g, max error = %g [K/W]" % (rms, worst))
+
+    # ## draw Zth curve of the fitted Foster network
+    draw_zth(args, FosterMat[:, 1], FosterMat[:, 2], "OutputZ2F_")
+
+    # # output results
+    header = result_header("Zth2Foster results", stages, "Cf1 and Rf1")
+    header.append("# Fit to %s: rms error = %g, max error = %g [K/W]" %
+                  (args.input_file, rms, worst))
+    write_mycr(args.output_file, FosterMat[:, 0], FosterMat[:, 1],
+               FosterMat[:, 2], header=header,
+               labels=("C_foster", "R_foster", "tau_foster"))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
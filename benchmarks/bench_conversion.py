@@ -0,0 +1,235 @@
+# # Benchmark of the conversion cost versus number of stages
+# 2019/05/06 created by Tom HARA
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import sympy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fostercauer import __version__, read_mycr, format_mycr  # noqa: E402
+from fostercauer import foster2cauer  # noqa: E402
+from fostercauer.convert import METHODS, convert_network, \
+    write_result  # noqa: E402
+from fostercauer.instrument import PhaseRecorder  # noqa: E402
+from fostercauer.verify import rsum_check  # noqa: E402
+
+# precision modes: (method, rational_rth)
+MODES = {
+    "default": ("symbolic", False),
+    "rational_rth": ("symbolic", True),
+    "numeric": ("numeric", False),
+    "mpmath": ("mpmath", False),
+    "adaptive": ("adaptive", False),
+    "exact": ("exact", False),
+}
+
+# stage orders of the synthetic Foster networks: ascending tau, or
+# shuffled as measured data may come (Cauer ladders keep their order)
+ORDERS = ("sorted", "unsorted")
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='bench_conversion.py',
+    usage='Benchmark conversion cost versus number of stages.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('-N', '--max_stages',
+                    help='largest number of stages (default: 30)',
+                    action='store', type=int, default=30)
+parser.add_argument('--step',
+                    help='step of the number of stages (default: 1)',
+                    action='store', type=int, default=1)
+parser.add_argument('-m', '--modes',
+                    help='comma separated precision modes ' +
+                    '(default: ' + ",".join(MODES) + ')',
+                    action='store', type=str, default=",".join(MODES))
+parser.add_argument('-d', '--directions',
+                    help='comma separated directions ' +
+                    '(default: foster2cauer,cauer2foster)',
+                    action='store', type=str,
+                    default="foster2cauer,cauer2foster")
+parser.add_argument('--orders',
+                    help='comma separated stage orders of the Foster ' +
+                    'networks (default: ' + ",".join(ORDERS) + ')',
+                    action='store', type=str, default=",".join(ORDERS))
+parser.add_argument('-t', '--max_seconds',
+                    help='time limit of a conversion; a mode stops at ' +
+                    'the first number of stages exceeding it (default: 10)',
+                    action='store', type=float, default=10.0)
+parser.add_argument('--digits',
+                    help='digits of the mpmath mode (default: 30)',
+                    action='store', type=int, default=30)
+parser.add_argument('--seed',
+                    help='random seed of the synthetic networks',
+                    action='store', type=int, default=0)
+parser.add_argument('-o', '--output_file',
+                    help='JSON output file (default: stdout)',
+                    action='store', type=str, default=None)
+
+
+def synthetic_foster(stages, rng, tau_min=1e-6, tau_max=1e3):
+    """Foster network with tau spread from tau_min to tau_max [s].
+
+    Values are rounded to 6 significant digits, like measured data.
+    """
+    tau_arr = np.logspace(np.log10(tau_min), np.log10(tau_max), stages)
+    tau_arr *= rng.uniform(0.8, 1.25, stages)
+    r_arr = rng.uniform(0.05, 1.0, stages)
+    c_arr = np.sort(tau_arr) / r_arr
+    return ["%.6e" % c for c in c_arr], ["%.6e" % r for r in r_arr]
+
+
+def synthetic_network(stages, direction, rng, order="sorted"):
+    """Synthetic input network of a direction, the Foster stages in the
+    given order (see ORDERS)."""
+    c_list, r_list = synthetic_foster(stages, rng)
+    if order == "unsorted":
+        index = rng.permutation(stages)
+        c_list = [c_list[i] for i in index]
+        r_list = [r_list[i] for i in index]
+    if direction == "cauer2foster":
+        CauerMat = foster2cauer.foster_to_cauer_numeric(c_list, r_list)
+        c_list = ["%.6e" % c for c in CauerMat[:, 0]]
+        r_list = ["%.6e" % r for r in CauerMat[:, 1]]
+    return c_list, r_list
+
+
+def timed(phases, name, func, *args):
+    """Call func(*args) and record its wall time as phases[name]."""
+    start = time.perf_counter()
+    result = func(*args)
+    phases[name] = time.perf_counter() - start
+    return result
+
+
+def convert_phases(c_list, r_list, direction, method, rational_rth, dps,
+                   phases):
+    """Conversion, recording the time of each phase of the engines."""
+    recorder = PhaseRecorder()
+    ResultMat = convert_network(c_list, r_list, direction, method,
+                                rational_rth, dps, recorder=recorder)
+    for name, total in recorder.summary().items():
+        phases[name] = total["seconds"]
+    return ResultMat
+
+
+def bench_one(stages, direction, mode, dps, seed, workdir, order="sorted"):
+    """Benchmark one conversion, returns a result record."""
+    method, rational_rth = MODES[mode]
+    # same network for every mode (and order)
+    rng = np.random.default_rng([seed, stages])
+    c_list, r_list = synthetic_network(stages, direction, rng, order)
+
+    input_file = os.path.join(workdir, "input.txt")
+    output_file = os.path.join(workdir, "output.txt")
+    with open(input_file, "w") as fileobj:
+        fileobj.write(format_mycr(c_list, r_list))
+
+    phases = dict()
+    start = time.perf_counter()
+    c_list, r_list = timed(phases, "parse", read_mycr, input_file)
+    ResultMat = convert_phases(c_list, r_list, direction, method,
+                               rational_rth, dps, phases)
+    timed(phases, "write", write_result, output_file, ResultMat, direction)
+    total = time.perf_counter() - start
+
+    Rin_all, Rout_all, ok = rsum_check(r_list, ResultMat[:, 1])
+    return {"direction": direction, "mode": mode, "order": order,
+            "stages": stages, "phases": phases, "total": total,
+            "rsum_error": abs(Rin_all - Rout_all), "rsum_ok": ok}
+
+
+def _child(conn, func, args):
+    conn.send(func(*args))
+    conn.close()
+
+
+def run_with_timeout(func, args, timeout):
+    """func(*args) in a child process, None if it exceeds timeout [s].
+
+    Symbolic conversions cannot be interrupted, so the child is killed.
+    """
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_child,
+                                      args=(child_conn, func, args))
+    process.start()
+    child_conn.close()
+    result = parent_conn.recv() if parent_conn.poll(timeout) else None
+    process.terminate()
+    process.join()
+    return result
+
+
+def bench_mode(report, direction, mode, order, args, workdir):
+    """Benchmark a mode for 2...max_stages stages up to the first
+    timeout, the records are added to report."""
+    for stages in range(2, args.max_stages + 1, args.step):
+        record = run_with_timeout(
+            bench_one, (stages, direction, mode, args.digits, args.seed,
+                        workdir, order), args.max_seconds)
+        # the next number of stages would take even longer
+        if record is None:
+            print("%s %s %s %d stages: timeout" %
+                  (direction, mode, order, stages), file=sys.stderr)
+            report["timeouts"].append(
+                {"direction": direction, "mode": mode, "order": order,
+                 "stages": stages})
+            return
+        report["results"].append(record)
+        print("%s %s %s %d stages: %.4g s" %
+              (direction, mode, order, stages, record["total"]),
+              file=sys.stderr)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    report = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "sympy": sympy.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "max_seconds": args.max_seconds,
+        "seed": args.seed,
+        "results": list(),
+        "timeouts": list(),
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for direction in args.directions.split(","):
+            for mode in args.modes.split(","):
+                # e.g. "exact" is Foster to Cauer only
+                if MODES[mode][0] not in METHODS[direction]:
+                    continue
+                for order in args.orders.split(","):
+                    # the order of the Foster stages doesn't change the
+                    # Cauer ladder
+                    if direction == "cauer2foster" and order != "sorted":
+                        continue
+                    bench_mode(report, direction, mode, order, args,
+                               workdir)
+
+    text = json.dumps(report, indent=1)
+    if args.output_file:
+        with open(args.output_file, "w") as fileobj:
+            fileobj.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
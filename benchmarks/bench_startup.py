@@ -0,0 +1,88 @@
+# # Benchmark of the start-up time of the scripts
+# 2019/05/06 created by Tom HARA
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (script, flags); "{input}" and "{output}" are replaced
+CASES = {
+    "python": (None, ["-c", "pass"]),
+    "import_fostercauer": (None, ["-c", "import fostercauer"]),
+    "foster2cauer_numeric": ("Foster2Cauer.py", ["-n"]),
+    "foster2cauer_default": ("Foster2Cauer.py", []),
+    "cauer2foster_numeric": ("Cauer2Foster.py", ["-n"]),
+    "cauer2foster_numeric_graph": ("Cauer2Foster.py", ["-n", "-g"]),
+    "mycr2spice": ("myCRformat2Spice.py", []),
+}
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='bench_startup.py',
+    usage='Benchmark the start-up time of the scripts.',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('-n', '--repeat',
+                    help='runs of each case (default: 5)',
+                    action='store', type=int, default=5)
+parser.add_argument('-o', '--output_file',
+                    help='JSON output file (default: stdout)',
+                    action='store', type=str, default=None)
+
+
+def run_case(script, flags, workdir):
+    """Wall time of one run of a script on input.txt."""
+    command = [sys.executable]
+    if script is None:
+        command += flags
+    else:
+        command += [os.path.join(ROOT, script)] + flags + \
+            [os.path.join(ROOT, "input.txt"),
+             os.path.join(workdir, "output.txt")]
+
+    start = time.perf_counter()
+    subprocess.run(command, cwd=workdir, check=True,
+                   stdout=subprocess.DEVNULL,
+                   env=dict(os.environ, PYTHONPATH=ROOT))
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    report = {"python": platform.python_version(),
+              "platform": platform.platform(),
+              "repeat": args.repeat,
+              "results": dict()}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (script, flags) in CASES.items():
+            times = [run_case(script, flags, workdir)
+                     for _ in range(args.repeat)]
+            report["results"][name] = {"median": statistics.median(times),
+                                       "min": min(times)}
+            print("%s: %.3f s" % (name, statistics.median(times)),
+                  file=sys.stderr)
+
+    text = json.dumps(report, indent=1)
+    if args.output_file:
+        with open(args.output_file, "w") as fileobj:
+            fileobj.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Foster to Cauer / Cauer to Foster conversion tools.
+
+The input and output networks are arrays of Cth and Rth of each stage,
+first stage is connected to Junction.
+"""
+from .foster2cauer import foster_to_cauer
+from .cauer2foster import cauer_to_foster
+from .mycr import parse_mycr, read_mycr, iter_mycr, format_mycr, write_mycr
+from .spice import parse_spice, read_spice, format_spice, write_spice, \
+    iter_subckts, read_subckts
+from .verify import rsum_check
+from .zth import time_grid, zth_foster
+
+__version__ = '0.0.02'
+
+__all__ = [
+    'foster_to_cauer', 'cauer_to_foster',
+    'parse_mycr', 'read_mycr', 'iter_mycr', 'format_mycr', 'write_mycr',
+    'parse_spice', 'read_spice', 'format_spice', 'write_spice',
+    'iter_subckts', 'read_subckts',
+    'rsum_check',
+    'time_grid', 'zth_foster',
+]
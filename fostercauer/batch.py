@@ -0,0 +1,188 @@
+# # Batch conversion of many myCR files with a process pool
+# 2019/05/06 created by Tom HARA
+import csv
+import glob
+import os
+import time
+
+from .cache import ConversionCache
+from .convert import convert_file
+from .verify import verify_ok
+
+SUMMARY_FIELDS = ["input_file", "output_file", "status", "stages",
+                  "Rin_all", "Rout_all", "rsum_ok", "zth_rel", "zjw_rel",
+                  "stage_rel", "verify_ok", "cache", "seconds"]
+
+# ConversionCache of a worker process, created by its first job
+_worker_cache = None
+
+
+def collect_inputs(source):
+    """List the input files of a batch.
+
+    source is a directory (every file in it), a manifest file (one input
+    filename per row, "#" rows are comments, relative names are relative
+    to the manifest) or a glob pattern.
+    """
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name)
+                      for name in os.listdir(source)
+                      if os.path.isfile(os.path.join(source, name)))
+
+    if os.path.isfile(source):
+        base = os.path.dirname(source)
+        input_files = list()
+        with open(source, 'r', encoding="utf-8") as fileobj:
+            for line in fileobj:
+                line = line.strip()
+                if line == "" or line[0] == '#':
+                    continue
+                input_files.append(os.path.join(base, line))
+        return input_files
+
+    return sorted(glob.glob(source))
+
+
+def _convert_job(job):
+    """Worker side of run_batch(); never raises."""
+    global _worker_cache
+    (input_file, output_file, direction, method, rational_rth, dps,
+     cache_dir, cache_size, verify, round_trip, tolerance) = job
+    result = dict.fromkeys(SUMMARY_FIELDS, "")
+    result["input_file"] = input_file
+    result["output_file"] = output_file
+
+    cache = None
+    if cache_size:
+        if _worker_cache is None or _worker_cache.cache_dir != cache_dir:
+            _worker_cache = ConversionCache(cache_dir, cache_size)
+        cache = _worker_cache
+        hits = cache.hits
+
+    start = time.perf_counter()
+    try:
+        ResultMat, Rin_all, Rout_all, ok, report = \
+            convert_file(input_file, output_file, direction, method,
+                         rational_rth, dps, cache, verify, round_trip)
+    except Exception as err:
+        result["status"] = "error: " + str(err).replace("\n", " ")
+    else:
+        result["status"] = "ok"
+        result["stages"] = ResultMat.shape[0]
+        result["Rin_all"] = Rin_all
+        result["Rout_all"] = Rout_all
+        result["rsum_ok"] = ok
+        if report is not None:
+            for key in ("zth_rel", "zjw_rel", "stage_rel"):
+                if report[key] is not None:
+                    result[key] = report[key]
+            result["verify_ok"] = verify_ok(report, tolerance)
+        if cache is not None:
+            result["cache"] = "hit" if cache.hits > hits else "miss"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(input_files, output_dir, direction, method="symbolic",
+              rational_rth=False, workers=None, chunksize=None, dps=30,
+              cache_dir=None, cache_size=None, verify=True, round_trip=False,
+              tolerance=1e-6):
+    """Convert input_files into output_dir with a pool of processes.
+
+    Each output has the file name of its input.  workers defaults to the
+    number of CPUs; chunksize (files sent to a worker at a time) defaults
+    to about four chunks per worker.  Each worker uses a ConversionCache
+    in cache_dir when cache_size (bytes) is given.  With verify on, each
+    result is checked by verify_conversion() against tolerance.  Returns
+    the list of per-file results (dicts with SUMMARY_FIELDS) in the order
+    of input_files.
+    """
+    names = [os.path.basename(input_file) for input_file in input_files]
+    if len(set(names)) != len(names):
+        raise ValueError("error! input file names are not unique!")
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(input_file, os.path.join(output_dir, name), direction,
+             method, rational_rth, dps, cache_dir, cache_size, verify,
+             round_trip, tolerance)
+            for input_file, name in zip(input_files, names)]
+
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+
+    if workers == 1:
+        return [_convert_job(job) for job in jobs]
+
+    import concurrent.futures
+
+    # sympy and the interpreter start once per worker, not once per file
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(_convert_job, jobs, chunksize=chunksize))
+
+
+def write_summary(summary_file, results):
+    """Write the per-file results of run_batch() as CSV."""
+    with open(summary_file, "w", newline="") as fileobj:
+        writer = csv.DictWriter(fileobj, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def add_batch_arguments(parser):
+    """Batch mode flags shared by Foster2Cauer.py and Cauer2Foster.py."""
+    parser.add_argument('-b', '--batch',
+                        help='batch mode: input_file is a directory, ' +
+                        'a manifest or a glob pattern, and output_file ' +
+                        'is the output directory',
+                        action='store_true')
+    parser.add_argument('-j', '--workers',
+                        help='number of worker processes in batch mode ' +
+                        '(default: number of CPUs)',
+                        action='store', type=int, default=None)
+    parser.add_argument('--chunksize',
+                        help='files sent to a worker at a time ' +
+                        'in batch mode',
+                        action='store', type=int, default=None)
+    parser.add_argument('--summary',
+                        help='summary file of batch mode ' +
+                        '(default: output_dir/summary.csv)',
+                        action='store', type=str, default=None)
+
+
+def batch_main(args, direction, method, cache=None):
+    """Run the batch mode of a script.  Returns the exit status."""
+    input_files = collect_inputs(args.input_file)
+    print("files = " + str(len(input_files)))
+
+    if cache is None:
+        cache_dir, cache_size = None, None
+    else:
+        cache_dir, cache_size = cache.cache_dir, cache.max_bytes
+
+    start = time.perf_counter()
+    results = run_batch(input_files, args.output_file, direction, method,
+                        args.rational_rth, args.workers, args.chunksize,
+                        args.digits or 30, cache_dir, cache_size,
+                        not args.no_verify, args.round_trip, args.tolerance)
+    elapsed = time.perf_counter() - start
+
+    summary_file = args.summary or \
+        os.path.join(args.output_file, "summary.csv")
+    write_summary(summary_file, results)
+
+    failed = [result for result in results if result["status"] != "ok"]
+    mismatch = [result for result in results if result["rsum_ok"] is False]
+    unverified = [result for result in results
+                  if result["verify_ok"] is False]
+    print("converted = %d, failed = %d, Rsum mismatch = %d, " %
+          (len(results) - len(failed), len(failed), len(mismatch)) +
+          "verification error = %d, time = %g s" % (len(unverified), elapsed))
+    if cache is not None:
+        hits = sum(result["cache"] == "hit" for result in results)
+        print("cache hits = %d, misses = %d" %
+              (hits, len(results) - len(failed) - hits))
+    for result in failed:
+        print(result["input_file"] + ": " + result["status"])
+
+    return 1 if failed or mismatch or unverified else 0
@@ -0,0 +1,276 @@
+# # Bulk binary container of many RC networks
+# 2019/05/06 created by Tom HARA
+import fnmatch
+import struct
+import zipfile
+
+import numpy as np
+
+from .convert import DIRECTIONS, convert_network
+from .mycr import iter_mycr_named, result_header
+from .verify import rsum_check, verify_conversion, verify_ok
+
+BULK_VERSION = "1"
+
+# metadata of each network, stored as string arrays
+BULK_FIELDS = ["name", "topology", "source", "precision", "header",
+               "labels"]
+
+
+def _exact_text(values, start):
+    """(positions, strings) of the decimal strings that the float64 repr
+    doesn't give back as they are (e.g. "1.00E-06"), positions counted
+    from start."""
+    values = np.asarray(values)
+    if values.dtype.kind != 'U':
+        return []
+    return [(start + i, v) for i, v in enumerate(values)
+            if v != repr(float(v))]
+
+
+def write_bulk(output_file, records):
+    """Write RC networks to a bulk file (uncompressed NPZ).
+
+    records is an iterable of dicts with "c" and "r" (numbers or decimal
+    strings as read_mycr() returns) and the BULK_FIELDS metadata
+    ("header" being the comment rows and "labels" the column labels, both
+    joined by "\\n"), missing ones are "".
+    Cth and Rth of all the networks are stored as two float64 arrays
+    indexed by "offsets".  Decimal strings other than the float64 repr
+    of their value are also kept as text (at "c_text_pos" / "r_text_pos"
+    of the arrays), so that the round trip to myCR gives the same text.
+    """
+    c_parts = list()
+    r_parts = list()
+    c_text = list()                      # (position, decimal string)
+    r_text = list()
+    meta = {field: list() for field in BULK_FIELDS}
+    offsets = [0]
+
+    for record in records:
+        c_arr = np.asarray(record["c"])
+        r_arr = np.asarray(record["r"])
+        if len(c_arr) != len(r_arr):
+            raise ValueError("error! c and r has different size!")
+        c_parts.append(c_arr.astype(float))
+        r_parts.append(r_arr.astype(float))
+        c_text += _exact_text(c_arr, offsets[-1])
+        r_text += _exact_text(r_arr, offsets[-1])
+        offsets.append(offsets[-1] + len(c_arr))
+        for field in BULK_FIELDS:
+            meta[field].append(str(record.get(field, "")))
+
+    arrays = {"version": np.array(BULK_VERSION),
+              "offsets": np.array(offsets, dtype=np.int64),
+              "c": np.concatenate(c_parts) if c_parts else np.zeros(0),
+              "r": np.concatenate(r_parts) if r_parts else np.zeros(0)}
+    for field in BULK_FIELDS:
+        arrays[field] = np.array(meta[field], dtype=str)
+    for key, text in (("c", c_text), ("r", r_text)):
+        arrays[key + "_text_pos"] = np.array([t[0] for t in text],
+                                             dtype=np.int64)
+        arrays[key + "_text"] = np.array([t[1] for t in text], dtype=str)
+
+    with open(output_file, "wb") as fileobj:
+        np.savez(fileobj, **arrays)
+
+
+def _npz_memmap(path, name):
+    """Memory map an uncompressed member name.npy of an NPZ file."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with open(path, "rb") as fileobj:
+        fileobj.seek(info.header_offset)
+        local = fileobj.read(30)
+        name_len, extra_len = struct.unpack("<HH", local[26:30])
+        fileobj.seek(info.header_offset + 30 + name_len + extra_len)
+        if np.lib.format.read_magic(fileobj) == (1, 0):
+            header = np.lib.format.read_array_header_1_0(fileobj)
+        else:
+            header = np.lib.format.read_array_header_2_0(fileobj)
+        shape, fortran_order, dtype = header
+        offset = fileobj.tell()
+
+    if fortran_order or dtype.hasobject:
+        return None
+    if np.prod(shape) == 0:
+        return np.zeros(shape, dtype)
+    # plain ndarray on the mapped buffer, slicing a memmap is slow
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset,
+                     shape=shape).view(np.ndarray)
+
+
+class BulkFile:
+    """Read access to a bulk file of write_bulk().
+
+    Cth and Rth are memory mapped (mmap=True), so network() returns
+    views into the file without reading the other networks.
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with np.load(path) as npz:
+            self.offsets = npz["offsets"]
+            self.meta = {field: npz[field] for field in BULK_FIELDS}
+            self.text = {key: (npz[key + "_text_pos"], npz[key + "_text"])
+                         for key in ("c", "r")}
+            self.c = _npz_memmap(path, "c") if mmap else None
+            self.r = _npz_memmap(path, "r") if mmap else None
+            if self.c is None or self.r is None:
+                self.c, self.r = npz["c"], npz["r"]
+        self._index = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def index(self, name):
+        """Index of the network of the given name."""
+        if self._index is None:
+            self._index = {name: i for i, name
+                           in enumerate(self.meta["name"].tolist())}
+        return self._index[name]
+
+    def network(self, i):
+        """(c_arr, r_arr) of the i-th network, float views into the file."""
+        start, stop = self.offsets[i], self.offsets[i+1]
+        return self.c[start:stop], self.r[start:stop]
+
+    def network_text(self, i):
+        """(c_arr, r_arr) of the i-th network as decimal strings, as
+        read_mycr() returns them."""
+        start, stop = self.offsets[i], self.offsets[i+1]
+        result = list()
+        for key, values in (("c", self.c), ("r", self.r)):
+            strings = [repr(float(v)) for v in values[start:stop]]
+            pos, text = self.text[key]
+            for k in range(np.searchsorted(pos, start),
+                           np.searchsorted(pos, stop)):
+                strings[pos[k] - start] = str(text[k])
+            result.append(np.array(strings, dtype=str))
+        return tuple(result)
+
+    def metadata(self, i):
+        """Dict of the BULK_FIELDS of the i-th network."""
+        return {field: str(self.meta[field][i]) for field in BULK_FIELDS}
+
+    def records(self, exact=True):
+        """Iterate over the networks as write_bulk() records."""
+        for i in range(len(self)):
+            record = self.metadata(i)
+            if exact:
+                record["c"], record["r"] = self.network_text(i)
+            else:
+                record["c"], record["r"] = self.network(i)
+            yield record
+
+
+def iter_mycr_records(input_file, topology=""):
+    """write_bulk() records of the networks of a myCR file, named as
+    iter_mycr_named() does.
+
+    The comment rows of a network are kept as the header, and the column
+    labels of a "# stage" row as the labels.
+    """
+    for name, c_arr, r_arr, comment_list in iter_mycr_named(input_file):
+        header = list()
+        labels = list()
+        for row in comment_list:
+            tmplist = row.split()
+            if tmplist[:2] == ["#", "stage"] and len(tmplist) == 5:
+                labels = tmplist[2:]
+            else:
+                header.append(row)
+        yield {"name": name, "c": c_arr, "r": r_arr, "topology": topology,
+               "source": input_file, "precision": "text",
+               "header": "\n".join(header), "labels": "\n".join(labels)}
+
+
+def select_networks(bulk, names=None):
+    """Indices of the networks of a BulkFile matching the fnmatch
+    patterns names (all of them by default)."""
+    if names is None:
+        return list(range(len(bulk)))
+    return [i for i, name in enumerate(bulk.meta["name"].tolist())
+            if any(fnmatch.fnmatch(name, pattern) for pattern in names)]
+
+
+def precision_label(method, rational_rth=False, dps=30):
+    """Precision metadata of a conversion result."""
+    if method == "mpmath":
+        return "mpmath %d digits" % dps
+    if method == "symbolic" and rational_rth:
+        return "symbolic rational"
+    return method
+
+
+def convert_bulk(input_file, output_file, direction, method="symbolic",
+                 rational_rth=False, dps=30, cache=None, tolerance=None,
+                 round_trip=False):
+    """Convert every network of a bulk file into another bulk file.
+
+    Networks are read as exact decimal strings, so the results equal the
+    conversion of the myCR files.  A network failing to convert is left
+    out of the output.  When tolerance is given, each result is checked
+    by verify_conversion().  Returns a list of (name, Rin_all, Rout_all,
+    rsum_ok, error message or "", verify_ok or None) of the networks.
+    """
+    bulk = BulkFile(input_file)
+    _, title, first_stage, labels = DIRECTIONS[direction]
+    topology = "cauer" if direction == "foster2cauer" else "foster"
+    precision = precision_label(method, rational_rth, dps)
+    report = list()
+
+    def records():
+        for i in range(len(bulk)):
+            name = str(bulk.meta["name"][i])
+            c_list, r_list = bulk.network_text(i)
+            try:
+                ResultMat = convert_network(c_list, r_list, direction,
+                                            method, rational_rth, dps, cache)
+            except Exception as err:
+                report.append((name, "", "", False,
+                               str(err).replace("\n", " "), None))
+                continue
+            verified = None
+            if tolerance is not None:
+                verified = verify_ok(verify_conversion(c_list, r_list,
+                                                       ResultMat, direction,
+                                                       round_trip=round_trip),
+                                     tolerance)
+            report.append((name,) + rsum_check(r_list, ResultMat[:, 1]) +
+                          ("", verified))
+            yield {"name": name, "c": ResultMat[:, 0], "r": ResultMat[:, 1],
+                   "topology": topology,
+                   "source": input_file + ":" + name,
+                   "precision": precision,
+                   "header": "\n".join(result_header(
+                       title, ResultMat.shape[0], first_stage)),
+                   "labels": "\n".join(labels)}
+
+    write_bulk(output_file, records())
+    return report
+
+
+def bulk_main(args, direction, method, cache=None):
+    """Convert a bulk file from a script (input_file ends with .npz)."""
+    report = convert_bulk(args.input_file, args.output_file, direction,
+                          method, args.rational_rth, args.digits or 30,
+                          cache, None if args.no_verify else args.tolerance,
+                          args.round_trip)
+    failed = [row for row in report if row[4]]
+    mismatch = [row for row in report if not row[4] and not row[3]]
+    unverified = [row for row in report if row[5] is False]
+    for name, _, _, _, message, _ in failed:
+        print(name + ": " + message)
+    for name, Rin_all, Rout_all, _, _, _ in mismatch:
+        print(name + ": Rsum mismatch %g != %g" % (Rin_all, Rout_all))
+    for row in unverified:
+        print(row[0] + ": verification error exceeds %g" % args.tolerance)
+    print("networks = %d, converted = %d, failed = %d, Rsum mismatch = %d, "
+          "verification error = %d" %
+          (len(report), len(report) - len(failed), len(failed),
+           len(mismatch), len(unverified)))
+    return 1 if failed or mismatch or unverified else 0
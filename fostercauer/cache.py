@@ -0,0 +1,173 @@
+# # Content-addressed on-disk cache of conversion results
+# 2019/05/06 created by Tom HARA
+import decimal
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 256 * 2**20     # bytes
+
+
+def default_cache_dir():
+    """$FOSTERCAUER_CACHE_DIR, or ~/.cache/fostercauer."""
+    return os.environ.get("FOSTERCAUER_CACHE_DIR") or \
+        os.path.join(os.path.expanduser("~"), ".cache", "fostercauer")
+
+
+def _normalize(value):
+    """Exact canonical decimal string, "1.00E-06" and "1e-6" agree."""
+    return str(decimal.Decimal(str(value)).normalize())
+
+
+def cache_key(c_list, r_list, direction, method, rational_rth=False,
+              dps=30):
+    """Hash of the normalized input of a conversion."""
+    # only the flags that change the result of the method are hashed
+    if method == "symbolic":
+        mode = "symbolic-rational" if rational_rth else "symbolic"
+    elif method == "exact":
+        mode = "symbolic-rational"       # the same rationals
+    elif method == "mpmath":
+        mode = "mpmath-" + str(dps)
+    else:
+        mode = method
+
+    tmplist = [direction, mode, str(len(c_list))]
+    tmplist += [_normalize(c) for c in c_list]
+    tmplist += [_normalize(r) for r in r_list]
+    return hashlib.sha256("\n".join(tmplist).encode()).hexdigest()
+
+
+class ConversionCache:
+    """Conversion results stored as <key>.npy files in cache_dir.
+
+    The directory is kept below max_bytes by evicting the least recently
+    used entries (the modification time is refreshed on every hit).
+    A small in-memory table in front of the directory makes repeated
+    lookups in the same process free of file access.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_CACHE_SIZE):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = dict()
+        self._size = None                # estimated size of cache_dir
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".npy")
+
+    def get(self, key):
+        """Cached result of key, or None."""
+        if key in self._memory:
+            self.hits += 1
+            return self._memory[key].copy()
+
+        path = self._path(key)
+        try:
+            ResultMat = np.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._memory[key] = ResultMat
+        return ResultMat.copy()
+
+    def put(self, key, ResultMat):
+        """Store a result, evicting old entries when the cache is full."""
+        ResultMat = np.asarray(ResultMat, dtype=float)
+        self._memory[key] = ResultMat.copy()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # write to a temporary file first, other processes may read it
+        fd, tmpname = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fileobj:
+            np.save(fileobj, ResultMat)
+        os.replace(tmpname, self._path(key))
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += os.path.getsize(self._path(key))
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """(path, size, mtime) of each entry in cache_dir."""
+        entries = list()
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".npy"):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((entry.path, stat.st_size,
+                                        stat.st_mtime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def evict(self, target_bytes=None):
+        """Remove least recently used entries down to target_bytes.
+
+        target_bytes defaults to 90% of max_bytes.
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._size <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            key = os.path.basename(path)[:-len(".npy")]
+            self._memory.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        self._memory.clear()
+        self.evict(0)
+
+
+def add_cache_arguments(parser):
+    """Cache flags shared by Foster2Cauer.py and Cauer2Foster.py."""
+    parser.add_argument('--cache',
+                        help='reuse and store conversion results in the ' +
+                        'cache directory DIR (default: ' +
+                        '$FOSTERCAUER_CACHE_DIR or ~/.cache/fostercauer), ' +
+                        'nothing is stored without it; removing the ' +
+                        'directory cleans the cache up',
+                        action='store', nargs='?', const='', default=None,
+                        metavar='DIR', type=str)
+    parser.add_argument('--clear_cache',
+                        help='remove every cached result (of the --cache ' +
+                        'directory) before converting',
+                        action='store_true')
+    parser.add_argument('--cache_size',
+                        help='maximum cache size in MB (default: 256)',
+                        action='store', type=float, default=None)
+
+
+def cache_from_args(args):
+    """ConversionCache selected by --cache, or None (the default)."""
+    if args.cache is None and not args.clear_cache:
+        return None
+    max_bytes = DEFAULT_CACHE_SIZE if args.cache_size is None else \
+        int(args.cache_size * 2**20)
+    cache = ConversionCache(args.cache or None, max_bytes)
+    if args.clear_cache:
+        cache.clear()
+    if args.cache is None:
+        return None
+    return cache
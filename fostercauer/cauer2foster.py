@@ -0,0 +1,242 @@
+# # Cauer to Foster
+# 2019/05/06 created by Tom HARA
+import numpy as np
+
+from .foster2cauer import to_float
+from .instrument import NULL_RECORDER, matrix_bits, poly_size
+
+
+def cauer_to_foster(c_list, r_list, method="symbolic", rational_rth=False,
+                    dps=30, recorder=NULL_RECORDER):
+    """Convert a Cauer RC network to a Foster RC network.
+
+    c_list and r_list hold Cth and Rth of each Cauer stage (numbers or
+    decimal strings), first stage is connected to Junction.
+    method is "symbolic" (sympy.solve, O(exp(n))), "numeric" (floating
+    point eigenvalues), "mpmath" (eigenvalues with dps significant digits)
+    or "adaptive" (float, escalating the digits until the result passes
+    the checks).  rational_rth gives better accuracy to the symbolic
+    method but is extremely expensive (strongly not recommended).
+    recorder (a PhaseRecorder) records the phases of the conversion.
+
+    Returns FosterMat, a (stages, 3) array of C, R and tau of each stage
+    in ascending order of tau.
+    """
+    if method == "numeric":
+        return cauer_to_foster_numeric(c_list, r_list, recorder)
+    if method == "mpmath":
+        from .precision import cauer_to_foster_mpmath
+        with recorder.phase("mpmath"):
+            return cauer_to_foster_mpmath(c_list, r_list, dps)
+    if method == "adaptive":
+        from .precision import cauer_to_foster_adaptive
+        with recorder.phase("adaptive") as record:
+            FosterMat, record["digits"], record["error"] = \
+                cauer_to_foster_adaptive(c_list, r_list)
+        return FosterMat
+    if method == "symbolic":
+        return cauer_to_foster_symbolic(c_list, r_list, rational_rth,
+                                        recorder)
+    raise ValueError("unknown method: " + str(method))
+
+
+##############################################################################
+# Numeric engine
+##############################################################################
+def cauer_to_foster_numeric(c_list, r_list, recorder=NULL_RECORDER):
+    """Cauer to Foster conversion by a symmetric tridiagonal eigenproblem.
+
+    The Cauer ladder seen from Junction is e1^T (sC + G)^-1 e1, where G is
+    the tridiagonal conductance matrix.  With K = C^-1/2 G C^-1/2 = Q L Q^T
+    the impedance becomes sum_i (Q[0, i]^2 / Cc_1) / (s + L_i), so that
+    tau_i = 1/L_i and Cf_i = Cc_1 / Q[0, i]^2.
+    """
+    c_c = np.array(c_list, dtype=float)
+    r_c = np.array(r_list, dtype=float)
+    stages = len(c_c)
+
+    # conductance matrix: Rc_i connects node i and i+1 (ambient after last)
+    g = 1 / r_c
+    G = np.diag(g)
+    G[1:, 1:] += np.diag(g[:-1])
+    G[np.arange(1, stages), np.arange(stages - 1)] = -g[:-1]
+    G[np.arange(stages - 1), np.arange(1, stages)] = -g[:-1]
+
+    d = 1 / np.sqrt(c_c)
+    with recorder.phase("eigh"):
+        eigvals, eigvecs = np.linalg.eigh(G * np.outer(d, d))
+
+    FosterMat = np.zeros((stages, 3))
+    FosterMat[:, 0] = c_c[0] / eigvecs[0]**2
+    FosterMat[:, 2] = 1 / eigvals
+    FosterMat[:, 1] = FosterMat[:, 2] / FosterMat[:, 0]
+
+    # ascending tau, same as the symbolic engine
+    return FosterMat[::-1].copy()
+
+
+def cauer_to_foster_batch(c_arr, r_arr):
+    """cauer_to_foster_numeric() of many networks of the same stages.
+
+    c_arr and r_arr are (networks, stages) arrays, the eigenproblems are
+    solved as one stack.  Returns (networks, stages, 3) array of C, R and
+    tau in ascending order of tau.
+    """
+    c_c = np.asarray(c_arr, dtype=float)
+    r_c = np.asarray(r_arr, dtype=float)
+    stages = c_c.shape[-1]
+
+    g = 1 / r_c
+    G = g[..., :, None] * np.eye(stages)
+    G[..., 1:, 1:] += g[..., :-1, None] * np.eye(stages - 1)
+    G[..., np.arange(1, stages), np.arange(stages - 1)] = -g[..., :-1]
+    G[..., np.arange(stages - 1), np.arange(1, stages)] = -g[..., :-1]
+
+    d = 1 / np.sqrt(c_c)
+    eigvals, eigvecs = np.linalg.eigh(G * d[..., :, None] * d[..., None, :])
+
+    FosterMat = np.zeros(c_c.shape + (3,))
+    FosterMat[..., 0] = c_c[..., :1] / eigvecs[..., 0, :]**2
+    FosterMat[..., 2] = 1 / eigvals
+    FosterMat[..., 1] = FosterMat[..., 2] / FosterMat[..., 0]
+
+    # ascending tau, same as the symbolic engine
+    return FosterMat[..., ::-1, :].copy()
+
+
+##############################################################################
+# Symbolic engine
+# sympy is imported on first use, it dominates the start-up time.
+##############################################################################
+def cauer_to_foster_symbolic(c_list, r_list, rational_rth=False,
+                             recorder=NULL_RECORDER):
+    """Cauer to Foster conversion by sympy.solve on the denominator."""
+    CauerMat, aMatCauer, bMatCauer = \
+        cauer_matrices(c_list, r_list, rational_rth, recorder)
+    pc, qc = cauer_polys(aMatCauer, bMatCauer, recorder)
+    rootVector = cauer_roots(qc, recorder)
+    FosterMat = foster_stages(pc, qc, rootVector, recorder)
+    with recorder.phase("float"):
+        return to_float(FosterMat)
+
+
+def cauer_matrices(c_list, r_list, rational_rth=False,
+                   recorder=NULL_RECORDER):
+    """CauerMat and the coefficient matrices aMatCauer, bMatCauer."""
+    import sympy
+
+    stages = len(c_list)
+
+    with recorder.phase("setup"):
+        CauerMat = sympy.zeros(stages, 3)    # Input data will be stored here
+
+        for i in range(stages):
+            CauerMat[i, 0] = sympy.Rational(str(c_list[i]))
+
+            # By default, reduced the accuracy level by not Rationalizing Rth.
+            CauerMat[i, 1] = \
+                sympy.Rational(str(r_list[i])) if rational_rth \
+                else sympy.Float(str(r_list[i]))
+
+            CauerMat[i, 2] = CauerMat[i, 0] * CauerMat[i, 1]
+
+    # ### Variables line up in ascending order.
+    # Cf1 and Rf1 pair represents the first stage of the Foster model.
+    # They are next to Junction.
+    # So as the Cc1 and Rc1 of the Cauer model.
+
+    # # CauerMatrix
+    # This is a faster way to calculate the coeffcients of pc and qc
+    # in higher stages.
+
+    with recorder.phase("recursion") as record:
+        aMatCauer = sympy.zeros(stages, stages+1)
+        bMatCauer = sympy.zeros(stages+1, stages+1)
+
+        aMatCauer[0, 1] = CauerMat[stages-1, 1]
+        bMatCauer[0, 1] = 1
+        bMatCauer[1, 1] = CauerMat[stages-1, 2]
+
+        for i in range(2, stages+1):
+            aMatCauer[:i, i] = \
+                CauerMat[stages - i, 1] * bMatCauer[:i, i-1] + \
+                aMatCauer[:i-1, i-1].row_insert(i-1, sympy.Matrix([0]))
+
+            bMatCauer[:i+1, i] = \
+                CauerMat[stages - i, 2] * \
+                bMatCauer[:i, i-1].row_insert(0, sympy.Matrix([0])) + \
+                bMatCauer[:i, i-1].row_insert(i, sympy.Matrix([0])) + \
+                CauerMat[stages - i, 0] * \
+                aMatCauer[:i-1, i-1].\
+                row_insert(i-1,
+                           sympy.Matrix([0])).row_insert(0,
+                                                         sympy.Matrix([0]))
+
+        if recorder.enabled:
+            record["coeff_bits"] = max(matrix_bits(aMatCauer),
+                                       matrix_bits(bMatCauer))
+
+    return CauerMat, aMatCauer, bMatCauer
+
+
+def cauer_polys(aMatCauer, bMatCauer, recorder=NULL_RECORDER):
+    """Numerator pc and denominator qc of the Cauer impedance."""
+    import sympy
+    s = sympy.Symbol('s')
+
+    stages = aMatCauer.shape[0]
+
+    with recorder.phase("poly") as record:
+        svector4Coeff_a = sympy.Matrix(stages, 1, lambda i, j: s**i)
+        svector4Coeff_b = sympy.Matrix(stages+1, 1, lambda i, j: s**i)
+
+        pc = sympy.Poly(
+            sympy.transpose(aMatCauer.col(stages)).dot(svector4Coeff_a), s)
+        qc = sympy.Poly(
+            sympy.transpose(bMatCauer.col(stages)).dot(svector4Coeff_b), s)
+        if recorder.enabled:
+            record.update(poly_size(pc, "p_"))
+            record.update(poly_size(qc, "q_"))
+    return pc, qc
+
+
+def cauer_roots(qc, recorder=NULL_RECORDER):
+    """Roots of qc, the poles of the Foster network."""
+    import sympy
+    s = sympy.Symbol('s')
+
+    with recorder.phase("solve") as record:
+        rootVector = sympy.solve(qc, s)
+        if recorder.enabled:
+            record["roots"] = len(rootVector)
+            record["ops"] = int(sympy.count_ops(rootVector))
+    return rootVector
+
+
+def foster_stages(pc, qc, rootVector, recorder=NULL_RECORDER):
+    """FosterMat from the residues of pc/qc at each root."""
+    import sympy
+    s = sympy.Symbol('s')
+
+    stages = len(rootVector)
+
+    FosterMat = sympy.zeros(stages, 3)    # Final results will be stored here.
+
+    for i in range(stages):
+        with recorder.phase("residue", i+1) as record:
+            # Tau_i is 1/abs(root_i)
+            FosterMat[i, 2] = \
+                sympy.re((1/abs(rootVector[i])).simplify().together())
+            # C_i can be calculated by reciprocal of pc/ (d(qc)/ds) |s=root_i,
+            # from reference papers.
+            FosterMat[i, 0] = \
+                sympy.re((1/(pc/sympy.diff(qc, s)).
+                          subs(s, rootVector[i])).simplify().together())
+            # R_i can be yielded from Tau_i and C_i
+            FosterMat[i, 1] = \
+                sympy.re((FosterMat[i, 2]/FosterMat[i, 0]).
+                         simplify().together())
+            if recorder.enabled:
+                record["ops"] = int(sympy.count_ops(FosterMat[i, :]))
+
+    return FosterMat
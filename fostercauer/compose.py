@@ -0,0 +1,89 @@
+# # Composition of a thermal path from stacked sections
+# 2019/05/06 created by Tom HARA
+import numpy as np
+
+from .cauer2foster import cauer_to_foster_numeric
+from .convert import convert_network
+
+
+class Composition:
+    """A thermal path of sections stacked from Junction to ambient, e.g.
+    die, package, TIM and heatsink.
+
+    Cauer ladders chain physically, so the ladder of the path is the
+    concatenation of the ladders of its sections.  A Foster section is
+    converted to Cauer first by convert_network() (method, rational_rth,
+    dps, and cache: a ConversionCache or None), a Cauer section is taken
+    as it is.  The ladder of each section is kept, so replacing a section
+    converts only that section; the Foster network of the whole path is
+    computed from the concatenated ladder by the numeric engine.
+    conversions counts the section conversions done so far (cache hits
+    included).
+    """
+
+    def __init__(self, method="symbolic", rational_rth=False, dps=30,
+                 cache=None):
+        self.method = method
+        self.rational_rth = rational_rth
+        self.dps = dps
+        self.cache = cache
+        self.conversions = 0
+        self.names = list()
+        self._ladders = list()           # CauerMat of each section
+        self._cauer = None
+        self._foster = None
+
+    def __len__(self):
+        return len(self._ladders)
+
+    def _ladder(self, c_list, r_list, foster):
+        if len(c_list) != len(r_list):
+            raise ValueError("error! c_list and r_list has different size!")
+        if len(c_list) == 0:
+            raise ValueError("error! the section has no stages!")
+        if not foster:
+            c_arr = np.asarray(c_list, dtype=float)
+            r_arr = np.asarray(r_list, dtype=float)
+            return np.column_stack([c_arr, r_arr, c_arr * r_arr])
+        self.conversions += 1
+        return convert_network(c_list, r_list, "foster2cauer", self.method,
+                               self.rational_rth, self.dps, self.cache)
+
+    def add_section(self, c_list, r_list, foster=False, name=""):
+        """Add a section after the last one (farthest from Junction)."""
+        self._ladders.append(self._ladder(c_list, r_list, foster))
+        self.names.append(name)
+        self._cauer = self._foster = None
+
+    def set_section(self, i, c_list, r_list, foster=False, name=None):
+        """Replace section i (first section is 0), the others are kept."""
+        self._ladders[i] = self._ladder(c_list, r_list, foster)
+        if name is not None:
+            self.names[i] = name
+        self._cauer = self._foster = None
+
+    def section(self, i):
+        """Cauer ladder of section i, (stages, 3) array of C, R and tau."""
+        return self._ladders[i]
+
+    def offsets(self):
+        """First stage of each section in the ladder of the path, and the
+        number of stages at the end."""
+        return np.cumsum([0] + [len(ladder) for ladder in self._ladders])
+
+    def cauer(self):
+        """Cauer ladder of the path, (stages, 3) array of C, R and tau."""
+        if len(self) == 0:
+            raise ValueError("error! no section is given!")
+        if self._cauer is None:
+            self._cauer = np.vstack(self._ladders)
+        return self._cauer
+
+    def foster(self):
+        """Foster network of the path, (stages, 3) array of C, R and tau
+        as cauer_to_foster() returns."""
+        if self._foster is None:
+            CauerMat = self.cauer()
+            self._foster = cauer_to_foster_numeric(CauerMat[:, 0],
+                                                   CauerMat[:, 1])
+        return self._foster
@@ -0,0 +1,236 @@
+# # File level conversion shared by the scripts and the batch mode
+# 2019/05/06 created by Tom HARA
+import argparse
+
+import numpy as np
+
+from .cache import add_cache_arguments, cache_from_args, cache_key
+from .foster2cauer import foster_to_cauer
+from .cauer2foster import cauer_to_foster
+from .instrument import NULL_RECORDER, PhaseRecorder, \
+    add_instrument_arguments, profiling, recorder_from_args, \
+    write_instrument
+from .mycr import read_mycr, write_mycr, result_header
+from .verify import add_verify_arguments, format_verify, rsum_check, \
+    verify_conversion, verify_ok
+from .zth import add_graph_arguments, draw_zth
+
+# direction: (converter, title, first stage, column labels)
+DIRECTIONS = {
+    "foster2cauer": (foster_to_cauer, "Foster2Cauer results",
+                     "Cc1 and Rc1", ("C_cauer", "R_cauer", "Tau_cauer")),
+    "cauer2foster": (cauer_to_foster, "Cauer2Foster results",
+                     "Cf1 and Rf1", ("C_foster", "R_foster", "tau_foster")),
+}
+
+
+# conversion methods of each direction
+METHODS = {
+    "foster2cauer": ("symbolic", "numeric", "mpmath", "adaptive", "exact"),
+    "cauer2foster": ("symbolic", "numeric", "mpmath", "adaptive"),
+}
+
+
+def method_from_args(args):
+    """Conversion method selected by the flags of a script."""
+    if getattr(args, "exact", False):
+        return "exact"
+    if args.adaptive:
+        return "adaptive"
+    if args.digits:
+        return "mpmath"
+    if args.numeric:
+        return "numeric"
+    return "symbolic"
+
+
+def convert_network(c_list, r_list, direction, method="symbolic",
+                    rational_rth=False, dps=30, cache=None,
+                    recorder=NULL_RECORDER):
+    """Convert one network in the given direction, see DIRECTIONS.
+
+    When a ConversionCache is given, the result is looked up there before
+    computing and stored there afterwards.  recorder (a PhaseRecorder)
+    records the phases of the conversion.
+    """
+    if cache is not None:
+        key = cache_key(c_list, r_list, direction, method, rational_rth,
+                        dps)
+        ResultMat = cache.get(key)
+        if ResultMat is not None:
+            return ResultMat
+
+    converter = DIRECTIONS[direction][0]
+    ResultMat = converter(c_list, r_list, method, rational_rth, dps,
+                          recorder)
+
+    if cache is not None:
+        cache.put(key, ResultMat)
+    return ResultMat
+
+
+def write_result(output_file, ResultMat, direction):
+    """Write a conversion result with the standard header."""
+    _, title, first_stage, labels = DIRECTIONS[direction]
+    write_mycr(output_file, ResultMat[:, 0], ResultMat[:, 1],
+               ResultMat[:, 2],
+               header=result_header(title, ResultMat.shape[0],
+                                    first_stage),
+               labels=labels)
+
+
+def convert_file(input_file, output_file, direction, method="symbolic",
+                 rational_rth=False, dps=30, cache=None, verify=False,
+                 round_trip=False):
+    """Read, convert, check and write one myCR file.
+
+    With verify on, the result is also compared with the input by
+    verify_conversion().  Returns (ResultMat, Rin_all, Rout_all, rsum_ok,
+    verification report or None).
+    """
+    c_list, r_list = read_mycr(input_file)
+    ResultMat = convert_network(c_list, r_list, direction, method,
+                                rational_rth, dps, cache)
+    Rin_all, Rout_all, ok = rsum_check(r_list, ResultMat[:, 1])
+    report = None
+    if verify:
+        report = verify_conversion(c_list, r_list, ResultMat, direction,
+                                   round_trip=round_trip)
+    write_result(output_file, ResultMat, direction)
+    return ResultMat, Rin_all, Rout_all, ok, report
+
+
+##############################################################################
+# Scripts
+##############################################################################
+def script_parser(prog, usage, direction, rational_help, numeric_help,
+                  version):
+    """Argument parser of Foster2Cauer.py and Cauer2Foster.py, the flags
+    of the methods of direction (see METHODS)."""
+    from .batch import add_batch_arguments
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        usage=usage,
+        epilog='end',
+        add_help=True
+        )
+
+    parser.add_argument('input_file', help='specify input filename ' +
+                        '(.npz for a bulk file of many networks)',
+                        action='store', type=str)
+    parser.add_argument('output_file', help='specify output filename',
+                        action='store', type=str)
+
+    parser.add_argument('-r', '--rational_rth', help=rational_help,
+                        action='store_true')
+    parser.add_argument('-n', '--numeric', help=numeric_help,
+                        action='store_true')
+    parser.add_argument('-p', '--digits',
+                        help='use the mpmath engine with the given number ' +
+                        'of significant digits',
+                        action='store', type=int, default=None)
+    parser.add_argument('-a', '--adaptive',
+                        help='use the floating-point engine and escalate ' +
+                        'the digits of the mpmath engine until the result ' +
+                        'passes the Rsum and impedance checks',
+                        action='store_true')
+    if "exact" in METHODS[direction]:
+        parser.add_argument('-e', '--exact',
+                            help='exact rational arithmetic on integer ' +
+                            'polynomials, the results of -r much faster',
+                            action='store_true')
+    parser.add_argument('-x', '--cross_check',
+                        help='run both the numeric and the symbolic ' +
+                        'engine and report the largest relative difference',
+                        action='store_true')
+    add_graph_arguments(parser)
+    add_batch_arguments(parser)
+    add_cache_arguments(parser)
+    add_instrument_arguments(parser)
+    add_verify_arguments(parser)
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + version)
+    return parser
+
+
+def script_main(args, direction):
+    """main() of Foster2Cauer.py and Cauer2Foster.py: convert the myCR
+    file, the bulk file (.npz) or with --batch the files of input_file in
+    the given direction.  Returns the exit status."""
+    from .batch import batch_main
+    from .bulk import bulk_main
+
+    method = method_from_args(args)
+    cache = cache_from_args(args)
+    recorder = recorder_from_args(args)
+
+    if args.batch:
+        return batch_main(args, direction, method, cache)
+    if args.input_file.endswith(".npz"):
+        return bulk_main(args, direction, method, cache)
+
+    c_list, r_list = read_mycr(args.input_file)
+    print("stages = " + str(len(c_list)))
+
+    if method == "adaptive":
+        # the digits and the error are reported from the adaptive phase,
+        # which a cache hit would skip
+        cache = None
+        if not recorder.enabled:
+            recorder = PhaseRecorder()
+    with profiling(args.profile):
+        if args.cross_check:
+            converter = DIRECTIONS[direction][0]
+            ResultMat_numeric = converter(c_list, r_list, "numeric",
+                                          recorder=recorder)
+            ResultMat = converter(c_list, r_list, "symbolic",
+                                  args.rational_rth, recorder=recorder)
+            rel_diff = np.max(np.abs(ResultMat_numeric - ResultMat) /
+                              np.abs(ResultMat))
+            print("max relative difference (numeric vs symbolic) = %g" %
+                  rel_diff)
+        else:
+            hits = cache.hits if cache is not None else 0
+            ResultMat = convert_network(c_list, r_list, direction, method,
+                                        args.rational_rth, args.digits or 30,
+                                        cache, recorder)
+            if cache is not None:
+                print("cache " + ("hit" if cache.hits > hits else "miss"))
+    if method == "adaptive" and not args.cross_check:
+        for record in recorder.records:
+            if record["phase"] == "adaptive":
+                print("digits = %s, impedance error = %g" %
+                      (record["digits"] or "float", record["error"]))
+    write_instrument(args, recorder)
+
+    # ## draw Zth curve of the Foster network
+    if direction == "foster2cauer":
+        c_arr = c_list.astype(float)
+        r_arr = r_list.astype(float)
+        draw_zth(args, r_arr, c_arr * r_arr, "OutputF2C_")
+    else:
+        draw_zth(args, ResultMat[:, 1], ResultMat[:, 2], "OutputC2F_")
+
+    # # Resistance sum value check
+    Rin_all, Rout_all, ok = rsum_check(r_list, ResultMat[:, 1])
+    if direction == "foster2cauer":
+        Rc_all, Rf_all = Rout_all, Rin_all
+    else:
+        Rc_all, Rf_all = Rin_all, Rout_all
+    print("Rc_all = %g, Rf_all = %g" % (Rc_all, Rf_all))
+    if not ok:
+        print("Rc_all and Rf_all don't match, ERROR!!!")
+
+    # # Zth(t) and Z(jw) comparison of the input and the output networks
+    if not args.no_verify:
+        report = verify_conversion(c_list, r_list, ResultMat, direction,
+                                   round_trip=args.round_trip)
+        print(format_verify(report))
+        if not verify_ok(report, args.tolerance):
+            print("verification error exceeds %g, ERROR!!!" % args.tolerance)
+            ok = False
+
+    # # output results
+    write_result(args.output_file, ResultMat, direction)
+    return 0 if ok else 1
@@ -0,0 +1,152 @@
+# # Exact Foster to Cauer conversion by a fraction-free remainder sequence
+# 2019/05/06 created by Tom HARA
+from fractions import Fraction
+
+import numpy as np
+
+from .instrument import NULL_RECORDER
+
+# big integers of gmpy2 when installed, same results faster
+try:
+    from gmpy2 import gcd as _gcd, mpz as _integer
+except ImportError:
+    from math import gcd as _gcd
+    _integer = int
+
+
+def _content(*polys):
+    """gcd of every coefficient of the polynomials."""
+    return _gcd(*[c for poly in polys for c in poly])
+
+
+def _bits(*polys):
+    return max(int(abs(c)).bit_length() for poly in polys for c in poly)
+
+
+def foster_polys(c_list, r_list):
+    """Integer coefficients (ascending powers of s) of P and Q,
+    Zfall = P / Q = sum_i Rf_i / (1 + s tau_i), as the symbolic engine
+    with rational_rth builds it."""
+    P = [_integer(0)]
+    Q = [_integer(1)]
+    for c, r in zip(c_list, r_list):
+        r = Fraction(str(r))
+        tau = Fraction(str(c)) * r
+        a, b = _integer(tau.numerator), _integer(tau.denominator)
+        u, v = _integer(r.numerator), _integer(r.denominator)
+        # P/Q + (u/v) b / (b + a s), over the common denominator
+        P = _add([v * x for x in _mul_linear(P, b, a)],
+                 [u * b * q for q in Q])
+        Q = [v * x for x in _mul_linear(Q, b, a)]
+        g = _content(P, Q)
+        P = [p // g for p in P]
+        Q = [q // g for q in Q]
+    return _trim(P), _trim(Q)
+
+
+def _mul_linear(poly, b, a):
+    """poly * (b + a s)."""
+    result = [b * p for p in poly] + [_integer(0)]
+    for k, p in enumerate(poly):
+        result[k+1] += a * p
+    return result
+
+
+def _add(x, y):
+    if len(x) < len(y):
+        x, y = y, x
+    return [x[k] + (y[k] if k < len(y) else 0) for k in range(len(x))]
+
+
+def _trim(poly):
+    while len(poly) > 1 and poly[-1] == 0:
+        poly = poly[:-1]
+    return poly
+
+
+def _reduce(F0, F1, divisor):
+    """(lead(F1) F0 - lead(F0) s^d F1) / divisor without its top term,
+    d = deg F0 - deg F1; the division must be exact."""
+    d = len(F0) - len(F1)
+    l0, l1 = F0[-1], F1[-1]
+    result = [l1 * x for x in F0]
+    for k, x in enumerate(F1):
+        result[k+d] -= l0 * x
+    result = result[:-1]
+    if divisor != 1:
+        result = [_exact_div(x, divisor) for x in result]
+    return result
+
+
+def _exact_div(x, divisor):
+    quotient, remainder = divmod(x, divisor)
+    if remainder:
+        raise ValueError("error! inexact division in the remainder " +
+                         "sequence!")
+    return quotient
+
+
+def cauer_fractions(c_list, r_list, recorder=NULL_RECORDER):
+    """Exact Cauer stages of a Foster network, list of (Cc, Rc, tau) as
+    Fractions.
+
+    With Zfall = P / Q, the continued fraction
+        Q / P = s Cc_1 + 1 / (Rc_1 + 1 / (s Cc_2 + ...))
+    is the remainder sequence F_0 = Q, F_1 = P, degrees n, n-1, n-1,
+    n-2, ..., each term removing the top coefficient of the one before
+    the previous:
+        F_k+1 = (lead(F_k) F_k-1 - lead(F_k-1) s^d F_k) / lead(F_k-2)
+    The division by lead(F_k-2) (from k = 3 on) is exact as in the
+    subresultant remainder sequence, so the coefficients stay integers
+    of linearly growing size without any gcd.  The scale of F_k
+    relative to the unscaled sequence is tracked as the Fraction
+    sigma_k, and the continued fraction terms are
+        lead(F_k-1) sigma_k / (sigma_k-1 lead(F_k)),
+    Cc_i for odd k and Rc_i for even k.  The results equal the continued
+    fraction of the symbolic engine with rational_rth, which is unique,
+    so they are the same rationals.
+    """
+    with recorder.phase("setup") as record:
+        P, Q = foster_polys(c_list, r_list)
+        if recorder.enabled:
+            record["coeff_bits"] = _bits(P, Q)
+
+    stages = len(c_list)
+    if len(Q) != stages + 1 or len(P) != stages:
+        raise ValueError("error! the Foster network has repeated " +
+                         "time constants!")
+    F = [Q, P]
+    sigma = [Fraction(1), Fraction(1)]
+    terms = list()
+    for i in range(stages):
+        with recorder.phase("peel", i+1) as record:
+            for k in (2*i + 1, 2*i + 2):
+                terms.append(Fraction(int(F[k-1][-1])) * sigma[k] /
+                             (sigma[k-1] * int(F[k][-1])))
+                if k == 2 * stages:
+                    break
+                divisor = F[k-2][-1] if k >= 3 else 1
+                Fn = _reduce(F[k-1], F[k], divisor)
+                if Fn[-1] == 0:
+                    raise ValueError("error! the Foster network has " +
+                                     "repeated time constants!")
+                F.append(Fn)
+                sigma.append(Fraction(int(F[k][-1])) * sigma[k-1] /
+                             int(divisor))
+                if k >= 2:
+                    F[k-2] = None    # the last three terms are enough
+            if recorder.enabled:
+                record["coeff_bits"] = _bits(F[-1])
+    return [(terms[2*i], terms[2*i+1], terms[2*i] * terms[2*i+1])
+            for i in range(stages)]
+
+
+def foster_to_cauer_exact(c_list, r_list, recorder=NULL_RECORDER):
+    """Foster to Cauer conversion in exact rational arithmetic.
+
+    Same results as the symbolic method with rational_rth, each value
+    rounded once to float.
+    """
+    rows = cauer_fractions(c_list, r_list, recorder)
+    with recorder.phase("float"):
+        return np.array([[float(x) for x in row] for row in rows])
@@ -0,0 +1,213 @@
+# # Foster network fitting from a measured Zth(t) curve
+# 2019/05/06 created by Tom HARA
+import numpy as np
+
+from .zth import zth_foster
+
+
+def read_zth_csv(input_file):
+    """Read a Zth(t) curve: time [s] on the 1st column, Zth [K/W] on the 2nd.
+
+    Columns are separated by commas, semicolons, tabs or spaces.
+    "#" rows and rows which are not numbers (headers) are skipped.
+    Returns (tm, zth) in ascending order of time.
+    """
+    rows = list()
+    with open(input_file, 'r', encoding="utf-8") as fileobj:
+        for line in fileobj:
+            tmplist = line.replace(",", " ").replace(";", " ").split()
+            if tmplist == [] or tmplist[0][0] == '#':
+                continue
+            try:
+                rows.append((float(tmplist[0]), float(tmplist[1])))
+            except (ValueError, IndexError):
+                continue                 # header rows
+
+    if rows == []:
+        raise ValueError("error! no Zth data is found!")
+    data = np.array(rows)
+    data = data[np.argsort(data[:, 0])]
+    return data[:, 0], data[:, 1]
+
+
+def nnls(A, b, tol=None):
+    """Non-negative least squares min ||Ax - b||, x >= 0 (Lawson-Hanson)."""
+    m, n = A.shape
+    if tol is None:
+        tol = 10 * np.finfo(float).eps * np.linalg.norm(A, 1) * max(m, n)
+
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    w = A.T @ (b - A @ x)
+
+    for _ in range(3 * n):
+        if passive.all() or np.max(w[~passive]) <= tol:
+            break
+        passive[np.argmax(np.where(passive, -np.inf, w))] = True
+
+        while True:
+            idx = np.flatnonzero(passive)
+            z = np.zeros(n)
+            z[idx] = np.linalg.lstsq(A[:, idx], b, rcond=None)[0]
+            if np.all(z[idx] > 0):
+                x = z
+                break
+            # step back to the boundary and drop the variables reaching 0
+            neg = idx[z[idx] <= 0]
+            alpha = np.min(x[neg] / (x[neg] - z[neg]))
+            x = x + alpha * (z - x)
+            passive &= x > tol
+            x[~passive] = 0.0
+
+        w = A.T @ (b - A @ x)
+    return x
+
+
+def merge_stages(r_arr, tau_arr, stages=None):
+    """Merge the stages of adjacent time constants.
+
+    Stages on consecutive grid points (r_arr > 0) become one stage of the
+    same total R at the R-weighted geometric mean tau.  When stages is
+    given, the closest pair (in log tau) is merged until there are at most
+    that many stages.  Returns (r_arr, tau_arr) in ascending order of tau.
+    """
+    groups = list()
+    for i in np.flatnonzero(r_arr > 0):
+        if groups and groups[-1][-1] == i - 1:
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+
+    r_list = [np.sum(r_arr[g]) for g in groups]
+    logtau_list = [np.sum(r_arr[g] * np.log(tau_arr[g])) / np.sum(r_arr[g])
+                   for g in groups]
+
+    while stages is not None and len(r_list) > stages:
+        i = int(np.argmin(np.diff(logtau_list)))
+        r_sum = r_list[i] + r_list[i+1]
+        logtau_list[i] = (r_list[i] * logtau_list[i] +
+                          r_list[i+1] * logtau_list[i+1]) / r_sum
+        r_list[i] = r_sum
+        del r_list[i+1], logtau_list[i+1]
+
+    return np.array(r_list), np.exp(logtau_list)
+
+
+def refine_stages(tm, zth, r_arr, tau_arr, weights, iterations=50):
+    """Levenberg-Marquardt refinement of R and tau (in log scale)."""
+    stages = len(r_arr)
+    p = np.concatenate([np.log(r_arr), np.log(tau_arr)])
+
+    def residual(p):
+        return weights * (zth_foster(tm, np.exp(p[:stages]),
+                                     np.exp(p[stages:])) - zth)
+
+    res = residual(p)
+    cost = res @ res
+    lam = 1e-3
+    for _ in range(iterations):
+        r_arr = np.exp(p[:stages])
+        tau_arr = np.exp(p[stages:])
+        decay = np.exp(-tm[None, :] / tau_arr[:, None])
+        # Jacobian of the weighted residual w.r.t. log R and log tau
+        J = np.vstack([r_arr[:, None] * -np.expm1(-tm[None, :] /
+                                                   tau_arr[:, None]),
+                       -r_arr[:, None] * decay * tm[None, :] /
+                       tau_arr[:, None]]).T * weights[:, None]
+        JtJ = J.T @ J
+        g = J.T @ res
+        while True:
+            step = np.linalg.solve(JtJ + lam * np.diag(np.diag(JtJ) + 1e-300),
+                                   -g)
+            new_res = residual(p + step)
+            new_cost = new_res @ new_res
+            if new_cost < cost:
+                p, res, lam = p + step, new_res, lam / 10
+                break
+            lam *= 10
+            if lam > 1e10:
+                break
+        if lam > 1e10 or cost - new_cost < 1e-12 * cost:
+            cost = min(cost, new_cost)
+            break
+        cost = new_cost
+
+    return np.exp(p[:stages]), np.exp(p[stages:])
+
+
+def fit_grid(tm, zth, tau_min=None, tau_max=None, per_decade=10,
+             relative=True, r_total=None):
+    """NNLS step of fit_foster(): R of each time constant of the grid.
+
+    Returns (tm, zth, weights, r_grid, tau_grid), tm, zth and weights
+    being the fitted points (with the steady state point of r_total).
+    """
+    tm = np.asarray(tm, dtype=float)
+    zth = np.asarray(zth, dtype=float)
+    keep = tm > 0
+    tm, zth = tm[keep], zth[keep]
+
+    tau_min = tau_min or tm[0] / 3
+    tau_max = tau_max or tm[-1] * 3
+    tau_grid = np.logspace(np.log10(tau_min), np.log10(tau_max),
+                           int(np.ceil(np.log10(tau_max / tau_min) *
+                                       per_decade)) + 1)
+
+    if relative:
+        weights = 1 / np.maximum(np.abs(zth), 1e-3 * np.max(np.abs(zth)))
+    else:
+        weights = np.ones_like(zth)
+
+    if r_total is not None:
+        # steady state point far beyond the grid, weighted heavily
+        tm = np.append(tm, tau_max * 1e3)
+        zth = np.append(zth, r_total)
+        weights = np.append(weights, 1e3 * np.max(weights))
+
+    A = -np.expm1(-tm[:, None] / tau_grid[None, :]) * weights[:, None]
+    b = zth * weights
+    # same minimizer on the small triangular system, A = QR
+    Q, R = np.linalg.qr(A)
+    r_grid = nnls(R, Q.T @ b)
+    return tm, zth, weights, r_grid, tau_grid
+
+
+def fit_stages(grid, stages=None, refine=True, r_total=None):
+    """Stages of fit_foster() from grid, the result of fit_grid()."""
+    tm, zth, weights, r_grid, tau_grid = grid
+    r_arr, tau_arr = merge_stages(r_grid, tau_grid, stages)
+    if refine:
+        r_arr, tau_arr = refine_stages(tm, zth, r_arr, tau_arr, weights)
+
+    if r_total is not None:
+        r_arr = r_arr * (r_total / np.sum(r_arr))
+
+    order = np.argsort(tau_arr)
+    r_arr, tau_arr = r_arr[order], tau_arr[order]
+    return np.column_stack([tau_arr / r_arr, r_arr, tau_arr])
+
+
+def fit_foster(tm, zth, stages=None, tau_min=None, tau_max=None,
+               per_decade=10, relative=True, refine=True, r_total=None):
+    """Fit a Foster network to a Zth(t) curve.
+
+    NNLS over a log-spaced grid of time constants (per_decade points from
+    tau_min to tau_max, by default the time range of the data widened by
+    3x on both sides), merging of adjacent grid stages, then optionally
+    a Levenberg-Marquardt refinement of R and tau.  stages limits the
+    number of stages.  With relative on, the error is weighted by 1/Zth
+    so that the early (die level) part of the curve is fitted as well.
+    When r_total is given, the total Rth of the network is kept to it.
+
+    Returns FosterMat, a (stages, 3) array of C, R and tau of each stage
+    in ascending order of tau.
+    """
+    grid = fit_grid(tm, zth, tau_min, tau_max, per_decade, relative,
+                    r_total)
+    return fit_stages(grid, stages, refine, r_total)
+
+
+def fit_error(tm, zth, FosterMat):
+    """(rms, max) absolute error of a fitted Foster network [K/W]."""
+    err = zth_foster(tm, FosterMat[:, 1], FosterMat[:, 2]) - zth
+    return float(np.sqrt(np.mean(err**2))), float(np.max(np.abs(err)))
@@ -0,0 +1,342 @@
+# # Foster to Cauer
+# 2019/05/06 created by Tom HARA
+import numpy as np
+
+from .instrument import NULL_RECORDER, matrix_bits, poly_size
+
+
+def foster_to_cauer(c_list, r_list, method="symbolic", rational_rth=False,
+                    dps=30, recorder=NULL_RECORDER):
+    """Convert a Foster RC network to a Cauer RC network.
+
+    c_list and r_list hold Cth and Rth of each Foster stage (numbers or
+    decimal strings), first stage is connected to Junction.
+    method is "symbolic" (sympy continued fraction), "numeric" (floating
+    point, O(n^2)), "mpmath" (same with dps significant digits),
+    "adaptive" (float, escalating the digits until the result passes the
+    checks) or "exact" (integer remainder sequence in rationals).
+    rational_rth gives better accuracy to the symbolic method but is
+    computationally expensive.  "exact" gives the same results as
+    "symbolic" with rational_rth much faster, use it for them; "symbolic"
+    without rational_rth rounds Rth to sympy Floats and is the method for
+    the results of the earlier versions.  recorder (a PhaseRecorder)
+    records the phases of the conversion.
+
+    Returns CauerMat, a (stages, 3) array of C, R and tau of each stage.
+    """
+    if method == "numeric":
+        return foster_to_cauer_numeric(c_list, r_list, recorder)
+    if method == "mpmath":
+        from .precision import foster_to_cauer_mpmath
+        with recorder.phase("mpmath"):
+            return foster_to_cauer_mpmath(c_list, r_list, dps)
+    if method == "adaptive":
+        from .precision import foster_to_cauer_adaptive
+        with recorder.phase("adaptive") as record:
+            CauerMat, record["digits"], record["error"] = \
+                foster_to_cauer_adaptive(c_list, r_list)
+        return CauerMat
+    if method == "exact":
+        from .exact import foster_to_cauer_exact
+        return foster_to_cauer_exact(c_list, r_list, recorder)
+    if method == "symbolic":
+        return foster_to_cauer_symbolic(c_list, r_list, rational_rth,
+                                        recorder)
+    raise ValueError("unknown method: " + str(method))
+
+
+##############################################################################
+# Numeric engine
+##############################################################################
+def rkpw(x, w):
+    """Jacobi matrix from nodes x and weights w (RKPW algorithm).
+
+    Returns (alpha, beta): alpha is the diagonal, beta[0] is sum(w) and
+    beta[k] (k >= 1) is the squared off-diagonal between rows k-1 and k.
+    Numerically stable, O(n^2) Givens-rotation form of the Lanczos process.
+    See W. B. Gragg and W. J. Harrod, Numer. Math. 44 (1984) 317-335.
+    x and w are lists of float or of mpmath.mpf for higher precision.
+    The nodes are fed in descending order (ascending tau): in another
+    order the rounding errors grow by orders of magnitude.
+    """
+    order = sorted(range(len(x)), key=lambda k: x[k], reverse=True)
+    p0 = [x[order[0]]]
+    p1 = [w[order[0]]]
+    for k in order[1:]:
+        rkpw_append(p0, p1, x[k], w[k])
+    return p0, p1
+
+
+def rkpw_append(p0, p1, xlam, pn):
+    """Add node xlam of weight pn to the rkpw() state (p0, p1) in place.
+
+    This is one step of the outer loop of rkpw(), so that the Jacobi
+    matrix can be grown one Foster stage at a time.
+    """
+    zero = 0 * pn
+    p0.append(xlam)
+    p1.append(zero)
+    gam = zero + 1
+    sig = zero
+    t = zero
+    for m in range(len(p0)):
+        rho = p1[m] + pn
+        tmp = gam * rho
+        tsig = sig
+        if rho <= 0:
+            gam = zero + 1
+            sig = zero
+        else:
+            gam = p1[m] / rho
+            sig = pn / rho
+        tk = sig * (p0[m] - xlam) - gam * t
+        p0[m] = p0[m] - (tk - t)
+        t = tk
+        if sig <= 0:
+            pn = tsig * p1[m]
+        else:
+            pn = t**2 / sig
+        p1[m] = tmp
+
+
+def rkpw_batch(x, w):
+    """rkpw() of many networks at once.
+
+    x and w are (n, networks) arrays, the result (alpha, beta) as well.
+    The same recurrence runs on whole rows, branches become np.where();
+    the nodes of each network are sorted in descending order as rkpw()
+    does.
+    """
+    x = np.asarray(x, dtype=float)
+    w = np.asarray(w, dtype=float)
+    order = np.argsort(-x, axis=0, kind="stable")
+    x = np.take_along_axis(x, order, axis=0)
+    w = np.take_along_axis(w, order, axis=0)
+    p0 = x.copy()
+    p1 = np.zeros_like(w)
+    p1[0] = w[0]
+    one = np.ones(x.shape[1:])
+    for k in range(x.shape[0] - 1):
+        pn = w[k+1]
+        gam = one
+        sig = 0 * one
+        t = 0 * one
+        xlam = x[k+1]
+        for m in range(k + 2):
+            rho = p1[m] + pn
+            tmp = gam * rho
+            tsig = sig
+            positive = rho > 0
+            rho = np.where(positive, rho, 1)
+            gam = np.where(positive, p1[m] / rho, 1)
+            sig = np.where(positive, pn / rho, 0)
+            tk = sig * (p0[m] - xlam) - gam * t
+            p0[m] = p0[m] - (tk - t)
+            t = tk
+            positive = sig > 0
+            pn = np.where(positive, t**2 / np.where(positive, sig, 1),
+                          tsig * p1[m])
+            p1[m] = tmp
+    return p0, p1
+
+
+def ladder_from_jacobi(alpha, beta):
+    """Cauer ladder (c_list, r_list) from the Jacobi matrix of rkpw().
+
+    The Jacobi matrix is C^-1/2 G C^-1/2, G being the tridiagonal
+    conductance matrix, so the ladder is read off from Junction to ambient.
+    """
+    stages = len(alpha)
+    c_list = [1 / beta[0]]
+    r_list = list()
+    g_prev = 0 * beta[0]             # conductance 1/Rc of the previous stage
+    for i in range(stages):
+        g = alpha[i] * c_list[i] - g_prev
+        r_list.append(1 / g)
+        if i < stages - 1:
+            c_list.append(g**2 / (c_list[i] * beta[i+1]))
+        g_prev = g
+    return c_list, r_list
+
+
+def foster_to_cauer_numeric(c_list, r_list, recorder=NULL_RECORDER):
+    """Foster to Cauer conversion in floating point, O(n^2).
+
+    The Foster impedance is the Stieltjes sum
+        Zf(s) = sum_i (1/Cf_i) / (s + 1/tau_i)
+    and the Cauer ladder seen from Junction is e1^T (sC + G)^-1 e1.
+    Hence C^-1/2 G C^-1/2 is the Jacobi matrix of the poles 1/tau_i
+    weighted by 1/Cf_i.
+    """
+    c_f = np.array(c_list, dtype=float)
+    r_f = np.array(r_list, dtype=float)
+
+    with recorder.phase("rkpw"):
+        alpha, beta = rkpw((1 / (c_f * r_f)).tolist(), (1 / c_f).tolist())
+    with recorder.phase("ladder"):
+        c_c, r_c = ladder_from_jacobi(alpha, beta)
+
+    CauerMat = np.zeros((len(c_f), 3))
+    CauerMat[:, 0] = c_c
+    CauerMat[:, 1] = r_c
+    # calculate tauc
+    CauerMat[:, 2] = CauerMat[:, 0] * CauerMat[:, 1]
+
+    return CauerMat
+
+
+def foster_to_cauer_batch(c_arr, r_arr):
+    """foster_to_cauer_numeric() of many networks of the same stages.
+
+    c_arr and r_arr are (networks, stages) arrays.
+    Returns (networks, stages, 3) array of C, R and tau.
+    """
+    c_f = np.asarray(c_arr, dtype=float)
+    r_f = np.asarray(r_arr, dtype=float)
+
+    alpha, beta = rkpw_batch((1 / (c_f * r_f)).T, (1 / c_f).T)
+    c_c, r_c = ladder_from_jacobi(alpha, beta)
+
+    CauerMat = np.zeros(c_f.shape + (3,))
+    CauerMat[..., 0] = np.transpose(c_c)
+    CauerMat[..., 1] = np.transpose(r_c)
+    CauerMat[..., 2] = CauerMat[..., 0] * CauerMat[..., 1]
+    return CauerMat
+
+
+##############################################################################
+# Symbolic engine
+# sympy is imported on first use, it dominates the start-up time.
+##############################################################################
+def foster_to_cauer_symbolic(c_list, r_list, rational_rth=False,
+                             recorder=NULL_RECORDER):
+    """Foster to Cauer conversion by the symbolic continued fraction."""
+    FosterMat, aMatFoster, bMatFoster = \
+        foster_matrices(c_list, r_list, rational_rth, recorder)
+    Zfall = foster_zfall(aMatFoster, bMatFoster, recorder)
+    CauerMat = cauer_stages(Zfall, FosterMat.shape[0], recorder)
+    with recorder.phase("float"):
+        return to_float(CauerMat)
+
+
+def foster_matrices(c_list, r_list, rational_rth=False,
+                    recorder=NULL_RECORDER):
+    """FosterMat and the coefficient matrices aMatFoster, bMatFoster."""
+    import sympy
+
+    stages = len(c_list)
+
+    with recorder.phase("setup"):
+        FosterMat = sympy.zeros(stages, 3)   # Input data will be stored here
+
+        for i in range(stages):
+            FosterMat[i, 0] = sympy.Rational(str(c_list[i]))
+
+            # By default, reduced the accuracy level by not Rationalizing Rth.
+            FosterMat[i, 1] = \
+                sympy.Rational(str(r_list[i])) if rational_rth \
+                else sympy.Float(str(r_list[i]))
+
+            FosterMat[i, 2] = FosterMat[i, 0] * FosterMat[i, 1]
+
+    # ### Variables line up in ascending order.
+    # Cc1 and Rc1 pair represents the first stage of the Cauer model.
+    # They are next to Junction.
+    # So as the Cf1 and Rf1 of the Foster model.
+
+    # # FosterMatrix
+    # This is a faster way to calculate the coeffcients of pf and qf,
+    # in higher stages.
+
+    with recorder.phase("recursion") as record:
+        aMatFoster = sympy.zeros(stages, stages+1)
+        bMatFoster = sympy.zeros(stages+1, stages+1)
+
+        aMatFoster[0, 1] = FosterMat[stages-1, 1]
+        bMatFoster[0, 1] = 1
+        bMatFoster[1, 1] = FosterMat[stages-1, 2]
+
+        for i in range(2, stages+1):
+            aMatFoster[:i, i] = \
+                FosterMat[stages - i, 2] * \
+                aMatFoster[:i-1, i-1].row_insert(0, sympy.Matrix([0])) + \
+                aMatFoster[:i-1, i-1].row_insert(i-1, sympy.Matrix([0])) + \
+                FosterMat[stages - i, 1] * bMatFoster[:i, i-1]
+
+            bMatFoster[:i+1, i] = \
+                FosterMat[stages - i, 2] * \
+                bMatFoster[:i, i-1].row_insert(0, sympy.Matrix([0])) + \
+                bMatFoster[:i, i-1].row_insert(i, sympy.Matrix([0]))
+
+        if recorder.enabled:
+            record["coeff_bits"] = max(matrix_bits(aMatFoster),
+                                       matrix_bits(bMatFoster))
+
+    return FosterMat, aMatFoster, bMatFoster
+
+
+def foster_zfall(aMatFoster, bMatFoster, recorder=NULL_RECORDER):
+    """Zfall = pf / qf of the whole Foster network, as a Poly ratio."""
+    import sympy
+    s = sympy.Symbol('s')
+
+    stages = aMatFoster.shape[0]
+
+    with recorder.phase("poly") as record:
+        svector4Coeff_a = sympy.Matrix(stages, 1, lambda i, j: s**i)
+        svector4Coeff_b = sympy.Matrix(stages+1, 1, lambda i, j: s**i)
+
+        pf = sympy.Poly(sympy.transpose(
+            aMatFoster.col(stages)).dot(svector4Coeff_a), s)
+        qf = sympy.Poly(sympy.transpose(
+            bMatFoster.col(stages)).dot(svector4Coeff_b), s)
+        Zfall = pf / qf
+        if recorder.enabled:
+            record.update(poly_size(pf, "p_"))
+            record.update(poly_size(qf, "q_"))
+    return Zfall
+
+
+def cauer_stages(Zfall, stages, recorder=NULL_RECORDER):
+    """Peel the Cauer stages off Zfall, one stage per iteration."""
+    import sympy
+    s = sympy.Symbol('s')
+
+    CauerMat = sympy.zeros(stages, 3)    # Final results will be stored here.
+
+    # # Recursive Foster to Cauer conversion
+    # For details, check
+    #  "20190504_Foster2Cauer3rdOrder_MatrixCalc.ipynb" and
+    #  "20190504_Foster2Cauer3rdOrder_MatrixCalc_recursive_pre.ipynb"
+
+    for i in range(stages):
+        with recorder.phase("peel", i+1) as record:
+            (pf, qf) = sympy.fraction(Zfall)
+            pf = sympy.Poly(pf, s)
+            qf = sympy.Poly(qf, s)
+            CauerMat[i, 0] = qf.nth(stages-i)/pf.nth(stages-1-i)
+
+            Yfall = (1/Zfall - CauerMat[i, 0]*s).cancel()
+            (qf, pf) = sympy.fraction(Yfall)
+            qf = sympy.Poly(qf, s)
+            pf = sympy.Poly(pf, s)
+            CauerMat[i, 1] = pf.nth(stages-1-i)/qf.nth(stages-1-i)
+
+            # calculate tauc
+            CauerMat[i, 2] = CauerMat[i, 0] * CauerMat[i, 1]
+
+            Zfall = (1/Yfall - CauerMat[i, 1]).cancel()
+            if recorder.enabled:
+                record.update(poly_size(pf, "p_"))
+                record.update(poly_size(qf, "q_"))
+
+    return CauerMat
+
+
+def to_float(SympyMat):
+    """Final results in floating values."""
+    Mat_float = np.zeros(SympyMat.shape)
+    for i in range(SympyMat.shape[0]):
+        for j in range(SympyMat.shape[1]):
+            Mat_float[i, j] = float(SympyMat[i, j])
+    return Mat_float
@@ -0,0 +1,158 @@
+# # Frequency domain thermal impedance Z(jw) of Foster and Cauer networks
+# 2019/05/06 created by Tom HARA
+import math
+
+import numpy as np
+
+
+def freq_grid(tau_arr, points=200, f_min=None, f_max=None):
+    """Log-spaced frequency points [Hz] for a Z(jw) curve.
+
+    By default the range covers 1 / (2 pi tau) of every stage with a
+    decade of margin on both sides, rounded to powers of ten.
+    """
+    tau_arr = np.asarray(tau_arr, dtype=float)
+    tau_arr = tau_arr[tau_arr > 0]
+    if f_min is None:
+        f_min = 10**math.floor(math.log10(1 / (2 * math.pi *
+                                               np.max(tau_arr)) / 10))
+    if f_max is None:
+        f_max = 10**math.ceil(math.log10(1 / (2 * math.pi *
+                                              np.min(tau_arr)) * 10))
+    return np.logspace(math.log10(f_min), math.log10(f_max), points)
+
+
+def z_foster(s_arr, r_arr, tau_arr):
+    """Impedance Z(s) = sum_i R_i / (1 + s tau_i) of Foster networks.
+
+    r_arr and tau_arr are of one network (stages,) or of a stack of
+    networks (networks, stages); the result is (len(s_arr),) or
+    (networks, len(s_arr)).  Zero padded stages add nothing.
+    """
+    s_arr = np.asarray(s_arr)
+    r_arr = np.asarray(r_arr, dtype=float)
+    tau_arr = np.asarray(tau_arr, dtype=float)
+    return np.sum(r_arr[..., :, None] /
+                  (1 + s_arr * tau_arr[..., :, None]), axis=-2)
+
+
+def z_cauer(s_arr, c_arr, r_arr):
+    """Impedance Z(s) of Cauer ladders, seen from Junction.
+
+    Backward recursion from ambient over the stages (last axis):
+        Z_i = 1 / (s Cc_i + 1 / (Rc_i + Z_i+1))
+            = (Rc_i + Z_i+1) / (1 + s Cc_i (Rc_i + Z_i+1))
+    evaluated in the second form, which leaves zero padded stages
+    (Cc = Rc = 0) without a division by zero.  Shapes as z_foster().
+    """
+    s_arr = np.asarray(s_arr)
+    c_arr = np.asarray(c_arr, dtype=float)
+    r_arr = np.asarray(r_arr, dtype=float)
+    Z = np.zeros(c_arr.shape[:-1] + s_arr.shape, dtype=(s_arr * 1.0).dtype)
+    for i in range(c_arr.shape[-1] - 1, -1, -1):
+        series = r_arr[..., i, None] + Z
+        Z = series / (1 + s_arr * c_arr[..., i, None] * series)
+    return Z
+
+
+def network_impedance(freq, c_arr, r_arr, foster=True):
+    """Z(jw) at the frequencies freq [Hz] of Foster (foster=True) or Cauer
+    networks given by Cth and Rth, see z_foster() for the shapes."""
+    s_arr = 2j * np.pi * np.asarray(freq, dtype=float)
+    c_arr = np.asarray(c_arr, dtype=float)
+    r_arr = np.asarray(r_arr, dtype=float)
+    if foster:
+        return z_foster(s_arr, r_arr, c_arr * r_arr)
+    return z_cauer(s_arr, c_arr, r_arr)
+
+
+def bode(Z):
+    """(magnitude [K/W], phase [deg]) of Z(jw)."""
+    return np.abs(Z), np.degrees(np.angle(Z))
+
+
+def impedance_error(Z, Z_ref):
+    """Max difference of Z(jw) relative to |Z_ref| (of each network when
+    stacked), the numerical equivalence of two networks."""
+    return np.max(np.abs(Z - Z_ref) / np.abs(Z_ref), axis=-1)
+
+
+def write_impedance(output_file, freq, Z, names=None):
+    """Write Z(jw) of one network (points,) or of a stack (networks,
+    points) as CSV with the columns f, Re, Im, |Z| and phase, preceded by
+    the network name when stacked; or as NPZ (freq, Z, names) when the
+    filename ends with .npz."""
+    Z = np.asarray(Z)
+    if output_file.endswith(".npz"):
+        np.savez(output_file, freq=freq, Z=Z,
+                 names=np.array(names or [], dtype=str))
+        return
+
+    stacked = Z.ndim == 2
+    rows = Z if stacked else Z[None, :]
+    names = names or [str(i + 1) for i in range(len(rows))]
+    magnitude, phase = bode(rows)
+    with open(output_file, 'w', encoding="utf-8") as fileobj:
+        fileobj.write(("network," if stacked else "") +
+                      "f,Re,Im,abs,phase_deg\n")
+        for k, row in enumerate(rows):
+            prefix = names[k] + "," if stacked else ""
+            for j, f in enumerate(freq):
+                fileobj.write(prefix + "%.6e,%.9e,%.9e,%.9e,%.6f\n" %
+                              (f, row[j].real, row[j].imag, magnitude[k, j],
+                               phase[k, j]))
+
+
+def plot_impedance(freq, Z, labels=None, prefix="OutputZjw_",
+                   save_graph=True, show_graph=False, stamp=None):
+    """Bode (magnitude and phase) and Nyquist plots of Z(jw) of one or
+    more networks.
+
+    When save_graph is on, the graphs are saved as
+    prefix + stamp + "_bode.png" and "_nyquist.png".
+    Returns the list of saved filenames.
+    """
+    import matplotlib
+    if not show_graph:
+        # headless backend, no GUI toolkit is loaded
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from .utils import timestamp
+
+    stamp = stamp or timestamp()
+    rows = np.atleast_2d(Z)
+    labels = labels or ["Z" if len(rows) == 1 else "Z_" + str(k + 1)
+                        for k in range(len(rows))]
+    magnitude, phase = bode(rows)
+    saved = list()
+
+    fig, (ax_mag, ax_phase) = plt.subplots(2, 1, sharex=True)
+    for k in range(len(rows)):
+        ax_mag.loglog(freq, magnitude[k], label=labels[k])
+        ax_phase.semilogx(freq, phase[k], label=labels[k])
+    ax_mag.set_ylabel("|Zth|[K/W]")
+    ax_phase.set_ylabel("Phase[deg]")
+    ax_phase.set_xlabel("Frequency[Hz]")
+    ax_mag.legend()
+    if save_graph:
+        filename = prefix + stamp + "_bode.png"
+        fig.savefig(filename)
+        saved.append(filename)
+
+    fig_nyquist = plt.figure()
+    for k in range(len(rows)):
+        # thermal impedance is capacitive, -Im is plotted upward
+        plt.plot(rows[k].real, -rows[k].imag, label=labels[k])
+    plt.xlabel("Re Zth[K/W]")
+    plt.ylabel("-Im Zth[K/W]")
+    plt.axis("equal")
+    plt.legend()
+    if save_graph:
+        filename = prefix + stamp + "_nyquist.png"
+        fig_nyquist.savefig(filename)
+        saved.append(filename)
+
+    if show_graph:
+        plt.show()
+    plt.close("all")
+    return saved
@@ -0,0 +1,204 @@
+# # Incremental conversion of edited or appended stages
+# 2019/05/06 created by Tom HARA
+import bisect
+
+import numpy as np
+
+from .cauer2foster import cauer_roots, cauer_to_foster_numeric, foster_stages
+from .foster2cauer import cauer_stages, foster_zfall, ladder_from_jacobi, \
+    rkpw_append, to_float
+
+
+class IncrementalConverter:
+    """Base of the incremental converters.
+
+    The stages are fed one by one to a recursion whose state after each
+    stage is kept (self._states, in the order of self._order).  When a
+    stage is edited or appended only the recursion from its old or new
+    place in that order (see _place()) on is recomputed, so an edit of
+    the last stage of the order or an append at the end costs one step.
+    recursion_steps counts the steps done so far.
+    """
+
+    def __init__(self, c_list, r_list, method="numeric", rational_rth=False):
+        if len(c_list) != len(r_list):
+            raise ValueError("error! c_list and r_list has different size!")
+        if method not in ("numeric", "symbolic"):
+            raise ValueError("unknown method: " + str(method))
+        self.method = method
+        self.rational_rth = rational_rth
+        self.c_list = list(c_list)
+        self.r_list = list(r_list)
+        self.recursion_steps = 0
+        self._order = list()
+        self._states = list()
+        self._result = None
+        self._update(list(self._initial_order()), 0)
+
+    @property
+    def stages(self):
+        return len(self.c_list)
+
+    def set_stage(self, i, c, r):
+        """Change Cth and Rth of stage i (first stage is 0)."""
+        self.c_list[i] = c
+        self.r_list[i] = r
+        pos = self._order.index(i)
+        order = self._order[:pos] + self._order[pos+1:]
+        place = self._place(order, i)
+        order.insert(place, i)
+        self._update(order, min(pos, place))
+
+    def append_stage(self, c, r):
+        """Add a stage after the last one (farthest from Junction)."""
+        self.c_list.append(c)
+        self.r_list.append(r)
+        order = list(self._order)
+        place = self._place(order, self.stages - 1)
+        order.insert(place, self.stages - 1)
+        self._update(order, place)
+
+    def _update(self, order, start):
+        """Take order, the recursion is kept up to position start."""
+        del self._order[start:], self._states[start:]
+        for k in order[start:]:
+            self._push(k)
+        self._result = None
+
+    def _place(self, order, i):
+        """Position of stage i in order, the order of the other stages:
+        the position of stage i in the stage list by default."""
+        return i
+
+    def result(self):
+        """Conversion result of the current stages, (stages, 3) array of
+        C, R and tau as the non-incremental converters return."""
+        if self._result is None:
+            self._result = self._finish()
+        return self._result
+
+    def _initial_order(self):
+        return range(self.stages)
+
+    def _push(self, i):
+        state = self._states[-1] if self._states else None
+        self._states.append(self._step(state, i))
+        self._order.append(i)
+        self.recursion_steps += 1
+
+    def _sympy_stage(self, i):
+        """C, R and tau of stage i as the symbolic engines build them."""
+        import sympy
+        c = sympy.Rational(str(self.c_list[i]))
+        r = sympy.Rational(str(self.r_list[i])) if self.rational_rth \
+            else sympy.Float(str(self.r_list[i]))
+        return c, r, c * r
+
+
+class IncrementalFosterToCauer(IncrementalConverter):
+    """Foster to Cauer conversion kept up to date while stages change.
+
+    numeric: the rkpw() state (p0, p1) after each Foster stage.  The
+    stages are kept in ascending order of tau as rkpw() takes them, an
+    edited or appended stage goes to its place in that order, so the
+    result equals foster_to_cauer() of the current stages.
+    symbolic: the aMatFoster / bMatFoster columns after each stage; the
+    continued fraction (Zfall, Yfall) depends on every stage and is
+    peeled again by result().  The Foster sum doesn't depend on the
+    order of the stages, so an edited stage goes last and its next edits
+    cost one step (the result differs from foster_to_cauer() only by the
+    rounding of sympy Floats in another order without rational_rth).
+    """
+
+    def _initial_order(self):
+        # same order as foster_to_cauer(): rkpw() in ascending tau, the
+        # symbolic recursion from the last stage
+        if self.method == "numeric":
+            return sorted(range(self.stages), key=self._tau)
+        return range(self.stages - 1, -1, -1)
+
+    def _tau(self, i):
+        return float(self.c_list[i]) * float(self.r_list[i])
+
+    def _place(self, order, i):
+        if self.method == "numeric":
+            return bisect.bisect_right([self._tau(k) for k in order],
+                                       self._tau(i))
+        return len(order)
+
+    def _step(self, state, i):
+        if self.method == "numeric":
+            c = float(self.c_list[i])
+            r = float(self.r_list[i])
+            if state is None:
+                return [1 / (c * r)], [1 / c]
+            p0, p1 = list(state[0]), list(state[1])
+            rkpw_append(p0, p1, 1 / (c * r), 1 / c)
+            return p0, p1
+
+        import sympy
+        _, r, tau = self._sympy_stage(i)
+        if state is None:
+            return sympy.Matrix([r]), sympy.Matrix([1, tau])
+        aCol, bCol = state
+        k = aCol.shape[0]
+        aCol, bCol = \
+            tau * aCol.row_insert(0, sympy.Matrix([0])) + \
+            aCol.row_insert(k, sympy.Matrix([0])) + r * bCol, \
+            tau * bCol.row_insert(0, sympy.Matrix([0])) + \
+            bCol.row_insert(k+1, sympy.Matrix([0]))
+        return aCol, bCol
+
+    def _finish(self):
+        if self.method == "numeric":
+            c_c, r_c = ladder_from_jacobi(*self._states[-1])
+            return np.column_stack([c_c, r_c, np.multiply(c_c, r_c)])
+
+        import sympy
+        aCol, bCol = self._states[-1]
+        stages = self.stages
+        aMatFoster = sympy.zeros(stages, stages+1)
+        bMatFoster = sympy.zeros(stages+1, stages+1)
+        aMatFoster[:, stages] = aCol
+        bMatFoster[:, stages] = bCol
+        Zfall = foster_zfall(aMatFoster, bMatFoster)
+        return to_float(cauer_stages(Zfall, stages))
+
+
+class IncrementalCauerToFoster(IncrementalConverter):
+    """Cauer to Foster conversion kept up to date while stages change.
+
+    symbolic: the impedance seen from Junction is the continued fraction
+        1/(s Cc1 + 1/(Rc1 + 1/(s Cc2 + ... 1/(s Ccn + 1/Rcn))))
+    whose numerator and denominator polynomials are grown from Junction
+    (Wallis recurrence), the pair after each stage is kept.  Editing a
+    stage recomputes the polynomials from it to ambient, appending a
+    stage costs one step; the roots and residues are computed again by
+    result().
+    numeric: the eigenvalues are recomputed by result(), there is no
+    recursion to keep.
+    """
+
+    def _step(self, state, i):
+        if self.method == "numeric":
+            return None
+
+        import sympy
+        s = sympy.Symbol('s')
+        c, r, _ = self._sympy_stage(i)
+        if state is None:
+            # convergents before the first stage: A = 0/1, previous 1/0
+            state = (sympy.Poly(0, s), sympy.Poly(1, s),
+                     sympy.Poly(1, s), sympy.Poly(0, s))
+        A1, B1, A0, B0 = state
+        # term s*Cc_i, then term Rc_i
+        A2 = sympy.Poly(c * s, s) * A1 + A0
+        B2 = sympy.Poly(c * s, s) * B1 + B0
+        return (A2 * r + A1, B2 * r + B1, A2, B2)
+
+    def _finish(self):
+        if self.method == "numeric":
+            return cauer_to_foster_numeric(self.c_list, self.r_list)
+        pc, qc = self._states[-1][:2]
+        rootVector = cauer_roots(qc)
+        return to_float(foster_stages(pc, qc, rootVector))
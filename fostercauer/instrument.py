@@ -0,0 +1,169 @@
+# # Per-phase instrumentation of the conversions
+# 2019/05/06 created by Tom HARA
+import contextlib
+import json
+import time
+import tracemalloc
+
+
+class NullRecorder:
+    """Recorder doing nothing, the default of the engines."""
+
+    enabled = False
+
+    def phase(self, name, stage=None):
+        return contextlib.nullcontext(dict())
+
+
+NULL_RECORDER = NullRecorder()
+
+
+class PhaseRecorder:
+    """Records wall time, peak memory and expression sizes of each phase.
+
+    The engines call "with recorder.phase(name, stage) as record:" around
+    each phase and may add sizes (polynomial degree, coefficient bits...)
+    to record.  With memory on, tracemalloc is started and the peak of
+    the traced memory above the start of the phase is recorded as well
+    (it slows the conversion down noticeably).
+    """
+
+    enabled = True
+
+    def __init__(self, memory=False):
+        self.records = list()
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name, stage=None):
+        record = {"phase": name}
+        if stage is not None:
+            record["stage"] = stage
+        if self.memory:
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["start"] = start - self._origin
+            record["seconds"] = time.perf_counter() - start
+            if self.memory:
+                record["peak_bytes"] = \
+                    tracemalloc.get_traced_memory()[1] - current
+            self.records.append(record)
+
+    def summary(self):
+        """Total seconds (and largest peak_bytes) of each phase name."""
+        totals = dict()
+        for record in self.records:
+            total = totals.setdefault(record["phase"],
+                                      {"seconds": 0.0, "count": 0})
+            total["seconds"] += record["seconds"]
+            total["count"] += 1
+            if "peak_bytes" in record:
+                total["peak_bytes"] = max(total.get("peak_bytes", 0),
+                                          record["peak_bytes"])
+        return totals
+
+    def write_json(self, output_file):
+        """Write the records and the summary as JSON."""
+        with open(output_file, "w") as fileobj:
+            json.dump({"phases": self.records, "summary": self.summary()},
+                      fileobj, indent=1)
+
+    def write_trace(self, output_file):
+        """Write the records in the Trace Event Format (chrome://tracing,
+        Perfetto), sizes as the arguments of each event."""
+        events = list()
+        for record in self.records:
+            name = record["phase"]
+            if "stage" in record:
+                name += " " + str(record["stage"])
+            events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                           "ts": record["start"] * 1e6,
+                           "dur": record["seconds"] * 1e6,
+                           "args": {key: value
+                                    for key, value in record.items()
+                                    if key not in ("phase", "start",
+                                                   "seconds")}})
+        with open(output_file, "w") as fileobj:
+            json.dump({"traceEvents": events}, fileobj)
+
+
+def coeff_bits(value):
+    """Size of a sympy number in bits: numerator/denominator bit length
+    of a Rational, mantissa precision of a Float."""
+    if value.is_Rational:
+        return max(int(value.p).bit_length(), int(value.q).bit_length())
+    if value.is_Float:
+        return value._prec
+    return 0
+
+
+def matrix_bits(matrix):
+    """Largest coeff_bits() of the entries of a sympy Matrix."""
+    return max((coeff_bits(value) for value in matrix), default=0)
+
+
+def poly_size(poly, prefix=""):
+    """Degree and largest coefficient size in bits of a sympy Poly."""
+    return {prefix + "degree": poly.degree(),
+            prefix + "coeff_bits": max((coeff_bits(c)
+                                        for c in poly.all_coeffs()),
+                                       default=0)}
+
+
+@contextlib.contextmanager
+def profiling(output_file=None):
+    """cProfile the block and dump the statistics to output_file."""
+    if output_file is None:
+        yield
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_file)
+
+
+def add_instrument_arguments(parser):
+    """Instrumentation options shared by the conversion scripts."""
+    parser.add_argument('--phases',
+                        help='write the time, expression size (and memory ' +
+                        'with --memory) of each phase and stage to this ' +
+                        'JSON file',
+                        action='store', type=str, default=None)
+    parser.add_argument('--trace',
+                        help='write the phases to this trace file ' +
+                        '(Trace Event Format, for chrome://tracing)',
+                        action='store', type=str, default=None)
+    parser.add_argument('--memory',
+                        help='record the peak memory of each phase ' +
+                        '(tracemalloc, slow)',
+                        action='store_true')
+    parser.add_argument('--profile',
+                        help='dump cProfile statistics of the conversion ' +
+                        'to this file',
+                        action='store', type=str, default=None)
+
+
+def recorder_from_args(args):
+    """PhaseRecorder if --phases or --trace is given, else NULL_RECORDER."""
+    if args.phases or args.trace:
+        return PhaseRecorder(args.memory)
+    return NULL_RECORDER
+
+
+def write_instrument(args, recorder):
+    """Write the outputs of --phases and --trace."""
+    if args.phases:
+        recorder.write_json(args.phases)
+    if args.trace:
+        recorder.write_trace(args.trace)
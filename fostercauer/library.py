@@ -0,0 +1,139 @@
+# # Model library export of many RC networks
+# 2019/05/06 created by Tom HARA
+import os
+import re
+
+from .spice import SPICE_DIALECTS, format_subckt
+from .utils import timestamp
+
+LANGUAGES = ("spice", "veriloga", "modelica")
+
+# output buffer of write_library() [bytes]
+LIBRARY_BUFFER = 1 << 20
+
+MODELICA_ANALOG = "Modelica.Electrical.Analog."
+
+
+def model_name(name, used):
+    """Unique model name of a network in a library.
+
+    Characters other than letters, digits and "_" become "_", a name not
+    starting with a letter gets an "M_" prefix, and "_2", "_3"... are
+    appended to names already in used (compared case insensitively as
+    Spice does).  The new name is added to used.
+    """
+    name = re.sub(r"\W", "_", name, flags=re.ASCII) or "M"
+    if not name[0].isalpha():
+        name = "M_" + name
+    unique = name
+    k = 1
+    while unique.lower() in used:
+        k += 1
+        unique = name + "_" + str(k)
+    used.add(unique.lower())
+    return unique
+
+
+def format_veriloga(name, c_arr, r_arr, foster=False):
+    """Verilog-A module "name" of an RC network (electrical analogy).
+
+    Ports j (Junction) and a (ambient); Cauer capacitors go to ground.
+    """
+    stages = len(c_arr)
+    nodes = ["j"] + ["n" + str(i+1) for i in range(1, stages)] + ["a"]
+    tmplist = ["// " + ("Foster" if foster else "Cauer") + " network, " +
+               "first stage is connected to Junction (j)\n",
+               "module " + name + "(j, a);\n",
+               "  inout j, a;\n",
+               "  electrical j, a;\n"]
+    if stages > 1:
+        tmplist.append("  electrical " + ", ".join(nodes[1:-1]) + ";\n")
+    tmplist.append("  analog begin\n")
+    for i in range(stages):
+        branch = nodes[i] + ", " + nodes[i+1]
+        tmplist.append("    I(" + branch + ") <+ V(" + branch + ") / " +
+                       str(r_arr[i]) + ";\n")
+        if foster:
+            tmplist.append("    I(" + branch + ") <+ " + str(c_arr[i]) +
+                           " * ddt(V(" + branch + "));\n")
+        else:
+            tmplist.append("    I(" + nodes[i] + ") <+ " + str(c_arr[i]) +
+                           " * ddt(V(" + nodes[i] + "));\n")
+    tmplist += ["  end\n", "endmodule\n"]
+    return "".join(tmplist)
+
+
+def format_modelica(name, c_arr, r_arr, foster=False):
+    """Modelica model "name" of an RC network (electrical analogy,
+    Modelica Standard Library), pins j (Junction) and a (ambient)."""
+    stages = len(c_arr)
+    # node i is the n pin of the resistor before it, j and a at the ends
+    nodes = ["j"] + ["R" + str(i) + ".n" for i in range(1, stages)] + ["a"]
+    tmplist = ["  model " + name + ' "' +
+               ("Foster" if foster else "Cauer") +
+               ' network, first stage connected to Junction (j)"\n',
+               "    " + MODELICA_ANALOG + "Interfaces.PositivePin j;\n",
+               "    " + MODELICA_ANALOG + "Interfaces.NegativePin a;\n"]
+    for i in range(stages):
+        tmplist.append("    " + MODELICA_ANALOG + "Basic.Resistor R" +
+                       str(i+1) + "(R=" + str(r_arr[i]) + ");\n")
+        tmplist.append("    " + MODELICA_ANALOG + "Basic.Capacitor C" +
+                       str(i+1) + "(C=" + str(c_arr[i]) + ");\n")
+    if not foster:
+        tmplist.append("    " + MODELICA_ANALOG + "Basic.Ground ground;\n")
+    tmplist.append("  equation\n")
+    for i in range(stages):
+        tmplist.append("    connect(R" + str(i+1) + ".p, " + nodes[i] +
+                       ");\n")
+        tmplist.append("    connect(C" + str(i+1) + ".p, " + nodes[i] +
+                       ");\n")
+        tmplist.append("    connect(C" + str(i+1) + ".n, " +
+                       (nodes[i+1] if foster else "ground.p") + ");\n")
+    tmplist.append("    connect(R" + str(stages) + ".n, a);\n")
+    tmplist.append("  end " + name + ";\n")
+    return "".join(tmplist)
+
+
+def write_library(output_file, networks, language="spice", dialect="spice"):
+    """Write many RC networks into one model library file.
+
+    networks is an iterable of (name, c_arr, r_arr, foster), consumed one
+    network at a time; the text is written through a LIBRARY_BUFFER byte
+    buffer.  Names are made unique by model_name().  language is "spice"
+    (a .lib of SubCircuits in the given dialect, see SPICE_DIALECTS),
+    "veriloga" (modules) or "modelica" (a package named after
+    output_file).  Returns the list of the model names written.
+    """
+    if language not in LANGUAGES:
+        raise ValueError("unknown language: " + str(language))
+    if dialect not in SPICE_DIALECTS:
+        raise ValueError("unknown dialect: " + str(dialect))
+
+    comment = {"spice": "* ", "veriloga": "// ", "modelica": "// "}[language]
+    used = set()
+    names = list()
+    package = None
+    with open(output_file, "w", buffering=LIBRARY_BUFFER) as fileobj:
+        fileobj.write(comment + "RC network model library\n" +
+                      comment + "Created: " + timestamp() + "\n")
+        if language == "veriloga":
+            fileobj.write('`include "disciplines.vams"\n')
+        elif language == "modelica":
+            package = model_name(os.path.splitext(
+                os.path.basename(output_file))[0], set())
+            fileobj.write("package " + package + "\n")
+
+        for name, c_arr, r_arr, foster in networks:
+            name = model_name(name, used)
+            if language == "spice":
+                text = format_subckt(name, c_arr, r_arr, foster, dialect)
+            elif language == "veriloga":
+                text = format_veriloga(name, c_arr, r_arr, foster)
+            else:
+                text = format_modelica(name, c_arr, r_arr, foster)
+            fileobj.write("\n" + text)
+            names.append(name)
+
+        if package is not None:
+            fileobj.write("end " + package + ";\n")
+    return names
@@ -0,0 +1,116 @@
+# # Monte Carlo tolerance analysis of the conversions
+# 2019/05/06 created by Tom HARA
+import numpy as np
+
+from .cauer2foster import cauer_to_foster_batch
+from .foster2cauer import foster_to_cauer_batch
+from .zth import time_grid
+
+DISTRIBUTIONS = ("normal", "uniform", "lognormal")
+
+# converter of each direction, the same (networks, stages) batch engines
+BATCH_CONVERTERS = {"foster2cauer": foster_to_cauer_batch,
+                    "cauer2foster": cauer_to_foster_batch}
+
+
+def sample_network(c_list, r_list, samples, c_tol=0.05, r_tol=0.05,
+                   distribution="normal", seed=None):
+    """Perturbed copies of a network, (samples, stages) arrays of C and R.
+
+    c_tol and r_tol are relative tolerances: the standard deviation of the
+    normal and lognormal (in log scale) distributions, the half width of
+    the uniform one.  Each stage is perturbed independently.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError("unknown distribution: " + str(distribution))
+    rng = np.random.default_rng(seed)
+    result = list()
+    for values, tol in ((c_list, c_tol), (r_list, r_tol)):
+        nominal = np.asarray(values, dtype=float)
+        shape = (samples, len(nominal))
+        if distribution == "normal":
+            factor = 1 + tol * rng.standard_normal(shape)
+        elif distribution == "uniform":
+            factor = 1 + tol * rng.uniform(-1, 1, shape)
+        else:
+            factor = np.exp(tol * rng.standard_normal(shape))
+        result.append(nominal * factor)
+    return tuple(result)
+
+
+def zth_batch(tm, r_arr, tau_arr):
+    """zth_foster() of many Foster networks, (networks, len(tm)) array."""
+    tm = np.asarray(tm, dtype=float)
+    return -np.einsum('ns,nst->nt', r_arr,
+                      np.expm1(-tm[None, None, :] / tau_arr[:, :, None]))
+
+
+def monte_carlo(c_list, r_list, direction, samples=10000, c_tol=0.05,
+                r_tol=0.05, distribution="normal", seed=None,
+                percentiles=(5, 50, 95), tm=None, power=1.0, pulse=None):
+    """Convert perturbed copies of a network with the batch engines.
+
+    Returns a dict of
+      "stages":   (len(percentiles), stages, 3) percentiles of C, R and tau
+                  of each converted stage,
+      "tm", "zth": time points and (len(percentiles), len(tm)) percentiles
+                  of Zth(t),
+      "peak":     percentiles of the temperature rise power * Zth(pulse)
+                  (the steady state power * Rth sum without pulse),
+      "valid":    number of samples converted to a positive network.
+    Samples giving non-finite or non-positive stages are left out.
+    """
+    c_arr, r_arr = sample_network(c_list, r_list, samples, c_tol, r_tol,
+                                  distribution, seed)
+    ResultMat = BATCH_CONVERTERS[direction](c_arr, r_arr)
+    valid = np.all(np.isfinite(ResultMat) & (ResultMat > 0), axis=(1, 2)) & \
+        np.all((c_arr > 0) & (r_arr > 0), axis=1)
+    ResultMat = ResultMat[valid]
+    if len(ResultMat) == 0:
+        raise ValueError("error! no sample is converted!")
+
+    # Zth(t) from the Foster side of each sample
+    if direction == "foster2cauer":
+        r_foster = r_arr[valid]
+        tau_foster = c_arr[valid] * r_foster
+    else:
+        r_foster = ResultMat[:, :, 1]
+        tau_foster = ResultMat[:, :, 2]
+    if tm is None:
+        tm = time_grid(np.median(tau_foster, axis=0))
+    zth = zth_batch(tm, r_foster, tau_foster)
+    if pulse is None:
+        peak = power * np.sum(r_foster, axis=1)
+    else:
+        peak = power * zth_batch([pulse], r_foster, tau_foster)[:, 0]
+
+    return {"percentiles": np.asarray(percentiles, dtype=float),
+            "stages": np.percentile(ResultMat, percentiles, axis=0),
+            "tm": np.asarray(tm, dtype=float),
+            "zth": np.percentile(zth, percentiles, axis=0),
+            "peak": np.percentile(peak, percentiles),
+            "valid": int(np.count_nonzero(valid))}
+
+
+def write_bands(output_file, result, labels=("C", "R", "tau")):
+    """Write the stage percentiles of monte_carlo() as CSV, one row per
+    stage and quantity."""
+    names = ["p%g" % p for p in result["percentiles"]]
+    with open(output_file, 'w', encoding="utf-8") as fileobj:
+        fileobj.write(",".join(["stage", "quantity"] + names) + "\n")
+        for i in range(result["stages"].shape[1]):
+            for k, label in enumerate(labels):
+                fileobj.write(",".join(
+                    [str(i + 1), label] +
+                    ["%.6e" % v for v in result["stages"][:, i, k]]) + "\n")
+
+
+def write_zth_bands(output_file, result):
+    """Write the Zth(t) percentiles of monte_carlo() as CSV."""
+    names = ["p%g" % p for p in result["percentiles"]]
+    with open(output_file, 'w', encoding="utf-8") as fileobj:
+        fileobj.write(",".join(["t"] + names) + "\n")
+        for j, t in enumerate(result["tm"]):
+            fileobj.write(",".join(["%.6e" % t] +
+                                   ["%.6e" % v for v in result["zth"][:, j]])
+                          + "\n")
@@ -0,0 +1,287 @@
+# # myCR data format reader / writer
+# 2019/05/06 created by Tom HARA
+import io
+import os
+import re
+
+import numpy as np
+
+from .utils import timestamp
+
+# characters read at a time by iter_mycr()
+MYCR_CHUNK = 1 << 22
+
+# comment and "STAGES=" rows (with the "\n" before them), the other rows
+# are data
+MYCR_MARKER = re.compile(r"\n[ \t]*(?:#|STAGES)[^\n]*")
+
+# inline comment at the end of a data row
+MYCR_INLINE = re.compile(r"#[^\n]*")
+
+
+class _MyCRParser:
+    """State of iter_mycr() between the chunks of a file."""
+
+    def __init__(self, numeric=False):
+        self.numeric = numeric
+        self.line = 0                    # line number of the chunk start
+        self.text = ""
+        self.counted = (0, 1)            # (offset, line) of line_of()
+        self.comment_list = list()
+        self.block = None                # see _start()
+
+    def line_of(self, offset):
+        """Line number of an offset in the chunk, counted on from the
+        previous call (offsets come in order)."""
+        start, line = self.counted
+        if offset < start:
+            start, line = 0, self.line
+        line += self.text.count("\n", start, offset)
+        self.counted = (offset, line)
+        return line
+
+    def feed(self, text):
+        """Parse the rows of text, starting with a "\n" and ending before
+        one; returns the networks finished in them."""
+        self.text = text
+        self.counted = (0, self.line)
+        done = list()
+        pos = 0
+        for match in MYCR_MARKER.finditer(text):
+            self._data(pos, match.start())
+            row = match.group(0).strip()
+            if row[0] == '#':            # comment rows
+                self.comment_list.append(row)
+            else:                        # "STAGES=" starts a network
+                network = self.finish()
+                if network is not None:
+                    done.append(network)
+                self._start(row, match.start() + 1)
+            pos = match.end()
+        self._data(pos, len(text))
+        self.line += text.count("\n")
+        return done
+
+    def _start(self, row, offset):
+        line = self.line_of(offset)
+        try:
+            stages = int(row[6:].lstrip("= \t").split()[0])
+        except (ValueError, IndexError):
+            stages = 0
+        if stages < 1:
+            raise ValueError("error! line %d: invalid STAGES!" % line)
+        # [stages, line, c pieces, r pieces, rows, comment_list]
+        self.block = [stages, line, list(), list(), 0, None]
+
+    def finish(self):
+        """The network read so far, (c_arr, r_arr, comment_list)."""
+        block = self.block
+        self.block = None
+        if block is None:
+            return None
+        stages, line, c_pieces, r_pieces, rows, comment_list = block
+        if rows != stages:
+            raise ValueError("error! line %d: # of rows is not equal to " %
+                             line + "# of stages!")
+        return (np.concatenate(c_pieces), np.concatenate(r_pieces),
+                comment_list)
+
+    def _data(self, start, stop):
+        """Add the data rows of text[start:stop] to the network."""
+        segment = self.text[start:stop]
+        if '#' in segment:               # drop inline comments, keep lines
+            segment = MYCR_INLINE.sub("", segment)
+        tokens = segment.split()
+        if tokens == []:
+            return
+        block = self.block
+        if block is None:
+            raise ValueError("error! line %d: STAGES is not found!" %
+                             self.line_of(start + len(segment) -
+                                          len(segment.lstrip())))
+        if block[5] is None:             # first rows of the network
+            block[5] = self.comment_list
+            self.comment_list = list()
+
+        # NumPy fast path: every row has the columns of the first one
+        columns = len(segment.lstrip().split("\n", 1)[0].split())
+        arrays = None
+        if columns >= 3 and len(tokens) % columns == 0:
+            arrays = self._columns(tokens[0::columns], tokens[1::columns],
+                                   tokens[2::columns], block[4])
+        if arrays is None:
+            arrays = self._rows(segment, start, block[4])
+        c_arr, r_arr = arrays
+        block[4] += len(c_arr)
+        if block[4] > block[0]:
+            raise ValueError("error! line %d: # of rows is not equal to " %
+                             block[1] + "# of stages!")
+        block[2].append(c_arr)
+        block[3].append(r_arr)
+
+    def _columns(self, stage_list, c_list, r_list, rows):
+        """Checked (c_arr, r_arr) of the columns, None when invalid."""
+        try:
+            stage_arr = np.array(stage_list, dtype=float)
+            c_value = np.array(c_list, dtype=float)
+            r_value = np.array(r_list, dtype=float)
+        except ValueError:
+            return None
+        if not np.array_equal(stage_arr,
+                              np.arange(rows + 1, rows + 1 + len(c_value))):
+            return None
+        if not (np.all(np.isfinite(c_value) & (c_value > 0)) and
+                np.all(np.isfinite(r_value) & (r_value > 0))):
+            return None
+        if self.numeric:
+            return c_value, r_value
+        return np.array(c_list), np.array(r_list)
+
+    def _rows(self, segment, start, rows):
+        """Row by row parsing of a segment, raises at the first bad row."""
+        line = self.line_of(start)
+        c_list = list()
+        r_list = list()
+        for k, row in enumerate(segment.split("\n")):
+            tmplist = row.split()
+            if tmplist == []:
+                continue
+            if len(tmplist) < 3:
+                raise ValueError("error! line %d: Cth and Rth are " %
+                                 (line + k) + "not found!")
+            arrays = self._columns(tmplist[:1], tmplist[1:2], tmplist[2:3],
+                                   rows + len(c_list))
+            if arrays is None:
+                raise ValueError("error! line %d: " % (line + k) +
+                                 "invalid stage number or value!")
+            c_list.append(arrays[0][0])
+            r_list.append(arrays[1][0])
+        return np.array(c_list), np.array(r_list)
+
+
+def iter_mycr(source, numeric=False, chunk_size=MYCR_CHUNK):
+    """Yield the RC networks of a myCR file, one by one.
+
+    source is a filename or an open text file, read chunk_size
+    characters at a time.  A file holds one or more networks, each a
+    "STAGES=" row followed by its rows of stage number, Cth, Rth (and
+    tau); "#" starts a comment to the end of a row, the columns after Rth
+    are ignored.  A network is yielded as (c_arr, r_arr, comment_list) when the
+    next "STAGES=" row or the end of the file is reached; comment_list
+    holds the "#" rows since the data of the previous network.  The
+    values are the decimal strings of the file so that the Rational
+    paths stay exact, or floats with numeric on.  Stage numbers must
+    count from 1 to STAGES, and Cth and Rth must be positive numbers;
+    ValueError with the line number otherwise.
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding="utf-8") as fileobj:
+            yield from iter_mycr(fileobj, numeric, chunk_size)
+        return
+
+    parser = _MyCRParser(numeric)
+    rest = "\n"
+    while True:
+        chunk = source.read(chunk_size)
+        if chunk == "":
+            break
+        cut = chunk.rfind("\n")         # parse complete rows only
+        if cut < 0:
+            rest += chunk
+            continue
+        yield from parser.feed(rest + chunk[:cut])
+        rest = chunk[cut:]
+    yield from parser.feed(rest)
+    network = parser.finish()
+    if network is not None:
+        yield network
+
+
+def _single_network(networks):
+    """The only network of iter_mycr()."""
+    network = next(networks, None)
+    if network is None:
+        raise ValueError("error! STAGES is not found!")
+    if next(networks, None) is not None:
+        raise ValueError("error! more than one network (STAGES) is " +
+                         "found!")
+    return network
+
+
+def parse_mycr(text, numeric=False):
+    """Parse myCR formatted text of one network.
+
+    Returns (c_arr, r_arr): Cth on the 2nd column and Rth on the 3rd column
+    (1st column is stage number).  Values are kept as the decimal strings
+    of the file so that the Rational paths stay exact; use
+    ``.astype(float)`` (or numeric on) to get numbers.
+    """
+    return _single_network(iter_mycr(io.StringIO(text), numeric))[:2]
+
+
+def read_mycr(input_file, numeric=False):
+    """Read a myCR formatted file of one network, see parse_mycr()."""
+    return _single_network(iter_mycr(input_file, numeric))[:2]
+
+
+def iter_mycr_named(input_file, numeric=False):
+    """Yield (name, c_arr, r_arr, comment_list) of the networks of a myCR
+    file, see iter_mycr().  The network of a file of one is named after
+    the file, those of a file of many "<file>_1", "<file>_2"..."""
+    name = os.path.splitext(os.path.basename(input_file))[0]
+    networks = iter_mycr(input_file, numeric)
+    first = next(networks, None)
+    if first is None:
+        raise ValueError("error! STAGES is not found!")
+    second = next(networks, None)
+    if second is None:
+        yield (name,) + first
+        return
+    yield (name + "_1",) + first
+    yield (name + "_2",) + second
+    for k, network in enumerate(networks, 3):
+        yield (name + "_" + str(k),) + network
+
+
+def format_mycr(c_arr, r_arr, tau_arr=None, header=(),
+                labels=("C", "R", "tau")):
+    """Serialize an RC network to myCR formatted text.
+
+    header is a sequence of comment rows (without "\\n") written before
+    "STAGES=", labels are the names of the C, R and tau columns.
+    tau_arr defaults to C * R.
+    """
+    stages = len(c_arr)
+    if tau_arr is None:
+        tau_arr = np.asarray(c_arr, dtype=float) * \
+            np.asarray(r_arr, dtype=float)
+
+    tmplist = [line + "\n" for line in header]
+    tmplist.append("STAGES=\t" + str(stages) + "\n\n")
+
+    # keep the column header aligned with 8-char tab stops
+    tmpstring = "# stage\t"
+    for label in labels[:-1]:
+        tmpstring += label + ("\t\t" if len(label) >= 8 else "\t\t\t")
+    tmplist.append(tmpstring + labels[-1] + "\n")
+
+    for i in range(stages):
+        tmplist.append(str(i+1) + "\t" +
+                       str(c_arr[i]) + "\t" +
+                       str(r_arr[i]) + "\t" +
+                       str(tau_arr[i]) + "\n")
+    return "".join(tmplist)
+
+
+def write_mycr(output_file, c_arr, r_arr, tau_arr=None, header=(),
+               labels=("C", "R", "tau")):
+    """Write an RC network to a myCR formatted file, see format_mycr()."""
+    with open(output_file, "w") as fileobj:
+        fileobj.write(format_mycr(c_arr, r_arr, tau_arr, header, labels))
+
+
+def result_header(title, stages, first_stage="C1 and R1"):
+    """Standard header rows of the conversion results."""
+    return ["## " + title + " " + str(stages) + "stages",
+            "## Created: " + timestamp(),
+            "# First stage (" + first_stage + ") is connected to Junction."]
@@ -0,0 +1,173 @@
+# # Multiprecision (mpmath) engines and adaptive precision
+# 2019/05/06 created by Tom HARA
+import warnings
+
+import mpmath
+import numpy as np
+
+from .foster2cauer import rkpw, ladder_from_jacobi, foster_to_cauer_numeric
+from .cauer2foster import cauer_to_foster_numeric
+from .frequency import z_foster, z_cauer
+from .verify import rsum_check
+
+# digits tried by the adaptive mode, None is the float engine
+ADAPTIVE_DIGITS = (None, 30, 60, 120, 240)
+
+
+##############################################################################
+# mpmath engines
+##############################################################################
+def foster_to_cauer_mpmath(c_list, r_list, dps=30):
+    """Foster to Cauer conversion with dps significant digits.
+
+    Same algorithm as the numeric engine, carried out in mpmath.
+    """
+    with mpmath.workdps(dps):
+        c_f = [mpmath.mpf(str(c)) for c in c_list]
+        r_f = [mpmath.mpf(str(r)) for r in r_list]
+
+        alpha, beta = rkpw([1 / (c * r) for c, r in zip(c_f, r_f)],
+                           [1 / c for c in c_f])
+        c_c, r_c = ladder_from_jacobi(alpha, beta)
+
+        return np.array([[float(c), float(r), float(c * r)]
+                         for c, r in zip(c_c, r_c)])
+
+
+def cauer_to_foster_mpmath(c_list, r_list, dps=30):
+    """Cauer to Foster conversion with dps significant digits.
+
+    Same eigenproblem as the numeric engine, solved by mpmath.eigsy().
+    """
+    with mpmath.workdps(dps):
+        c_c = [mpmath.mpf(str(c)) for c in c_list]
+        r_c = [mpmath.mpf(str(r)) for r in r_list]
+        stages = len(c_c)
+
+        # K = C^-1/2 G C^-1/2, Rc_i connects node i and i+1
+        K = mpmath.zeros(stages)
+        for i in range(stages):
+            K[i, i] = 1 / (r_c[i] * c_c[i])
+            if i > 0:
+                K[i, i] += 1 / (r_c[i-1] * c_c[i])
+                K[i, i-1] = K[i-1, i] = \
+                    -1 / (r_c[i-1] * mpmath.sqrt(c_c[i-1] * c_c[i]))
+        eigvals, eigvecs = mpmath.eigsy(K)
+
+        rows = list()
+        for i in range(stages):
+            c_f = c_c[0] / eigvecs[0, i]**2
+            tau_f = 1 / eigvals[i]
+            rows.append([float(c_f), float(tau_f / c_f), float(tau_f)])
+
+    # ascending tau, same as the other engines
+    rows.sort(key=lambda row: row[2])
+    return np.array(rows)
+
+
+##############################################################################
+# Checks
+##############################################################################
+def reconstruction_error(FosterMat, CauerMat, points=200):
+    """Max relative difference of Z(s) between a Foster and a Cauer network.
+
+    Z(s) is compared at s = 1/t for t log-spaced from min tau / 10 to
+    max tau * 10 of the Foster network, the time range where Zth(t) rises.
+    """
+    tau_arr = FosterMat[:, 2]
+    tm = np.logspace(np.log10(np.min(tau_arr) / 10),
+                     np.log10(np.max(tau_arr) * 10), points)
+    Zf = z_foster(1 / tm, FosterMat[:, 1], tau_arr)
+    Zc = z_cauer(1 / tm, CauerMat[:, 0], CauerMat[:, 1])
+    return float(np.max(np.abs(Zc - Zf) / np.abs(Zf)))
+
+
+def stage_error(ResultMat, ReferenceMat):
+    """Max relative difference of C and R of two networks, stage by
+    stage."""
+    return float(np.max(np.abs(ResultMat[:, :2] - ReferenceMat[:, :2]) /
+                        np.abs(ReferenceMat[:, :2])))
+
+
+def _foster_mat(c_list, r_list):
+    c_arr = np.array(c_list, dtype=float)
+    r_arr = np.array(r_list, dtype=float)
+    return np.column_stack([c_arr, r_arr, c_arr * r_arr])
+
+
+##############################################################################
+# Adaptive precision
+##############################################################################
+def _escalate(convert, impedance_error, r_list, tol, epsilon, digits):
+    """Loop of the adaptive modes.
+
+    convert(dps) is the conversion with dps digits (None: float engine)
+    and impedance_error(ResultMat) its reconstruction_error().  The Z(s)
+    check hardly sees errors of the stages, so a result is accepted only
+    when it also agrees stage by stage within tol with the result of the
+    next digits (twice the last ones after the end of digits).
+    """
+    results = dict()
+
+    def result(k):
+        if k not in results:
+            dps = digits[k] if k < len(digits) else 2 * (digits[-1] or 15)
+            results[k] = convert(dps)
+        return results[k]
+
+    for k, dps in enumerate(digits):
+        ResultMat = result(k)
+        error = impedance_error(ResultMat)
+        if not (rsum_check(r_list, ResultMat[:, 1], epsilon)[2] and
+                error <= tol):
+            continue
+        error = max(error, stage_error(ResultMat, result(k + 1)))
+        if error <= tol:
+            break
+    else:
+        warnings.warn("adaptive precision did not pass the checks "
+                      "(error = %g at %s digits)" % (error, dps))
+    return ResultMat, dps, error
+
+
+def foster_to_cauer_adaptive(c_list, r_list, tol=1e-9, epsilon=1e-8,
+                             digits=ADAPTIVE_DIGITS):
+    """Foster to Cauer conversion escalating the precision when needed.
+
+    Starts with the float engine and moves on to the next number of digits
+    of the mpmath engine while the Rsum check (epsilon), the impedance
+    reconstruction error (tol) or the stage by stage comparison with the
+    next number of digits (tol) fails.
+    Returns (CauerMat, dps, error), dps being None for the float engine
+    and error the largest relative error of the checks.
+    """
+    FosterMat = _foster_mat(c_list, r_list)
+
+    def convert(dps):
+        if dps is None:
+            return foster_to_cauer_numeric(c_list, r_list)
+        return foster_to_cauer_mpmath(c_list, r_list, dps)
+
+    return _escalate(convert,
+                     lambda CauerMat: reconstruction_error(FosterMat,
+                                                           CauerMat),
+                     r_list, tol, epsilon, digits)
+
+
+def cauer_to_foster_adaptive(c_list, r_list, tol=1e-9, epsilon=1e-8,
+                             digits=ADAPTIVE_DIGITS):
+    """Cauer to Foster conversion escalating the precision when needed.
+
+    See foster_to_cauer_adaptive().  Returns (FosterMat, dps, error).
+    """
+    CauerMat = _foster_mat(c_list, r_list)
+
+    def convert(dps):
+        if dps is None:
+            return cauer_to_foster_numeric(c_list, r_list)
+        return cauer_to_foster_mpmath(c_list, r_list, dps)
+
+    return _escalate(convert,
+                     lambda FosterMat: reconstruction_error(FosterMat,
+                                                            CauerMat),
+                     r_list, tol, epsilon, digits)
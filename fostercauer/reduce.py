@@ -0,0 +1,90 @@
+# # Order reduction of Foster / Cauer networks
+# 2019/05/06 created by Tom HARA
+import warnings
+
+import numpy as np
+
+from .cauer2foster import cauer_to_foster_numeric
+from .fit import fit_grid, fit_stages, merge_stages
+from .foster2cauer import foster_to_cauer_numeric
+from .zth import zth_foster
+
+
+def reduction_error(tm, r_arr, tau_arr, FosterMat):
+    """Largest |Zth| error of a reduced network, relative to the total Rth."""
+    err = zth_foster(tm, FosterMat[:, 1], FosterMat[:, 2]) - \
+        zth_foster(tm, r_arr, tau_arr)
+    return float(np.max(np.abs(err)) / np.sum(r_arr))
+
+
+def reduce_foster(c_list, r_list, stages=None, tolerance=1e-3, points=400):
+    """Reduce a Foster network to fewer stages.
+
+    The Zth(t) curve of the network on points log-spaced times (from
+    min tau / 10 to max tau * 10) is fitted as fit_foster() does, keeping
+    the total Rth.  With stages, the reduced network has at most that
+    many stages; otherwise the fewest stages whose error is within
+    tolerance (relative to the total Rth) are bisected for, up to the
+    stages of the NNLS solution (more stages give the same network).
+    When even those miss tolerance, that network, the closest the fit
+    gets, is returned with a warning.
+
+    Returns (FosterMat, error), error as reduction_error().
+    """
+    c_arr = np.asarray(c_list, dtype=float)
+    r_arr = np.asarray(r_list, dtype=float)
+    tau_arr = c_arr * r_arr
+    r_total = np.sum(r_arr)
+
+    tau_min = np.min(tau_arr) / 10
+    tau_max = np.max(tau_arr) * 10
+    tm = np.logspace(np.log10(tau_min), np.log10(tau_max), points)
+    zth = zth_foster(tm, r_arr, tau_arr)
+    # the NNLS is the same for any number of stages
+    grid = fit_grid(tm, zth, tau_min, tau_max, r_total=r_total)
+
+    results = dict()
+
+    def reduced(m):
+        if m not in results:
+            FosterMat = fit_stages(grid, m, r_total=r_total)
+            results[m] = (FosterMat,
+                          reduction_error(tm, r_arr, tau_arr, FosterMat))
+        return results[m]
+
+    if stages is not None:
+        return reduced(stages)
+
+    low = 0
+    high = min(len(merge_stages(grid[3], grid[4])[0]), len(r_arr))
+    if reduced(high)[1] > tolerance:
+        warnings.warn("reduction did not reach the tolerance %g "
+                      "(error = %g with %d stages)" %
+                      (tolerance, results[high][1], high))
+        return reduced(high)
+    # the error decreases with the number of stages
+    while high - low > 1:
+        m = (low + high) // 2
+        if reduced(m)[1] <= tolerance:
+            high = m
+        else:
+            low = m
+    return reduced(high)
+
+
+def reduce_network(c_list, r_list, stages=None, tolerance=1e-3,
+                   cauer_input=False, cauer_output=False):
+    """reduce_foster() for Foster or Cauer input and output networks.
+
+    Cauer networks are converted by the numeric engines.
+    Returns (ResultMat, error).
+    """
+    if cauer_input:
+        FosterMat = cauer_to_foster_numeric(c_list, r_list)
+        c_list, r_list = FosterMat[:, 0], FosterMat[:, 1]
+
+    ResultMat, error = reduce_foster(c_list, r_list, stages, tolerance)
+
+    if cauer_output:
+        ResultMat = foster_to_cauer_numeric(ResultMat[:, 0], ResultMat[:, 1])
+    return ResultMat, error
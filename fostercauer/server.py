@@ -0,0 +1,414 @@
+# # Persistent conversion server with a JSON lines protocol
+# 2019/05/06 created by Tom HARA
+import collections
+import importlib
+import json
+import math
+import multiprocessing
+import numbers
+import os
+import queue
+import socketserver
+import threading
+import time
+
+from .convert import DIRECTIONS, METHODS, convert_network
+
+# seconds between the checks of cancellation while a worker converts
+POLL_INTERVAL = 0.02
+
+# latencies kept for the percentiles of stats()
+LATENCY_WINDOW = 1000
+
+# modules imported once by the fork server, the workers forked from it
+# start with them
+WORKER_PRELOAD = ["sympy", "fostercauer.convert"]
+
+
+def worker_context():
+    """multiprocessing context of the workers.
+
+    Workers are (re)started from the slot threads while the main thread
+    may be blocked reading stdin; a child forked from this process would
+    then deadlock closing sys.stdin at its start.  They are forked by a
+    fork server preloaded with WORKER_PRELOAD instead, or spawned where
+    there is no fork server.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _worker_main(conn, cache_dir=None, cache_size=None):
+    """Worker process: converts the requests received on conn.
+
+    sympy is imported before the first request, so that requests don't
+    pay for it (a no-op when the fork server has preloaded it).
+    """
+    importlib.import_module("sympy")
+    cache = None
+    if cache_size:
+        from .cache import ConversionCache
+        cache = ConversionCache(cache_dir, cache_size)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            ResultMat = convert_network(
+                request["c"], request["r"], request["direction"],
+                request.get("method", "numeric"),
+                request.get("rational_rth", False),
+                request.get("dps", 30), cache)
+            conn.send(("ok", ResultMat.tolist()))
+        except Exception as err:
+            conn.send(("error", str(err).replace("\n", " ")))
+
+
+def _positive_number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool) \
+        and math.isfinite(value) and value > 0
+
+
+def _stage_value(value):
+    """True for a positive number or a decimal string of one."""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return False
+    return _positive_number(value)
+
+
+def check_request(request):
+    """Error message of an invalid convert request, None when valid."""
+    direction = request.get("direction")
+    if direction not in DIRECTIONS:
+        return "invalid direction: " + str(direction)
+    c_list, r_list = request.get("c"), request.get("r")
+    if not (isinstance(c_list, list) and isinstance(r_list, list)):
+        return "c and r must be lists"
+    if len(c_list) != len(r_list) or len(c_list) == 0:
+        return "c and r must have the same, nonzero length"
+    if not all(_stage_value(value) for value in c_list + r_list):
+        return "c and r must be positive numbers"
+    method = request.get("method", "numeric")
+    if method not in METHODS[direction]:
+        return "invalid method: " + str(method)
+    dps = request.get("dps", 30)
+    if not (isinstance(dps, int) and not isinstance(dps, bool) and
+            dps > 0):
+        return "dps must be a positive integer"
+    timeout = request.get("timeout")
+    if timeout is not None and not _positive_number(timeout):
+        return "timeout must be a positive number"
+    return None
+
+
+class Job:
+    """A conversion request waiting for its single reply."""
+
+    def __init__(self, request, reply):
+        self.request = request
+        self.received = time.perf_counter()
+        self.cancelled = threading.Event()
+        self._reply = reply
+        self._lock = threading.Lock()
+        self.done = False
+
+    def finish(self, response):
+        """Send the reply unless it has been sent already."""
+        with self._lock:
+            if self.done:
+                return False
+            self.done = True
+        self._reply(dict({"id": self.request.get("id")}, **response))
+        return True
+
+
+class ConversionPool:
+    """Warm worker processes converting Jobs concurrently.
+
+    Each worker is driven by a thread of this process.  A job running
+    beyond its timeout or cancelled is stopped by terminating its worker,
+    which is replaced by a new one at once.  Counters of the requests and
+    a window of latencies are kept for stats().
+    """
+
+    def __init__(self, workers=None, timeout=None, cache_dir=None,
+                 cache_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.counters = collections.Counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.busy = 0
+        self.started = time.time()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._context = worker_context()
+        # the first workers are started before any slot thread runs
+        self._threads = [threading.Thread(target=self._slot,
+                                          args=self._start_worker(),
+                                          daemon=True)
+                         for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _start_worker(self):
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child, self.cache_dir,
+                                       self.cache_size), daemon=True)
+        process.start()
+        child.close()
+        return process, parent
+
+    def _slot(self, process, conn):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                conn.send(None)
+                process.join(1)
+                return
+            if job.done:
+                continue                 # cancelled while queued
+            try:
+                process, conn = self._run(job, process, conn)
+            except Exception as err:
+                # a broken worker is replaced, the slot keeps running
+                process.terminate()
+                process.join()
+                process, conn = self._start_worker()
+                self._finish(job, "failed", {"ok": False, "error": str(err)})
+
+    def _run(self, job, process, conn):
+        """Run a Job on a worker, returns the worker to use next."""
+        timeout = job.request.get("timeout", self.timeout)
+        deadline = None if timeout is None else time.perf_counter() + \
+            float(timeout)
+
+        with self._lock:
+            self.busy += 1
+        try:
+            conn.send(job.request)
+            status = None
+            while status is None:
+                if conn.poll(POLL_INTERVAL):
+                    status, value = conn.recv()
+                elif job.cancelled.is_set():
+                    status = "cancelled"
+                elif deadline is not None and \
+                        time.perf_counter() > deadline:
+                    status = "timeout"
+        finally:
+            with self._lock:
+                self.busy -= 1
+
+        if status in ("cancelled", "timeout"):
+            # the worker may be stuck in sympy, start a new one
+            process.terminate()
+            process.join()
+            process, conn = self._start_worker()
+            self._finish(job, status, {"ok": False, "error": status})
+        elif status == "ok":
+            self._finish(job, "completed", {"ok": True, "result": value})
+        else:
+            self._finish(job, "failed", {"ok": False, "error": value})
+        return process, conn
+
+    def _finish(self, job, counter, response):
+        latency = time.perf_counter() - job.received
+        response["seconds"] = latency
+        if not job.finish(response):
+            return False
+        with self._lock:
+            self.counters[counter] += 1
+            self.latencies.append(latency)
+        return True
+
+    def submit(self, job):
+        """Queue a Job, replies an error at once to an invalid request."""
+        with self._lock:
+            self.counters["requests"] += 1
+        error = check_request(job.request)
+        if error is not None:
+            self._finish(job, "failed", {"ok": False, "error": error})
+            return
+        self._queue.put(job)
+
+    def cancel(self, job):
+        """Cancel a Job, queued or running.  False when it has been
+        replied already."""
+        if job.done:
+            return False
+        job.cancelled.set()
+        return self._finish(job, "cancelled",
+                            {"ok": False, "error": "cancelled"})
+
+    def stats(self):
+        """Counters, throughput and latency percentiles [s]."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            stats = dict(self.counters)
+            stats["busy"] = self.busy
+        uptime = time.time() - self.started
+        stats.update({"workers": self.workers, "queued": self._queue.qsize(),
+                      "uptime": uptime,
+                      "throughput": stats.get("completed", 0) / uptime})
+        if latencies:
+            stats.update({
+                "latency_mean": sum(latencies) / len(latencies),
+                "latency_p50": latencies[len(latencies) // 2],
+                "latency_p95": latencies[int(len(latencies) * 0.95)],
+                "latency_max": latencies[-1]})
+        return stats
+
+    def close(self):
+        """Stop the workers after the queued jobs."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class Session:
+    """Requests of one client: a stream of JSON lines in, replies out.
+
+    Requests are objects with an "op":
+      convert   "direction", "c", "r" (numbers or decimal strings) and
+                optionally "method" (default numeric), "rational_rth",
+                "dps" and "timeout" [s]; replied with "result", the rows
+                of C, R and tau, when done (not in the order of requests).
+                The "id" is required and must differ from the ids of the
+                convert requests of this session not replied yet
+      cancel    "target": id of a convert request of this session, "ok"
+                is false when it has been replied already
+      stats     counters of the server
+      ping
+      shutdown  stop the server
+    Every reply has the "id" of its request and "ok"; a bad request is
+    replied "ok" false with an "error" and never stops the session.
+    """
+
+    def __init__(self, pool, write, on_shutdown=None):
+        self.pool = pool
+        self.jobs = dict()
+        self.on_shutdown = on_shutdown
+        self._write = write
+        self._lock = threading.Lock()
+
+    def reply(self, response):
+        line = json.dumps(response) + "\n"
+        with self._lock:
+            self._write(line)
+
+    def handle(self, line):
+        """Handle one request line, an error is replied to a bad one."""
+        try:
+            request = json.loads(line)
+            op = request.get("op", "convert")
+        except (ValueError, AttributeError):
+            self.reply({"id": None, "ok": False, "error": "invalid JSON"})
+            return
+        try:
+            self._handle(request, op)
+        except Exception as err:
+            self.reply({"id": request.get("id"), "ok": False,
+                        "error": str(err).replace("\n", " ")})
+        # forget the finished jobs
+        for key in [key for key, job in self.jobs.items() if job.done]:
+            del self.jobs[key]
+
+    def _handle(self, request, op):
+        if op == "convert":
+            key = request.get("id")
+            if key is None:
+                self.reply({"id": None, "ok": False,
+                            "error": "convert needs an id"})
+            elif key in self.jobs and not self.jobs[key].done:
+                self.reply({"id": key, "ok": False,
+                            "error": "duplicate id: " + str(key)})
+            else:
+                job = Job(request, self.reply)
+                self.jobs[key] = job
+                self.pool.submit(job)
+        elif op == "cancel":
+            job = self.jobs.get(request.get("target"))
+            if job is None:
+                self.reply({"id": request.get("id"), "ok": False,
+                            "error": "unknown target"})
+            elif not self.pool.cancel(job):
+                self.reply({"id": request.get("id"), "ok": False,
+                            "error": "already finished"})
+            else:
+                self.reply({"id": request.get("id"), "ok": True})
+        elif op == "stats":
+            self.reply({"id": request.get("id"), "ok": True,
+                        "stats": self.pool.stats()})
+        elif op == "ping":
+            self.reply({"id": request.get("id"), "ok": True})
+        elif op == "shutdown":
+            self.reply({"id": request.get("id"), "ok": True})
+            if self.on_shutdown is not None:
+                self.on_shutdown()
+        else:
+            self.reply({"id": request.get("id"), "ok": False,
+                        "error": "unknown op: " + str(op)})
+
+    def wait(self):
+        """Wait for the replies of every request of this session."""
+        while any(not job.done for job in list(self.jobs.values())):
+            time.sleep(POLL_INTERVAL)
+
+
+def serve_stream(pool, infile, outfile):
+    """Serve one session over text streams (e.g. stdin / stdout) until
+    the end of infile or a shutdown request."""
+    stop = threading.Event()
+
+    def write(line):
+        outfile.write(line)
+        outfile.flush()
+
+    session = Session(pool, write, stop.set)
+    for line in infile:
+        if line.strip():
+            session.handle(line)
+        if stop.is_set():
+            break
+    session.wait()
+
+
+def serve_unix(pool, socket_path):
+    """Serve sessions on a Unix domain socket, one per connection, until
+    a shutdown request."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def write(line):
+                self.wfile.write(line.encode())
+                self.wfile.flush()
+
+            session = Session(pool, write, lambda: threading.Thread(
+                target=server.shutdown).start())
+            for line in self.rfile:
+                if line.strip():
+                    session.handle(line.decode())
+            session.wait()
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(socket_path)
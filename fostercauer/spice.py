@@ -0,0 +1,282 @@
+# # Spice SubCircuit format reader / writer
+# 2019/05/06 created by Tom HARA
+import decimal
+import fnmatch
+import re
+
+import numpy as np
+
+from .utils import timestamp
+
+
+# engineering suffixes of Spice numbers (case insensitive, "meg" first)
+SPICE_SUFFIXES = [("meg", 1e6), ("mil", 25.4e-6), ("t", 1e12), ("g", 1e9),
+                  ("k", 1e3), ("m", 1e-3), ("u", 1e-6), ("n", 1e-9),
+                  ("p", 1e-12), ("f", 1e-15), ("a", 1e-18)]
+
+SPICE_NUMBER = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?", re.I)
+
+GROUND_NODES = ("0", "gnd")
+
+
+def spice_value(token):
+    """Value of a Spice number, e.g. "4.7u", "10meg", "1.5e-3", "2kOhm"."""
+    match = SPICE_NUMBER.match(token)
+    if match is None:
+        raise ValueError("error! not a number: " + token)
+    value = float(match.group(0))
+    rest = token[match.end():].lower()
+    for suffix, scale in SPICE_SUFFIXES:
+        if rest.startswith(suffix):
+            return value * scale
+    return value                         # no suffix, or units only
+
+
+def iter_spice_lines(lines):
+    """Logical lines of a netlist: inline comments (";" and " $") are
+    removed from each row, then "+" continuation rows are joined.  "*"
+    comment rows are yielded as they are (before the line they interrupt,
+    they and empty rows don't end it).  lines is any iterable, e.g. a file
+    object.
+    """
+    pending = None
+    for line in lines:
+        stripped = line.rstrip("\r\n").strip()
+        if stripped[:1] == '*':
+            yield stripped
+            continue
+        stripped = re.split(r";| \$", stripped)[0].rstrip()
+        if stripped == "":
+            continue
+        if stripped[0] == '+':
+            if pending is not None:
+                pending += " " + stripped[1:].strip()
+            continue
+        if pending is not None:
+            yield pending
+        pending = stripped
+    if pending is not None:
+        yield pending
+
+
+def rc_topology(ports, elements):
+    """Infer the topology of a SubCircuit of R and C elements.
+
+    ports are the SubCircuit nodes, the first one being Junction.
+    elements are (kind, node1, node2, value) of "R" or "C".  The R
+    elements have to form a chain from Junction; every C connecting the
+    two nodes of an R makes a Foster network, every C connecting a chain
+    node to ground (or to the last port) a Cauer network.
+    Returns (topology, c_arr, r_arr) in the order of the chain from
+    Junction, topology being "foster" or "cauer"; None when the elements
+    form neither network.
+    """
+    ground = {node.lower() for node in GROUND_NODES}
+    if len(ports) > 1:
+        ground.add(ports[-1].lower())
+
+    r_at = dict()                        # node: indices of the R on it
+    r_elems = list()
+    pair_c = dict()                      # frozenset of nodes: C values
+    ground_c = dict()                    # node: C values to ground
+    c_count = 0
+    for kind, node1, node2, value in elements:
+        node1, node2 = node1.lower(), node2.lower()
+        if kind == "R":
+            for node in (node1, node2):
+                r_at.setdefault(node, []).append(len(r_elems))
+            r_elems.append((node1, node2, value))
+            continue
+        c_count += 1
+        pair_c.setdefault(frozenset((node1, node2)), []).append(value)
+        if node2 in ground:
+            ground_c.setdefault(node1, []).append(value)
+        elif node1 in ground:
+            ground_c.setdefault(node2, []).append(value)
+    if len(r_elems) == 0 or len(r_elems) != c_count:
+        return None
+
+    # walk the R chain from Junction
+    chain = [ports[0].lower()]
+    r_list = list()
+    used = [False] * len(r_elems)
+    while len(r_list) < len(r_elems):
+        nexts = [k for k in r_at.get(chain[-1], []) if not used[k]]
+        if len(nexts) != 1:
+            return None
+        used[nexts[0]] = True
+        node1, node2, value = r_elems[nexts[0]]
+        chain.append(node2 if node1 == chain[-1] else node1)
+        r_list.append(value)
+
+    foster_c = [pair_c.get(frozenset(chain[i:i+2]), [])
+                for i in range(len(r_list))]
+    if all(len(values) == 1 for values in foster_c):
+        return "foster", np.array([v[0] for v in foster_c]), \
+            np.array(r_list)
+    cauer_c = [ground_c.get(node, []) for node in chain[:-1]]
+    if all(len(values) == 1 for values in cauer_c):
+        return "cauer", np.array([v[0] for v in cauer_c]), np.array(r_list)
+    return None
+
+
+def iter_subckts(lines, names=None, topology=None):
+    """Yield the RC networks of a netlist or a model library, one by one.
+
+    lines is any iterable of rows (e.g. an open file), read only once.
+    Each .SUBCKT ... .ENDS block made of R and C elements only is
+    yielded as (name, topology, c_arr, r_arr, comment_list), see
+    rc_topology(); comment_list holds the "*" rows since the previous
+    block.  Other blocks (electrical models) are skipped.  names is a
+    list of fnmatch patterns of the SubCircuit names (case insensitive)
+    and topology "foster" or "cauer" to filter the networks.  A .SUBCKT
+    row without a name raises ValueError.
+    """
+    comment_list = list()
+    block = None                         # (name, ports, elements)
+    for line in iter_spice_lines(lines):
+        if line[0] == '*':
+            comment_list.append(line)
+            continue
+        tmplist = line.split()
+        keyword = tmplist[0].lower()
+        if keyword == ".subckt":
+            if len(tmplist) < 2:
+                raise ValueError("error! .SUBCKT without a name: " + line)
+            name = tmplist[1]
+            ports = [t for t in tmplist[2:] if "=" not in t]
+            if names is None or any(fnmatch.fnmatch(name.lower(),
+                                                    pattern.lower())
+                                    for pattern in names):
+                block = (name, ports, list())
+            continue
+        if keyword == ".ends":
+            if block is not None and block[2] is not None:
+                network = rc_topology(block[1], block[2])
+                if network is not None and \
+                        topology in (None, network[0]):
+                    yield (block[0],) + network + (comment_list,)
+            block = None
+            comment_list = list()
+            continue
+        if block is None or block[2] is None:
+            continue
+        kind = keyword[0].upper()
+        try:
+            if kind not in "RC" or len(tmplist) < 4:
+                raise ValueError(line)
+            block[2].append((kind, tmplist[1], tmplist[2],
+                             spice_value(tmplist[3])))
+        except ValueError:
+            block = (block[0], block[1], None)   # not an RC network
+
+
+def parse_spice(text):
+    """Parse a Spice SubCircuit of an RC network.
+
+    The first RC network of the text is taken, see iter_subckts().
+    Returns (c_arr, r_arr, comment_list) where comment_list holds the
+    "*" comment rows of the file.
+    """
+    for _, _, c_arr, r_arr, comment_list in iter_subckts(text.split("\n")):
+        return c_arr, r_arr, comment_list
+    raise ValueError("error! no RC network SubCircuit is found!")
+
+
+def read_spice(input_file):
+    """Read a Spice SubCircuit file, see parse_spice()."""
+    with open(input_file, 'r', encoding="utf-8") as fileobj:
+        return parse_spice(fileobj.read())
+
+
+def read_subckts(input_file, names=None, topology=None):
+    """iter_subckts() of a netlist file, streamed row by row."""
+    with open(input_file, 'r', encoding="utf-8") as fileobj:
+        yield from iter_subckts(fileobj, names, topology)
+
+
+# Spice dialects: (.subckt, .ends, name on .ends, inline comment, mega
+# suffix).  "spice" (Spice3) has no inline comment and its values are
+# written as given; the others get engineering suffixes ("M" is milli,
+# mega is spelled as each simulator documents it) and the tau of each
+# stage as an inline comment.
+SPICE_DIALECTS = {"spice": (".SUBCKT", ".ENDS", True, None, None),
+                  "ngspice": (".subckt", ".ends", True, " $ ", "meg"),
+                  "ltspice": (".subckt", ".ends", True, " ; ", "Meg"),
+                  "pspice": (".SUBCKT", ".ENDS", False, " ; ", "MEG")}
+
+# exponent: engineering suffix, None being the mega suffix of a dialect
+ENGINEERING_SUFFIXES = {12: "T", 9: "G", 6: None, 3: "k", 0: "", -3: "m",
+                        -6: "u", -9: "n", -12: "p", -15: "f"}
+
+
+def format_spice_value(value, mega="meg"):
+    """Spice number with an engineering suffix, e.g. "4.7u", "10meg".
+
+    The decimal digits of value are kept exactly; values out of the
+    range of the suffixes are written as given.
+    """
+    number = decimal.Decimal(str(value))
+    if number == 0 or not number.is_finite():
+        return str(value)
+    exponent = 3 * (number.adjusted() // 3)
+    if exponent not in ENGINEERING_SUFFIXES:
+        return str(value)
+    suffix = ENGINEERING_SUFFIXES[exponent]
+    mantissa = number.scaleb(-exponent).normalize()
+    return format(mantissa, "f") + (mega if suffix is None else suffix)
+
+
+def format_subckt(name, c_arr, r_arr, foster=False, dialect="spice"):
+    """Spice SubCircuit "name" of an RC network, without header.
+
+    Node 1 is Junction, node stages+1 ambient; Cauer capacitors go to
+    node 0.  Values are written as given (decimal strings stay exact) or
+    with the suffixes of the dialect, see SPICE_DIALECTS.
+    """
+    subckt, ends, ends_name, comment, mega = SPICE_DIALECTS[dialect]
+    stages = len(c_arr)
+    tmplist = [subckt + " " + name + " 1 " + str(stages+1) + "\n"]
+
+    def value(x):
+        return str(x) if mega is None else format_spice_value(x, mega)
+
+    for i in range(stages):
+        if foster:
+            tmplist.append("C" + str(i+1) + " " + str(i+1) + " " +
+                           str(i+2) + " " + value(c_arr[i]) + "\n")
+        else:  # Cauer network, as default
+            tmplist.append("C" + str(i+1) + " " + str(i+1) + " " +
+                           "0 " + value(c_arr[i]) + "\n")
+        tmplist.append("R" + str(i+1) + " " + str(i+1) + " " +
+                       str(i+2) + " " + value(r_arr[i]))
+        if comment is not None:
+            tmplist.append(comment + "tau" + str(i+1) + " = %g s" %
+                           (float(c_arr[i]) * float(r_arr[i])))
+        tmplist.append("\n")
+
+    tmplist.append(ends + (" " + name if ends_name else "") + "\n")
+    return "".join(tmplist)
+
+
+def format_spice(c_arr, r_arr, foster=False):
+    """Serialize an RC network to a Spice SubCircuit.
+
+    The SubCircuit is named FOSTER or CAUER; node 1 is Junction.
+    """
+    cauerOrFoster = "FOSTER" if foster else "CAUER"
+
+    tmplist = [
+        "***************************************************\n",
+        "* myCR data format to Spice SubCircuit format\n",
+        "* Created: " + timestamp() + "\n",
+        "* First stage (C1 and R1) is connected to Junction.\n",
+        "***************************************************\n",
+        format_subckt(cauerOrFoster, c_arr, r_arr, foster)]
+    return "".join(tmplist)
+
+
+def write_spice(output_file, c_arr, r_arr, foster=False):
+    """Write an RC network to a Spice SubCircuit file."""
+    with open(output_file, "w") as fileobj:
+        fileobj.write(format_spice(c_arr, r_arr, foster))
@@ -0,0 +1,125 @@
+# # Structure functions of Cauer networks
+# 2019/05/06 created by Tom HARA
+import csv
+
+import numpy as np
+
+
+def stack_networks(networks):
+    """Stack (c_arr, r_arr) pairs of any number of stages.
+
+    Returns (c_stack, r_stack), (networks, max stages) arrays.  Shorter
+    networks are padded with zero stages, which leave the cumulative sums
+    unchanged.
+    """
+    stages = max(len(c_arr) for c_arr, _ in networks)
+    c_stack = np.zeros((len(networks), stages))
+    r_stack = np.zeros((len(networks), stages))
+    for i, (c_arr, r_arr) in enumerate(networks):
+        c_stack[i, :len(c_arr)] = np.asarray(c_arr, dtype=float)
+        r_stack[i, :len(r_arr)] = np.asarray(r_arr, dtype=float)
+    return c_stack, r_stack
+
+
+def cumulative_structure(c_arr, r_arr):
+    """Cumulative structure function of Cauer networks.
+
+    c_arr and r_arr are Cc and Rc of one network (stages,) or of a stack
+    of networks (networks, stages), first stage connected to Junction.
+    Returns (r_sum, c_sum), the cumulative Rth and Cth from Junction.
+    """
+    return (np.cumsum(np.asarray(r_arr, dtype=float), axis=-1),
+            np.cumsum(np.asarray(c_arr, dtype=float), axis=-1))
+
+
+def _interp_rows(x_grid, xp, fp):
+    """np.interp() of each row of xp, fp at the common x_grid.
+
+    The rows are shifted apart so that one searchsorted() serves all of
+    them.  Points out of the range of a row are NaN.
+    """
+    rows, n = xp.shape
+    span = max(np.max(xp), np.max(x_grid)) - min(np.min(xp), np.min(x_grid))
+    offset = (np.arange(rows) * (span + 1))[:, None]
+    x_query = x_grid[None, :] + offset
+
+    idx = np.searchsorted((xp + offset).ravel(), x_query.ravel(),
+                          side='right').reshape(rows, -1)
+    idx -= (np.arange(rows) * n)[:, None]
+    inside = (idx >= 1) & ((idx < n) | (x_grid[None, :] == xp[:, -1:]))
+    lo = np.clip(idx - 1, 0, n - 2)
+
+    x0 = np.take_along_axis(xp, lo, axis=1)
+    x1 = np.take_along_axis(xp, lo + 1, axis=1)
+    f0 = np.take_along_axis(fp, lo, axis=1)
+    f1 = np.take_along_axis(fp, lo + 1, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(x1 > x0, (x_grid[None, :] - x0) / (x1 - x0), 1.0)
+    return np.where(inside, f0 + frac * (f1 - f0), np.nan)
+
+
+def resample_structure(r_sum, c_sum, points=200, c_min=None, c_max=None):
+    """Resample cumulative structure functions on a log Cth grid.
+
+    The grid has points log-spaced Cth values from c_min to c_max (by
+    default the range of c_sum), common to every network of a stack.
+    Returns (c_grid, r_grid, k_grid): r_grid is the cumulative Rth at
+    c_grid and k_grid the differential structure function dCsum/dRsum
+    there.  Points out of the range of a network are NaN.
+    """
+    r_sum = np.atleast_2d(r_sum)
+    c_sum = np.atleast_2d(c_sum)
+    c_min = c_min or np.min(c_sum[:, 0])
+    c_max = c_max or np.max(c_sum[:, -1])
+    c_grid = np.logspace(np.log10(c_min), np.log10(c_max), points)
+
+    r_grid = _interp_rows(np.log10(c_grid), np.log10(c_sum), r_sum)
+    k_grid = differential_structure(c_grid, r_grid)
+    return c_grid, r_grid, k_grid
+
+
+def differential_structure(c_grid, r_grid):
+    """Differential structure function K = dCsum/dRsum, along the last axis.
+
+    Where Rsum doesn't increase, K is inf (or NaN).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.gradient(np.broadcast_to(c_grid, r_grid.shape), axis=-1) / \
+            np.gradient(r_grid, axis=-1)
+
+
+def structure_functions(c_arr, r_arr, points=200):
+    """Cumulative and resampled structure functions, see above.
+
+    Returns a dict of r_sum, c_sum (per stage) and c_grid, r_grid, k_grid
+    (log-resampled), one row per network.
+    """
+    r_sum, c_sum = cumulative_structure(c_arr, r_arr)
+    c_grid, r_grid, k_grid = resample_structure(r_sum, c_sum, points)
+    return {"r_sum": np.atleast_2d(r_sum), "c_sum": np.atleast_2d(c_sum),
+            "c_grid": c_grid, "r_grid": r_grid, "k_grid": k_grid}
+
+
+def write_structure(output_file, result, names=None):
+    """Write structure_functions() results as .npz or .csv (by extension).
+
+    CSV rows are (network, Rth_sum, Cth_sum, K) of the resampled points,
+    NaN points are left out.
+    """
+    rows = result["r_grid"].shape[0]
+    names = names or [str(i) for i in range(rows)]
+
+    if output_file.lower().endswith(".npz"):
+        np.savez(output_file, names=np.array(names), **result)
+        return
+
+    with open(output_file, 'w', newline='', encoding="utf-8") as fileobj:
+        writer = csv.writer(fileobj)
+        writer.writerow(["network", "Rth_sum", "Cth_sum", "K"])
+        for i in range(rows):
+            valid = ~np.isnan(result["r_grid"][i])
+            for r, c, k in zip(result["r_grid"][i, valid],
+                               result["c_grid"][valid],
+                               result["k_grid"][i, valid]):
+                writer.writerow([names[i], repr(float(r)), repr(float(c)),
+                                 repr(float(k))])
@@ -0,0 +1,181 @@
+# # Transient junction temperature from a power profile
+# 2019/05/06 created by Tom HARA
+import itertools
+
+import numpy as np
+
+from .zth import zth_foster
+
+# block length of the two level scan of linear_recurrence()
+SCAN_BLOCK = 32
+
+# rows of a power profile read at a time
+DEFAULT_CHUNK = 1 << 16
+
+
+def _scan(a, u):
+    """Inclusive scan of x_k = a_k x_k-1 + u_k along the last axis from
+    x = 0, by doubling.  Returns (A, X): product of a and x up to k."""
+    A = a.copy()
+    X = u.copy()
+    d = 1
+    while d < a.shape[-1]:
+        X[..., d:] += A[..., d:] * X[..., :-d]
+        A[..., d:] *= A[..., :-d]
+        d *= 2
+    return A, X
+
+
+def linear_recurrence(a, u, x0):
+    """x_k = a_k x_k-1 + u_k along the last axis, x_-1 = x0.
+
+    Solved as array operations: a scan within blocks of SCAN_BLOCK
+    samples, then the same recurrence over the ends of the blocks.
+    """
+    n = a.shape[-1]
+    if n <= SCAN_BLOCK:
+        A, X = _scan(a, u)
+        return X + A * x0[..., None]
+
+    blocks = -(-n // SCAN_BLOCK)
+    pad = [(0, 0)] * (a.ndim - 1) + [(0, blocks * SCAN_BLOCK - n)]
+    shape = a.shape[:-1] + (blocks, SCAN_BLOCK)
+    A, X = _scan(np.pad(a, pad, constant_values=1.0).reshape(shape),
+                 np.pad(u, pad).reshape(shape))
+    ends = linear_recurrence(A[..., -1], X[..., -1], x0)
+    start = np.concatenate([x0[..., None], ends[..., :-1]], axis=-1)
+    x = X + A * start[..., None]
+    return x.reshape(a.shape[:-1] + (-1,))[..., :n]
+
+
+class FosterSimulator:
+    """Temperature rise of a Foster network under a power profile.
+
+    The profile is given as samples (t_k, P_k), the power P_k being held
+    until t_k+1.  Over a step dt each stage follows exactly
+        T_i <- T_i exp(-dt/tau_i) + R_i P (1 - exp(-dt/tau_i))
+    and the rise at Junction is the sum over the stages.  feed() takes
+    the profile chunk by chunk, the stage temperatures and the last
+    sample are kept between the chunks.
+    """
+
+    def __init__(self, r_arr, tau_arr):
+        self.r_arr = np.asarray(r_arr, dtype=float)
+        self.tau_arr = np.asarray(tau_arr, dtype=float)
+        self.state = np.zeros(len(self.r_arr))
+        self.last = None                 # (t, P) of the previous sample
+
+    def feed(self, tm, power):
+        """Temperature rise [K] at the time points tm of the chunk."""
+        tm = np.asarray(tm, dtype=float)
+        power = np.asarray(power, dtype=float)
+        if len(tm) == 0:
+            return np.zeros(0)
+        if self.last is None:
+            self.last = (tm[0], 0.0)
+        t_prev = np.concatenate([[self.last[0]], tm[:-1]])
+        p_prev = np.concatenate([[self.last[1]], power[:-1]])
+        decay = np.exp(-(tm - t_prev)[None, :] / self.tau_arr[:, None])
+        x = linear_recurrence(decay, self.r_arr[:, None] * (1 - decay) *
+                              p_prev[None, :], self.state)
+        self.state = x[:, -1]
+        self.last = (tm[-1], power[-1])
+        return x.sum(axis=0)
+
+
+class ConvolutionSimulator:
+    """Temperature rise of a Foster network under a uniformly sampled
+    power profile, by FFT convolution (overlap-add).
+
+    The step response is T_n = sum_j P_j h_n-1-j with
+    h_k = Zth((k+1) dt) - Zth(k dt), truncated where Zth reaches
+    (1 - rtol) of the total Rth.  Same results as FosterSimulator.
+    """
+
+    def __init__(self, r_arr, tau_arr, dt, rtol=1e-13, max_length=1 << 26):
+        r_arr = np.asarray(r_arr, dtype=float)
+        tau_arr = np.asarray(tau_arr, dtype=float)
+        length = int(np.ceil(np.max(tau_arr) * -np.log(rtol) / dt)) + 1
+        if length > max_length:
+            raise ValueError("error! the response is too long for the " +
+                             "convolution, %d samples!" % length)
+        zth = zth_foster(np.arange(length + 1) * dt, r_arr, tau_arr)
+        self.h = np.diff(zth)
+        self.tail = np.zeros(length)
+        self.previous = 0.0              # output delayed by one sample
+
+    def feed(self, tm, power):
+        """Temperature rise [K] at the samples of the chunk, tm is assumed
+        to be uniform (dt apart)."""
+        power = np.asarray(power, dtype=float)
+        n = len(power)
+        if n == 0:
+            return np.zeros(0)
+        size = 1 << int(np.ceil(np.log2(n + len(self.h) - 1)))
+        y = np.fft.irfft(np.fft.rfft(power, size) *
+                         np.fft.rfft(self.h, size), size)[:n + len(self.h)]
+        y[:len(self.tail)] += self.tail
+        self.tail = y[n:].copy()
+        result = np.concatenate([[self.previous], y[:n-1]])
+        self.previous = y[n-1]
+        return result
+
+    @property
+    def length(self):
+        return len(self.h)
+
+
+def _parse_rows(lines):
+    rows = [line.replace(",", " ").replace(";", " ") for line in lines
+            if line.lstrip()[:1] in tuple("0123456789+-.")]
+    return np.array(" ".join(rows).split(), dtype=float)
+
+
+def iter_power_profile(input_file, chunk_size=DEFAULT_CHUNK, dt=None):
+    """Read a power profile chunk by chunk, yields (tm, power) arrays.
+
+    The file is a CSV (commas, semicolons, tabs or spaces) or a .npy
+    array, memory mapped, of time [s] and power [W] columns; or of a
+    power column only when dt (sampling interval [s]) is given.
+    "#" rows and header rows are skipped.
+    """
+    columns = 1 if dt is not None else 2
+    offset = 0
+
+    def with_time(values):
+        values = values.reshape(-1, columns)
+        if dt is not None:
+            return (offset + np.arange(len(values))) * dt, values[:, 0]
+        return values[:, 0], values[:, 1]
+
+    if input_file.endswith(".npy"):
+        data = np.load(input_file, mmap_mode="r")
+        for start in range(0, len(data), chunk_size):
+            yield with_time(np.array(data[start:start+chunk_size],
+                                     dtype=float))
+            offset += chunk_size
+        return
+
+    with open(input_file, 'r', encoding="utf-8") as fileobj:
+        while True:
+            lines = list(itertools.islice(fileobj, chunk_size))
+            if lines == []:
+                return
+            values = _parse_rows(lines)
+            if len(values) % columns:
+                raise ValueError("error! profile rows need %d columns!" %
+                                 columns)
+            tm, power = with_time(values)
+            offset += len(power)
+            yield tm, power
+
+
+def simulate(chunks, simulator, ambient=0.0):
+    """Junction temperature under a power profile.
+
+    chunks yields (tm, power) arrays as iter_power_profile() does,
+    simulator is a FosterSimulator or a ConvolutionSimulator.  Yields
+    (tm, Tj) per chunk, Tj = ambient + temperature rise.
+    """
+    for tm, power in chunks:
+        yield tm, ambient + simulator.feed(tm, power)
@@ -0,0 +1,11 @@
+# # Small helpers shared by the converters
+# 2019/05/06 created by Tom HARA
+import datetime
+
+
+def timestamp():
+    """Time stamp used in the headers of the output files.
+
+    https://stackoverflow.com/questions/13890935/does-pythons-time-time-return-the-local-or-utc-timestamp
+    """
+    return str(datetime.datetime.now()).split('.')[0].replace(":", "-")
@@ -0,0 +1,120 @@
+# # Conversion result checks
+# 2019/05/06 created by Tom HARA
+import numpy as np
+
+from .cauer2foster import cauer_to_foster_numeric
+from .foster2cauer import foster_to_cauer_numeric
+from .frequency import freq_grid, network_impedance
+from .zth import zth_foster
+
+# errors reported by verify_conversion(), [K/W] and relative
+VERIFY_FIELDS = ["zth_abs", "zth_rel", "zjw_abs", "zjw_rel", "stage_rel"]
+
+
+def rsum_check(r_in, r_out, epsilon=1e-8):
+    """Resistance sum value check.
+
+    The total Rth of the input and the output networks must match.
+    Returns (Rin_all, Rout_all, ok).
+    """
+    Rin_all = sum(float(r) for r in r_in)
+    Rout_all = sum(float(r) for r in r_out)
+    res = abs(Rin_all - Rout_all)
+    return Rin_all, Rout_all, res <= epsilon
+
+
+def _max_error(value, reference):
+    """(max absolute, max relative) difference of value from reference."""
+    diff = np.abs(value - reference)
+    return float(np.max(diff)), float(np.max(diff / np.abs(reference)))
+
+
+def verify_conversion(c_list, r_list, ResultMat, direction, points=200,
+                      round_trip=False):
+    """Compare a network and its conversion result numerically.
+
+    Z(jw) of both networks is evaluated directly (see frequency.py) on
+    points log-spaced frequencies.  Zth(t) is compared on points time
+    points from min tau / 10 to max tau * 10; the Cauer network is taken
+    to Foster by the numeric engine for it.  With round_trip on, that
+    conversion (or the numeric conversion of the Foster network back to
+    Cauer for cauer2foster) is also compared stage by stage with the
+    input network.
+    Returns a dict of VERIFY_FIELDS, max absolute errors [K/W] and max
+    relative errors ("stage_rel" only with round_trip).
+    """
+    c_arr = np.asarray(c_list, dtype=float)
+    r_arr = np.asarray(r_list, dtype=float)
+    if direction == "foster2cauer":
+        FosterMat = np.column_stack([c_arr, r_arr, c_arr * r_arr])
+        CauerMat = np.asarray(ResultMat, dtype=float)
+    else:
+        CauerMat = np.column_stack([c_arr, r_arr, c_arr * r_arr])
+        FosterMat = np.asarray(ResultMat, dtype=float)
+    # the input network is the reference
+    foster_input = direction == "foster2cauer"
+
+    FosterMat_cauer = cauer_to_foster_numeric(CauerMat[:, 0], CauerMat[:, 1])
+    tau_arr = FosterMat[:, 2]
+    tm = np.logspace(np.log10(np.min(tau_arr) / 10),
+                     np.log10(np.max(tau_arr) * 10), points)
+    Zth = zth_foster(tm, FosterMat[:, 1], tau_arr)
+    Zth_cauer = zth_foster(tm, FosterMat_cauer[:, 1], FosterMat_cauer[:, 2])
+
+    freq = freq_grid(tau_arr, points)
+    Zjw = network_impedance(freq, FosterMat[:, 0], FosterMat[:, 1], True)
+    Zjw_cauer = network_impedance(freq, CauerMat[:, 0], CauerMat[:, 1],
+                                  False)
+
+    report = dict.fromkeys(VERIFY_FIELDS)
+    if foster_input:
+        report["zth_abs"], report["zth_rel"] = _max_error(Zth_cauer, Zth)
+        report["zjw_abs"], report["zjw_rel"] = _max_error(Zjw_cauer, Zjw)
+    else:
+        report["zth_abs"], report["zth_rel"] = _max_error(Zth, Zth_cauer)
+        report["zjw_abs"], report["zjw_rel"] = _max_error(Zjw, Zjw_cauer)
+
+    if round_trip:
+        if foster_input:
+            order = np.argsort(FosterMat[:, 2])
+            report["stage_rel"] = _max_error(FosterMat_cauer[:, 1:],
+                                             FosterMat[order, 1:])[1]
+        else:
+            CauerMat_back = foster_to_cauer_numeric(FosterMat[:, 0],
+                                                    FosterMat[:, 1])
+            report["stage_rel"] = _max_error(CauerMat_back[:, :2],
+                                             CauerMat[:, :2])[1]
+    return report
+
+
+def verify_ok(report, tolerance=1e-6):
+    """True when every relative error of verify_conversion() is within
+    tolerance."""
+    return all(report[key] <= tolerance for key in VERIFY_FIELDS
+               if key.endswith("_rel") and report[key] is not None)
+
+
+def format_verify(report):
+    """One line summary of verify_conversion()."""
+    text = "Zth error = %g K/W (%g), Z(jw) error = %g K/W (%g)" % \
+        (report["zth_abs"], report["zth_rel"], report["zjw_abs"],
+         report["zjw_rel"])
+    if report["stage_rel"] is not None:
+        text += ", round trip stage error = %g" % report["stage_rel"]
+    return text
+
+
+def add_verify_arguments(parser):
+    """Verification flags shared by Foster2Cauer.py and Cauer2Foster.py."""
+    parser.add_argument('--no_verify',
+                        help='skip the comparison of Zth(t) and Z(jw) of ' +
+                        'the input and the output networks',
+                        action='store_true')
+    parser.add_argument('--round_trip',
+                        help='also convert the result back with the ' +
+                        'numeric engine and compare the stages',
+                        action='store_true')
+    parser.add_argument('--tolerance',
+                        help='largest relative error of the verification ' +
+                        '(default: 1e-6), exit status is 1 beyond it',
+                        action='store', type=float, default=1e-6)
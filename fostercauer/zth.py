@@ -0,0 +1,112 @@
+# # Zth(t) curve of a Foster network
+# 2019/05/06 created by Tom HARA
+import math
+
+import numpy as np
+
+
+def time_grid(tau_arr, points=50, t_min=1e-6, t_max=None):
+    """Log-spaced time points for a Zth curve.
+
+    By default the time range is up to max Tau * 10 sec, rounded up to a
+    power of ten.
+    """
+    if t_max is None:
+        t_max = 10**math.ceil(math.log10(np.max(tau_arr) * 10))
+    return np.logspace(math.log10(t_min), math.log10(t_max), points)
+
+
+def zth_foster(tm, r_arr, tau_arr, each=False):
+    """Zth(t) = sum_i R_i (1 - exp(-t/tau_i)) of a Foster network.
+
+    Evaluated as a single (stages x time) broadcast.  Returns Zth at the
+    time points tm, or (Zth, Zth_each) with the (stages, len(tm)) array of
+    the curves of each stage when each is True.
+    """
+    tm = np.asarray(tm, dtype=float)
+    r_arr = np.asarray(r_arr, dtype=float)
+    tau_arr = np.asarray(tau_arr, dtype=float)
+
+    Zth_each = -r_arr[:, None] * np.expm1(-tm[None, :] / tau_arr[:, None])
+    Zth = Zth_each.sum(axis=0)
+    if each:
+        return Zth, Zth_each
+    return Zth
+
+
+def plot_zth(tm, Zth, Zth_each=None, prefix="OutputC2F_", save_graph=True,
+             show_graph=False, stamp=None):
+    """Plot a Zth curve in semilog and loglog scale.
+
+    When save_graph is on, the graphs are saved as
+    prefix + stamp + "_semilog.png" and "_loglog.png".
+    Returns the list of saved filenames.
+    """
+    import matplotlib
+    if not show_graph:
+        # headless backend, no GUI toolkit is loaded
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from .utils import timestamp
+
+    stamp = stamp or timestamp()
+    saved = list()
+
+    for scale in ("semilog", "loglog"):
+        plt.figure()
+        plot = plt.semilogx if scale == "semilog" else plt.loglog
+
+        plot(tm, Zth, label='Zth')
+        if Zth_each is not None:
+            for j in range(len(Zth_each)):
+                plot(tm, Zth_each[j], label="Zth_" + str(j+1))
+        plt.legend()
+        plt.xlabel('Time[log(t)]')
+        plt.ylabel("Rth[K/W]")
+
+        if save_graph:
+            filename = prefix + stamp + "_" + scale + ".png"
+            plt.savefig(filename)
+            saved.append(filename)
+
+        if show_graph:
+            plt.show()
+        plt.close()
+
+    return saved
+
+
+def add_graph_arguments(parser):
+    """Zth graph flags shared by Foster2Cauer.py and Cauer2Foster.py."""
+    parser.add_argument('-g', '--save_graph',
+                        help='save Zth graph image generated by ' +
+                        'matplotlib (.png)',
+                        action='store_true')
+    parser.add_argument('-s', '--show_graph',
+                        help='show Zth graph image generated by ' +
+                        'matplotlib (.png)',
+                        action='store_true')
+    parser.add_argument('--points',
+                        help='number of time points of the Zth graph ' +
+                        '(default: 50)',
+                        action='store', type=int, default=50)
+    parser.add_argument('--t_min',
+                        help='start time of the Zth graph [s] ' +
+                        '(default: 1e-6)',
+                        action='store', type=float, default=1e-6)
+    parser.add_argument('--t_max',
+                        help='end time of the Zth graph [s] ' +
+                        '(default: max Tau * 10)',
+                        action='store', type=float, default=None)
+
+
+def draw_zth(args, r_arr, tau_arr, prefix):
+    """Draw the Zth graph of a Foster network if -g or -s is given."""
+    # either of the graph setting is on, it's on
+    if not (args.save_graph or args.show_graph):
+        return []
+
+    tm = time_grid(tau_arr, args.points, args.t_min, args.t_max)
+    Zth, Zth_each = zth_foster(tm, r_arr, tau_arr, each=True)
+    return plot_zth(tm, Zth, Zth_each, prefix, args.save_graph,
+                    args.show_graph)
@@ -0,0 +1,52 @@
+# # myCR data format to bulk file converter
+# 2019/05/06 created by Tom HARA
+import argparse
+import sys
+
+from fostercauer import __version__
+from fostercauer.batch import collect_inputs
+from fostercauer.bulk import iter_mycr_records, write_bulk
+
+# version of this script
+myVersion = __version__
+
+##############################################################################
+# arg parsing
+##############################################################################
+parser = argparse.ArgumentParser(
+    prog='myCRformat2Bulk.py',
+    usage='Pack many myCR data format files into one bulk file (.npz).',
+    epilog='end',
+    add_help=True
+    )
+
+parser.add_argument('input_source', help='specify a directory, a manifest ' +
+                    'file (one filename per row) or a glob pattern',
+                    action='store', type=str)
+parser.add_argument('output_file', help='specify output filename (.npz)',
+                    action='store', type=str)
+parser.add_argument('-t', '--topology',
+                    help='network type of the input files',
+                    action='store', choices=['foster', 'cauer'], default="")
+
+parser.add_argument('--version', action='version',
+                    version='%(prog)s ' + myVersion)
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+
+    input_files = collect_inputs(args.input_source)
+    if input_files == []:
+        print("no input files: " + args.input_source)
+        return 1
+    print("files = " + str(len(input_files)))
+
+    write_bulk(args.output_file,
+               (record for input_file in input_files
+                for record in iter_mycr_records(input_file, args.topology)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,18 @@
-# # Spice SubCircuit format to myCR data format converter
+# # myCR data format to Spice SubCircuit format converter
 # 2019/05/06 created by Tom HARA
 import argparse
-import datetime
+import sys
+import time
+
+from fostercauer import __version__, read_mycr, write_spice
+from fostercauer.batch import collect_inputs
+from fostercauer.bulk import BulkFile, select_networks
+from fostercauer.library import LANGUAGES, write_library
+from fostercauer.mycr import iter_mycr_named
+from fostercauer.spice import SPICE_DIALECTS
 
 # version of this script
-myVersion = '0.0.01'
+myVersion = __version__
 
 ##############################################################################
 # arg parsing
@@ -16,7 +24,8 @@ parser = argparse.ArgumentParser(
     add_help=True
     )
 
-parser.add_argument('input_file', help='specify input filename',
+parser.add_argument('input_file', help='specify input filename ' +
+                    '(.npz for a bulk file of many networks)',
                     action='store', type=str)
 parser.add_argument('output_file', help='specify output filename',
                     action='store', type=str)
@@ -24,83 +33,68 @@ parser.add_argument('-f', '--FosterNetwork',
                     help='consider input file as Foster ' +
                     'network. Default: Cauer Network.',
                     action='store_true')
+parser.add_argument('-b', '--batch',
+                    help='input_file is a directory, a manifest file ' +
+                    '(one filename per row) or a glob pattern, all the ' +
+                    'networks are written to one library',
+                    action='store_true')
+parser.add_argument('-n', '--name',
+                    help='networks of a bulk file to export, wildcards ' +
+                    'allowed (repeatable, default: all)',
+                    action='append', default=None)
+parser.add_argument('-d', '--dialect',
+                    help='Spice dialect of the library (default: spice, ' +
+                    'as the single network output)',
+                    action='store', choices=sorted(SPICE_DIALECTS),
+                    default=None)
+parser.add_argument('-L', '--language',
+                    help='library language (default: spice)',
+                    action='store', choices=LANGUAGES, default="spice")
 
 parser.add_argument('--version', action='version',
                     version='%(prog)s ' + myVersion)
 
-args = parser.parse_args()
 
-# Input file and output file:
-input_file = args.input_file
-output_file = args.output_file
-isFoster = args.FosterNetwork
-cauerOrFoster = "FOSTER" if isFoster else "CAUER"
-
-##############################################################################
+def iter_networks(args):
+    """(name, c_arr, r_arr, foster) of the input networks of a library.
+    Networks of a bulk file are Foster when their topology says so."""
+    if args.input_file.endswith(".npz"):
+        bulk = BulkFile(args.input_file)
+        for i in select_networks(bulk, args.name):
+            meta = bulk.metadata(i)
+            c_arr, r_arr = bulk.network_text(i)
+            foster = meta["topology"] == "foster" or \
+                (meta["topology"] == "" and args.FosterNetwork)
+            yield meta["name"], c_arr, r_arr, foster
+        return
 
-"""
-https://stackoverflow.com/questions/13890935/does-pythons-time-time-return-the-local-or-utc-timestamp
-"""
-# time stamp when the script started.
-timestamp = str(datetime.datetime.now()).split('.')[0].replace(":", "-")
+    input_files = collect_inputs(args.input_file) if args.batch \
+        else [args.input_file]
+    for input_file in input_files:
+        for name, c_arr, r_arr, _ in iter_mycr_named(input_file):
+            yield name, c_arr, r_arr, args.FosterNetwork
 
-with open(input_file, 'r', encoding="utf-8") as fileobj:
-    datastr = fileobj.read()         # read all data from a file
-    adatastr = datastr.rstrip()      # remove the last "\n"
-    datalist = adatastr.split("\n")  # create a list (size: n row * 1 column)
 
-c_list = list()                      # a list for foster network Cth
-r_list = list()                      # a list for foster network Rth
+def main(argv=None):
+    args = parser.parse_args(argv)
 
-for line in datalist:                # read one row at a time
-    tmplist = line.split()           # split a row into a list
-    # print(tmplist)
-    if tmplist == []:                # skip empty rows
-        continue
-    if tmplist[0][0] == '#':         # skip comment rows
-        continue
-    if tmplist[0][0:6] == "STAGES":  # number of RC stages
-        stages = int(tmplist[1])
-        print("stages = " + str(stages))
-        continue
-    # start reading actual data
-    # (1st column is stage number)
-    c_list.append(float(tmplist[1]))        # Cth on the 2nd column
-    r_list.append(float(tmplist[2]))        # Rth on the 3rd column
+    if not (args.batch or args.input_file.endswith(".npz") or
+            args.dialect or args.language != "spice"):
+        c_list, r_list = read_mycr(args.input_file)
+        print("stages = " + str(len(c_list)))
 
-with open(output_file, "w") as fileobj:
-    tmpstring = ""
-    # header
-    tmpstring = "***************************************************\n"
-    fileobj.write(tmpstring)
-    tmpstring = "* myCR data format to Spice SubCircuit format\n"
-    fileobj.write(tmpstring)
-    tmpstring = "* Created: " + timestamp + "\n"
-    fileobj.write(tmpstring)
-    tmpstring = "* First stage (C1 and R1) is connected to Junction.\n"
-    fileobj.write(tmpstring)
-    tmpstring = "***************************************************\n"
-    fileobj.write(tmpstring)
+        write_spice(args.output_file, c_list.astype(float),
+                    r_list.astype(float), foster=args.FosterNetwork)
+        return 0
 
-    tmpstring = ".SUBCKT " + cauerOrFoster + " 1 " + str(stages+1) + "\n"
-    fileobj.write(tmpstring)
+    time_start = time.perf_counter()
+    names = write_library(args.output_file, iter_networks(args),
+                          args.language, args.dialect or "spice")
+    time_end = time.perf_counter()
+    print("networks = %d, time = %.3f sec" % (len(names),
+                                              time_end - time_start))
+    return 0
 
-    if isFoster:
-        for i in range(stages):
-            tmpstring = "C" + str(i+1) + " " + str(i+1) + " " + \
-                        str(i+2) + " " + str(c_list[i]) + "\n"
-            fileobj.write(tmpstring)
-            tmpstring = "R" + str(i+1) + " " + str(i+1) + " " + \
-                        str(i+2) + " " + str(r_list[i]) + "\n"
-            fileobj.write(tmpstring)
-    else:  # Cauer network, as default
-        for i in range(stages):
-            tmpstring = "C" + str(i+1) + " " + str(i+1) + " " + \
-                        "0 " + str(c_list[i]) + "\n"
-            fileobj.write(tmpstring)
-            tmpstring = "R" + str(i+1) + " " + str(i+1) + " " + \
-                        str(i+2) + " " + str(r_list[i]) + "\n"
-            fileobj.write(tmpstring)
 
-    tmpstring = ".ENDS " + cauerOrFoster + "\n"
-    fileobj.write(tmpstring)
+if __name__ == '__main__':
+    sys.exit(main())
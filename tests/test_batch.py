@@ -0,0 +1,106 @@
+import csv
+import os
+
+import numpy as np
+import pytest
+
+import Foster2Cauer
+from fostercauer import foster_to_cauer, read_mycr, write_mycr
+from fostercauer.batch import SUMMARY_FIELDS, collect_inputs, run_batch
+
+
+def write_inputs(directory, count):
+    """count Foster networks of 2, 3, 4... stages, sorted by name."""
+    os.makedirs(directory, exist_ok=True)
+    networks = dict()
+    for k in range(count):
+        stages = k + 2
+        c_list = [repr(0.5 * 10.0 ** (i - k)) for i in range(stages)]
+        r_list = [repr(0.1 * (i + 1)) for i in range(stages)]
+        input_file = os.path.join(directory, "net%02d.txt" % k)
+        write_mycr(input_file, c_list, r_list)
+        networks[input_file] = (c_list, r_list)
+    return networks
+
+
+def test_collect_inputs(tmp_path):
+    input_dir = str(tmp_path / "in")
+    networks = write_inputs(input_dir, 3)
+    names = sorted(networks)
+    assert collect_inputs(input_dir) == names
+    assert collect_inputs(os.path.join(input_dir, "net0[02].txt")) == \
+        [names[0], names[2]]
+
+    manifest = tmp_path / "in" / "manifest.lst"
+    manifest.write_text("# manifest\n\nnet02.txt\n  net00.txt\n")
+    assert collect_inputs(str(manifest)) == [names[2], names[0]]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_converts_in_order(tmp_path, workers):
+    networks = write_inputs(str(tmp_path / "in"), 4)
+    input_files = sorted(networks, reverse=True)
+    output_dir = str(tmp_path / "out")
+    results = run_batch(input_files, output_dir, "foster2cauer", "numeric",
+                        workers=workers, chunksize=1)
+
+    assert [result["input_file"] for result in results] == input_files
+    for result in results:
+        c_list, r_list = networks[result["input_file"]]
+        assert result["status"] == "ok"
+        assert result["stages"] == len(c_list)
+        assert result["rsum_ok"] is True and result["verify_ok"] is True
+        assert result["output_file"] == os.path.join(
+            output_dir, os.path.basename(result["input_file"]))
+        c_c, r_c = read_mycr(result["output_file"], numeric=True)
+        expected = foster_to_cauer(c_list, r_list, "numeric")
+        assert np.allclose(c_c, expected[:, 0], rtol=1e-12)
+        assert np.allclose(r_c, expected[:, 1], rtol=1e-12)
+
+
+def test_run_batch_rejects_same_names(tmp_path):
+    first = write_inputs(str(tmp_path / "a"), 1)
+    second = write_inputs(str(tmp_path / "b"), 1)
+    with pytest.raises(ValueError, match="not unique"):
+        run_batch(list(first) + list(second), str(tmp_path / "out"),
+                  "foster2cauer", "numeric", workers=1)
+
+
+def test_batch_script_summary(tmp_path, capsys):
+    input_dir = str(tmp_path / "in")
+    networks = write_inputs(input_dir, 3)
+    bad_file = os.path.join(input_dir, "net99.txt")
+    with open(bad_file, "w") as fileobj:
+        fileobj.write("STAGES=\t2\n1\t1e-3\t0.5\n")
+    output_dir = str(tmp_path / "out")
+
+    assert Foster2Cauer.main([input_dir, output_dir, "-n", "-b",
+                              "-j", "2"]) == 1
+    out = capsys.readouterr().out
+    assert "files = 4" in out
+    assert "converted = 3, failed = 1, Rsum mismatch = 0, " + \
+        "verification error = 0" in out
+
+    with open(os.path.join(output_dir, "summary.csv"), newline="") as \
+            fileobj:
+        reader = csv.DictReader(fileobj)
+        assert reader.fieldnames == SUMMARY_FIELDS
+        rows = list(reader)
+    assert [row["input_file"] for row in rows] == \
+        sorted(networks) + [bad_file]
+    for row in rows[:3]:
+        c_list, r_list = networks[row["input_file"]]
+        assert row["status"] == "ok"
+        assert row["stages"] == str(len(c_list))
+        assert row["rsum_ok"] == "True" and row["verify_ok"] == "True"
+        assert float(row["Rin_all"]) == pytest.approx(
+            float(row["Rout_all"]), rel=1e-12)
+        assert float(row["Rin_all"]) == pytest.approx(
+            sum(float(r) for r in r_list), rel=1e-12)
+        assert float(row["zth_rel"]) <= 1e-6
+        assert row["cache"] == ""
+        assert float(row["seconds"]) >= 0
+    assert rows[3]["status"].startswith("error: ")
+    assert "# of rows" in rows[3]["status"]
+    assert rows[3]["stages"] == ""
+    assert not os.path.exists(os.path.join(output_dir, "net99.txt"))
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+import Bulk2myCRformat
+import myCRformat2Bulk
+from fostercauer import read_mycr
+from fostercauer.bulk import BulkFile, write_bulk
+
+MYCR = """STAGES=	3
+# stage	C	R
+1	1.00E-06	5.00E-02
+2	0.1	0.7
+3	2.5e3	4
+"""
+
+
+def write_inputs(tmp_path):
+    inputs = list()
+    for directory in ("a", "b"):
+        os.makedirs(tmp_path / directory)
+        inputs.append(str(tmp_path / directory / "TH.txt"))
+        with open(inputs[-1], "w") as fileobj:
+            fileobj.write(MYCR)
+    manifest = str(tmp_path / "manifest.txt")
+    with open(manifest, "w") as fileobj:
+        fileobj.write("\n".join(inputs) + "\n")
+    return manifest
+
+
+def test_round_trip_keeps_the_text(tmp_path):
+    manifest = write_inputs(tmp_path)
+    bulk_file = str(tmp_path / "models.npz")
+    assert myCRformat2Bulk.main([manifest, bulk_file]) == 0
+    out_dir = str(tmp_path / "out")
+    assert Bulk2myCRformat.main([bulk_file, out_dir]) == 0
+
+    # the second TH.txt doesn't overwrite the first one
+    assert sorted(os.listdir(out_dir)) == ["TH.txt", "TH_2.txt"]
+    for name in ("TH.txt", "TH_2.txt"):
+        c_arr, r_arr = read_mycr(os.path.join(out_dir, name))
+        assert list(c_arr) == ["1.00E-06", "0.1", "2.5e3"]
+        assert list(r_arr) == ["5.00E-02", "0.7", "4"]
+
+
+def test_networks_are_views_of_the_arrays(tmp_path):
+    bulk_file = str(tmp_path / "models.npz")
+    rng = np.random.default_rng(0)
+    records = [{"name": "N%d" % k, "c": rng.uniform(1, 2, k + 1),
+                "r": rng.uniform(1, 2, k + 1)} for k in range(5)]
+    write_bulk(bulk_file, records)
+    bulk = BulkFile(bulk_file)
+    assert len(bulk) == 5
+    for k, record in enumerate(records):
+        c_arr, r_arr = bulk.network(bulk.index("N%d" % k))
+        assert np.array_equal(c_arr, record["c"])
+        assert np.array_equal(r_arr, record["r"])
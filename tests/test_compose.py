@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+
+import ComposeNetwork
+from fostercauer import compose, foster_to_cauer, read_mycr, write_mycr
+from fostercauer.cache import ConversionCache
+from fostercauer.compose import Composition
+from fostercauer.frequency import freq_grid, network_impedance
+
+DIE = ([1e-6, 1e-5], [0.05, 0.1])                     # Foster
+PACKAGE = ([2e-4, 1e-3, 5e-3], [0.2, 0.3, 0.1])       # Cauer
+TIM = ([3e-2], [0.4])                                 # Foster
+HEATSINK = ([1.0, 20.0], [0.5, 1.2])                  # Cauer
+
+
+@pytest.fixture
+def converted(monkeypatch):
+    """Foster sections passed to convert_network(), in order."""
+    calls = list()
+
+    def spy(c_list, r_list, *args):
+        calls.append(list(c_list))
+        return convert_network(c_list, r_list, *args)
+
+    convert_network = compose.convert_network
+    monkeypatch.setattr(compose, "convert_network", spy)
+    return calls
+
+
+def path(method="numeric", cache=None):
+    composition = Composition(method, cache=cache)
+    composition.add_section(*DIE, foster=True, name="die")
+    composition.add_section(*PACKAGE, name="package")
+    composition.add_section(*TIM, foster=True, name="tim")
+    composition.add_section(*HEATSINK, name="heatsink")
+    return composition
+
+
+def test_ladder_is_the_concatenation():
+    composition = path()
+    assert len(composition) == 4
+    assert composition.names == ["die", "package", "tim", "heatsink"]
+    assert list(composition.offsets()) == [0, 2, 5, 6, 8]
+    CauerMat = composition.cauer()
+    assert np.array_equal(CauerMat[:2], foster_to_cauer(*DIE, "numeric"))
+    assert np.array_equal(CauerMat[2:5, :2], np.column_stack(PACKAGE))
+    assert np.array_equal(CauerMat[5:6], foster_to_cauer(*TIM, "numeric"))
+    assert np.array_equal(CauerMat[:, 2], CauerMat[:, 0] * CauerMat[:, 1])
+    for i in range(4):
+        start, stop = composition.offsets()[i:i+2]
+        assert np.array_equal(composition.section(i), CauerMat[start:stop])
+
+
+def test_foster_network_of_the_path():
+    composition = path()
+    CauerMat = composition.cauer()
+    FosterMat = composition.foster()
+    assert FosterMat.shape == (8, 3)
+    assert np.sum(FosterMat[:, 1]) == pytest.approx(
+        sum(DIE[1] + PACKAGE[1] + TIM[1] + HEATSINK[1]), rel=1e-12)
+    freq = freq_grid(FosterMat[:, 2], 100)
+    Z_ladder = network_impedance(freq, CauerMat[:, 0], CauerMat[:, 1], False)
+    Z_foster = network_impedance(freq, FosterMat[:, 0], FosterMat[:, 1])
+    assert np.max(np.abs(Z_foster - Z_ladder) / np.abs(Z_ladder)) < 1e-9
+    assert composition.foster() is FosterMat
+
+
+def test_set_section_reconverts_one_section(converted):
+    composition = path()
+    assert composition.conversions == 2
+    assert converted == [DIE[0], TIM[0]]
+    ladders = [composition.section(i) for i in range(4)]
+    FosterMat = composition.foster()
+
+    new_tim = ([5e-2], [0.3])
+    composition.set_section(2, *new_tim, foster=True)
+    assert composition.conversions == 3
+    assert converted == [DIE[0], TIM[0], new_tim[0]]
+    for i in (0, 1, 3):
+        assert composition.section(i) is ladders[i]
+    assert np.array_equal(composition.section(2),
+                          foster_to_cauer(*new_tim, "numeric"))
+    assert composition.names[2] == "tim"
+    assert composition.foster() is not FosterMat
+    assert np.sum(composition.foster()[:, 1]) == pytest.approx(
+        sum(DIE[1] + PACKAGE[1] + new_tim[1] + HEATSINK[1]), rel=1e-12)
+
+    # a Cauer section is taken as it is
+    composition.set_section(0, [1e-6], [0.15], name="die2")
+    assert composition.conversions == 3
+    assert len(converted) == 3
+    assert composition.names[0] == "die2"
+    assert list(composition.offsets()) == [0, 1, 4, 5, 7]
+
+
+def test_cache_hits_are_conversions(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"), 1 << 20)
+    path(cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    composition = path(cache=cache)
+    assert composition.conversions == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_invalid_sections():
+    composition = Composition("numeric")
+    with pytest.raises(ValueError, match="no section"):
+        composition.cauer()
+    with pytest.raises(ValueError, match="different size"):
+        composition.add_section([1.0, 2.0], [1.0])
+    with pytest.raises(ValueError, match="no stages"):
+        composition.add_section([], [], foster=True)
+    assert len(composition) == 0 and composition.conversions == 0
+
+
+def test_section_type():
+    assert ComposeNetwork.section_type("a.txt") == ("a.txt", False)
+    assert ComposeNetwork.section_type("a.txt", True) == ("a.txt", True)
+    assert ComposeNetwork.section_type("cauer:a.txt", True) == \
+        ("a.txt", False)
+    assert ComposeNetwork.section_type("foster:c:/a.txt") == \
+        ("c:/a.txt", True)
+
+
+def test_compose_script(tmp_path, capsys):
+    names = list()
+    for name, (c_list, r_list) in (("die", DIE), ("package", PACKAGE),
+                                   ("tim", TIM), ("heatsink", HEATSINK)):
+        names.append(str(tmp_path / (name + ".txt")))
+        write_mycr(names[-1], c_list, r_list)
+    output_file = str(tmp_path / "path_foster.txt")
+    cauer_file = str(tmp_path / "path_cauer.txt")
+    argv = ["-n", "-C", cauer_file, "foster:" + names[0], names[1],
+            "foster:" + names[2], names[3], output_file]
+    assert ComposeNetwork.main(argv) == 0
+    out = capsys.readouterr().out
+    assert "section 1: " + names[0] + ", foster, stages = 2" in out
+    assert "section 2: " + names[1] + ", cauer, stages = 3" in out
+    assert "stages = 8" in out
+
+    c_c, r_c = read_mycr(cauer_file, numeric=True)
+    CauerMat = path().cauer()
+    assert np.allclose(c_c, CauerMat[:, 0], rtol=1e-15)
+    assert np.allclose(r_c, CauerMat[:, 1], rtol=1e-15)
+    c_f, r_f = read_mycr(output_file, numeric=True)
+    assert np.allclose(r_f, path().foster()[:, 1], rtol=1e-15)
+    with open(output_file) as fileobj:
+        assert "# Sections: die.txt, package.txt, tim.txt, heatsink.txt" \
+            in fileobj.read()
@@ -0,0 +1,60 @@
+import functools
+import math
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from fostercauer import exact
+from fostercauer.foster2cauer import foster_to_cauer
+
+
+def foster_network(stages):
+    """Foster network of decimal strings, tau from 1e-6 s to 100 s."""
+    rng = np.random.default_rng(stages)
+    tau = np.logspace(-6, 2, stages) * rng.uniform(0.5, 2.0, stages)
+    r_list = ["%.4e" % r for r in rng.uniform(0.05, 2.0, stages)]
+    c_list = ["%.4e" % (t / float(r)) for t, r in zip(tau, r_list)]
+    return c_list, r_list
+
+
+@functools.lru_cache(maxsize=None)
+def symbolic_result(stages):
+    return foster_to_cauer(*foster_network(stages), method="symbolic",
+                           rational_rth=True)
+
+
+@pytest.fixture(params=["python", "gmpy2"])
+def integers(request, monkeypatch):
+    """Big integers of the exact engine: the pure-Python fallback, or
+    gmpy2 when installed."""
+    if request.param == "gmpy2":
+        gmpy2 = pytest.importorskip("gmpy2")
+        monkeypatch.setattr(exact, "_integer", gmpy2.mpz)
+        monkeypatch.setattr(exact, "_gcd", gmpy2.gcd)
+    else:
+        monkeypatch.setattr(exact, "_integer", int)
+        monkeypatch.setattr(exact, "_gcd", math.gcd)
+    return request.param
+
+
+@pytest.mark.parametrize("stages", [3, 6, 10, 15])
+def test_exact_equals_symbolic_bitwise(integers, stages):
+    CauerMat = foster_to_cauer(*foster_network(stages), method="exact")
+    assert CauerMat.dtype == symbolic_result(stages).dtype
+    assert CauerMat.tobytes() == symbolic_result(stages).tobytes()
+
+
+def test_exact_fractions_of_two_stages(integers):
+    # Zfall = 1 / (1 + s) + 1 / (1 + 2 s)
+    #       = (2 + 3 s) / (1 + 3 s + 2 s^2)
+    # Y = 1 / Zfall = 2/3 s + 1 / (9/5 + 1 / (25/3 s + 1 / (1/5)))
+    rows = exact.cauer_fractions(["1", "2"], ["1", "1"])
+    assert rows == [(Fraction(2, 3), Fraction(9, 5), Fraction(6, 5)),
+                    (Fraction(25, 3), Fraction(1, 5), Fraction(5, 3))]
+    assert all(type(x) is Fraction for row in rows for x in row)
+
+
+def test_repeated_time_constants(integers):
+    with pytest.raises(ValueError, match="repeated time constants"):
+        exact.cauer_fractions(["1", "2"], ["2", "1"])
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import Zth2Foster
+from fostercauer import read_mycr
+from fostercauer.fit import fit_error, fit_foster, merge_stages, nnls, \
+    read_zth_csv
+from fostercauer.zth import zth_foster
+
+R_LIST = [0.2, 0.5, 1.3]
+TAU_LIST = [1e-4, 1e-2, 1.0]
+
+
+def measured(points=200):
+    tm = np.logspace(-6, 2, points)
+    return tm, zth_foster(tm, R_LIST, TAU_LIST)
+
+
+def test_nnls_recovers_a_sparse_solution():
+    rng = np.random.default_rng(1)
+    A = rng.uniform(0.0, 1.0, (30, 8))
+    x_true = np.array([0.0, 1.5, 0.0, 0.0, 2.0, 0.25, 0.0, 3.0])
+    x = nnls(A, A @ x_true)
+    assert np.allclose(x, x_true, atol=1e-10)
+    assert np.all(x[x_true == 0] == 0.0)
+
+
+def test_nnls_kkt_conditions():
+    rng = np.random.default_rng(2)
+    A = rng.normal(size=(20, 10))
+    b = rng.normal(size=20)
+    x = nnls(A, b)
+    w = A.T @ (b - A @ x)                # minus the gradient
+    assert np.all(x >= 0)
+    assert np.all(w <= 1e-10)            # no descent direction left
+    assert np.allclose(w[x > 0], 0.0, atol=1e-10)
+
+    # the unconstrained optimum is returned when it is positive
+    b = A @ np.linspace(1.0, 2.0, 10)
+    assert np.allclose(nnls(A, b), np.linspace(1.0, 2.0, 10), atol=1e-10)
+
+
+def test_merge_stages():
+    r_grid = np.array([0.0, 1.0, 3.0, 0.0, 2.0, 0.0])
+    tau_grid = np.array([1e-3, 1e-2, 1e-1, 1.0, 10.0, 100.0])
+    r_arr, tau_arr = merge_stages(r_grid, tau_grid)
+    assert np.allclose(r_arr, [4.0, 2.0])
+    # R-weighted geometric mean of 1e-2 and 1e-1
+    assert np.allclose(tau_arr, [10.0 ** -1.25, 10.0])
+
+    r_arr, tau_arr = merge_stages(r_grid, tau_grid, stages=1)
+    assert np.allclose(r_arr, [6.0])
+    assert np.allclose(tau_arr, [10.0 ** ((4 * -1.25 + 2 * 1) / 6)])
+
+
+@pytest.mark.parametrize("relative", [True, False])
+def test_fit_recovers_a_known_network(relative):
+    tm, zth = measured()
+    FosterMat = fit_foster(tm, zth, stages=3, relative=relative)
+    assert FosterMat.shape == (3, 3)
+    assert np.allclose(FosterMat[:, 1], R_LIST, rtol=1e-6)
+    assert np.allclose(FosterMat[:, 2], TAU_LIST, rtol=1e-6)
+    assert np.allclose(FosterMat[:, 0], FosterMat[:, 2] / FosterMat[:, 1])
+    rms, worst = fit_error(tm, zth, FosterMat)
+    assert worst < 1e-6 * sum(R_LIST) and rms <= worst
+
+
+def test_fit_keeps_the_total_rth():
+    tm, zth = measured()
+    zth = zth * (1 + 1e-3 * np.sin(np.arange(len(tm))))   # noisy curve
+    FosterMat = fit_foster(tm, zth, stages=3, r_total=2.0)
+    assert np.sum(FosterMat[:, 1]) == pytest.approx(2.0, rel=1e-12)
+    assert np.all(np.diff(FosterMat[:, 2]) > 0)
+
+
+def test_read_zth_csv(tmp_path):
+    input_file = tmp_path / "zth.csv"
+    input_file.write_text("# measured\ntime;Zth\n1e-2; 0.5\n1e-3,0.1\n\n" +
+                          "1\t1.9\n")
+    tm, zth = read_zth_csv(str(input_file))
+    assert np.array_equal(tm, [1e-3, 1e-2, 1.0])
+    assert np.array_equal(zth, [0.1, 0.5, 1.9])
+
+    input_file.write_text("time,Zth\n")
+    with pytest.raises(ValueError, match="no Zth data"):
+        read_zth_csv(str(input_file))
+
+
+def test_zth2foster_script(tmp_path, capsys):
+    tm, zth = measured(120)
+    input_file = tmp_path / "zth.csv"
+    input_file.write_text("time,Zth\n" + "".join(
+        "%r,%r\n" % (float(t), float(z)) for t, z in zip(tm, zth)))
+    output_file = str(tmp_path / "foster.txt")
+    assert Zth2Foster.main([str(input_file), output_file, "-N", "3"]) == 0
+    out = capsys.readouterr().out
+    assert "points = 120" in out and "stages = 3" in out
+    c_arr, r_arr = read_mycr(output_file, numeric=True)
+    assert np.allclose(r_arr, R_LIST, rtol=1e-6)
+    assert np.allclose(c_arr * r_arr, TAU_LIST, rtol=1e-6)
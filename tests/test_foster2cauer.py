@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from fostercauer import foster_to_cauer
+from fostercauer.foster2cauer import foster_to_cauer_batch
+
+
+def foster_network(stages, seed):
+    """Decimal strings of a Foster network, time constants spread over
+    six decades in random order."""
+    rng = np.random.default_rng(seed)
+    tau = 10**rng.uniform(-4, 2, stages)
+    r = rng.uniform(0.01, 1, stages)
+    return (np.array(["%.4e" % c for c in tau / r]),
+            np.array(["%.4e" % x for x in r]))
+
+
+def ordered(c_list, r_list, order):
+    tau = c_list.astype(float) * r_list.astype(float)
+    if order == "ascending":
+        index = np.argsort(tau)
+    elif order == "descending":
+        index = np.argsort(-tau)
+    else:
+        index = np.arange(len(tau))
+    return c_list[index], r_list[index]
+
+
+@pytest.mark.parametrize("stages", [1, 2, 5, 8, 12])
+@pytest.mark.parametrize("order", ["ascending", "descending", "random"])
+def test_numeric_matches_symbolic(stages, order):
+    c_list, r_list = ordered(*foster_network(stages, stages), order)
+    CauerMat = foster_to_cauer(c_list, r_list, "symbolic", True)
+    CauerMat_numeric = foster_to_cauer(c_list, r_list, "numeric")
+    assert np.max(np.abs(CauerMat_numeric - CauerMat) /
+                  CauerMat) < 1e-12
+
+
+def test_batch_matches_numeric():
+    networks = [foster_network(8, seed) for seed in range(5)]
+    c_arr = np.array([c for c, _ in networks], dtype=float)
+    r_arr = np.array([r for _, r in networks], dtype=float)
+    CauerMat = foster_to_cauer_batch(c_arr, r_arr)
+    for i in range(len(networks)):
+        reference = foster_to_cauer(c_arr[i], r_arr[i], "numeric")
+        assert np.max(np.abs(CauerMat[i] - reference) / reference) < 1e-13
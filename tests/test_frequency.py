@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+import Impedance
+from fostercauer import foster_to_cauer, write_mycr
+from fostercauer.frequency import bode, freq_grid, impedance_error, \
+    network_impedance, write_impedance, z_cauer, z_foster
+from fostercauer.structure import stack_networks
+
+C_LIST = [1e-6, 1.1e-3, 0.5, 2.0]
+R_LIST = [0.05, 0.7, 4.0, 1.5]
+
+
+def z_ladder(s, c_list, r_list):
+    """Z(s) of a Cauer ladder by the nodal equations Y(s) V = [1, 0, ...]:
+    Cc_i from node i to ambient, Rc_i from node i to node i+1 (to ambient
+    for the last one)."""
+    stages = len(c_list)
+    Y = np.zeros((stages, stages), dtype=complex)
+    for i in range(stages):
+        g = 1 / r_list[i]
+        Y[i, i] += s * c_list[i] + g
+        if i + 1 < stages:
+            Y[i + 1, i + 1] += g
+            Y[i, i + 1] -= g
+            Y[i + 1, i] -= g
+    current = np.zeros(stages, dtype=complex)
+    current[0] = 1.0
+    return np.linalg.solve(Y, current)[0]
+
+
+def test_freq_grid():
+    freq = freq_grid(np.array(C_LIST) * np.array(R_LIST))
+    assert len(freq) == 200
+    # 1 / (2 pi 3 s) / 10 and 1 / (2 pi 5e-8 s) * 10, to powers of ten
+    assert freq[0] == pytest.approx(1e-3)
+    assert freq[-1] == pytest.approx(1e8)
+    assert np.allclose(freq_grid([1.0, 0.0], 3, 1.0, 100.0), [1, 10, 100])
+
+
+def test_z_cauer_equals_ladder_solution():
+    freq = freq_grid(np.array(C_LIST) * np.array(R_LIST), 60)
+    s_arr = 2j * np.pi * freq
+    Z = z_cauer(s_arr, C_LIST, R_LIST)
+    expected = [z_ladder(s, C_LIST, R_LIST) for s in s_arr]
+    assert np.allclose(Z, expected, rtol=1e-12, atol=0)
+    assert z_cauer([0.0], C_LIST, R_LIST)[0] == pytest.approx(sum(R_LIST))
+    assert np.allclose(network_impedance(freq, C_LIST, R_LIST, False), Z)
+
+
+def test_z_foster_equals_sum_of_stages():
+    freq = freq_grid(np.array(C_LIST) * np.array(R_LIST), 60)
+    s_arr = 2j * np.pi * freq
+    Z = network_impedance(freq, C_LIST, R_LIST)
+    expected = [sum(r / (1 + s * c * r) for c, r in zip(C_LIST, R_LIST))
+                for s in s_arr]
+    assert np.allclose(Z, expected, rtol=1e-14, atol=0)
+    assert z_foster([0.0], R_LIST, np.array(C_LIST) * R_LIST)[0] == \
+        pytest.approx(sum(R_LIST))
+
+
+def test_converted_networks_have_the_same_impedance():
+    CauerMat = foster_to_cauer(C_LIST, R_LIST, "numeric")
+    freq = freq_grid(CauerMat[:, 2], 100)
+    Z_foster = network_impedance(freq, C_LIST, R_LIST)
+    Z_cauer = network_impedance(freq, CauerMat[:, 0], CauerMat[:, 1], False)
+    assert impedance_error(Z_cauer, Z_foster) < 1e-10
+
+    magnitude, phase = bode(Z_foster)
+    assert np.all(np.diff(magnitude) < 0)
+    assert np.all((phase < 0) & (phase > -90))
+
+
+@pytest.mark.parametrize("foster", [True, False])
+def test_padded_stack_equals_single_networks(foster):
+    networks = [(C_LIST, R_LIST), (C_LIST[:2], R_LIST[:2]),
+                ([0.3], [2.0])]
+    c_stack, r_stack = stack_networks(networks)
+    freq = freq_grid(c_stack * r_stack, 40)
+    Z = network_impedance(freq, c_stack, r_stack, foster)
+    assert Z.shape == (3, 40)
+    for k, (c_list, r_list) in enumerate(networks):
+        assert np.allclose(Z[k], network_impedance(freq, c_list, r_list,
+                                                   foster), rtol=1e-14)
+    assert np.all(impedance_error(Z, Z) == 0)
+
+
+@pytest.mark.parametrize("extension", [".csv", ".npz"])
+def test_write_impedance(tmp_path, extension):
+    freq = np.array([1.0, 10.0])
+    Z = network_impedance(freq, [C_LIST, C_LIST], [R_LIST, R_LIST[::-1]])
+    output_file = str(tmp_path / ("z" + extension))
+    write_impedance(output_file, freq, Z, ["a", "b"])
+    if extension == ".npz":
+        with np.load(output_file) as data:
+            assert np.array_equal(data["Z"], Z)
+            assert list(data["names"]) == ["a", "b"]
+        return
+    with open(output_file) as fileobj:
+        rows = fileobj.read().split("\n")
+    assert rows[0] == "network,f,Re,Im,abs,phase_deg"
+    assert len(rows) == 1 + 4 + 1
+    name, f, re, im, magnitude, phase = rows[3].split(",")
+    assert (name, float(f)) == ("b", 1.0)
+    assert complex(float(re), float(im)) == pytest.approx(Z[1, 0],
+                                                          rel=1e-9)
+
+
+def test_impedance_script_compare(tmp_path, capsys):
+    foster_file = str(tmp_path / "foster.txt")
+    cauer_file = str(tmp_path / "cauer.txt")
+    other_file = str(tmp_path / "other.txt")
+    write_mycr(foster_file, C_LIST, R_LIST)
+    CauerMat = foster_to_cauer(C_LIST, R_LIST, "numeric")
+    write_mycr(cauer_file, CauerMat[:, 0], CauerMat[:, 1])
+    write_mycr(other_file, CauerMat[:, 0], CauerMat[:, 1] * 1.001)
+    output_file = str(tmp_path / "z.csv")
+
+    assert Impedance.main([foster_file, output_file, "--compare",
+                           cauer_file]) == 0
+    assert "max relative Z(jw) difference" in capsys.readouterr().out
+    assert Impedance.main([foster_file, output_file, "--compare",
+                           other_file]) == 1
+    assert "exceeds the tolerance" in capsys.readouterr().out
+    assert Impedance.main([cauer_file, output_file, "-c", "--compare",
+                           foster_file, "--points", "20"]) == 0
+    with open(output_file) as fileobj:
+        assert len(fileobj.read().split("\n")) == 1 + 20 + 1
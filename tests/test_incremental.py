@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from fostercauer import foster_to_cauer
+from fostercauer.incremental import IncrementalFosterToCauer
+
+
+C_LIST = [0.5, 2.0, 0.01, 30.0, 1.0, 0.2]
+R_LIST = [0.3, 0.1, 0.5, 0.2, 0.05, 1.0]
+
+
+def edit(converter, c_list, r_list):
+    # moves stages both up and down the tau order, then appends stages
+    # inside and at the end of it
+    for i, c, r in ((1, 0.02, 0.1), (2, 50.0, 0.4), (1, 3.0, 0.7),
+                    (5, 0.2, 1.0), (0, 0.001, 0.2)):
+        converter.set_stage(i, c, r)
+        c_list[i], r_list[i] = c, r
+    for c, r in ((0.7, 0.3), (500.0, 0.5), (1e-4, 0.01)):
+        converter.append_stage(c, r)
+        c_list.append(c)
+        r_list.append(r)
+
+
+@pytest.mark.parametrize("method", ["numeric", "symbolic"])
+def test_edits_match_fresh_conversion(method):
+    c_list, r_list = list(C_LIST), list(R_LIST)
+    converter = IncrementalFosterToCauer(c_list, r_list, method=method,
+                                         rational_rth=True)
+    edit(converter, c_list, r_list)
+    CauerMat = converter.result()
+    expected = foster_to_cauer(c_list, r_list, method, True)
+    assert np.max(np.abs(CauerMat[:, :2] - expected[:, :2]) /
+                  expected[:, :2]) < 1e-12
+
+
+def test_numeric_recomputes_from_the_tau_place():
+    converter = IncrementalFosterToCauer(C_LIST, R_LIST, method="numeric")
+    steps = converter.recursion_steps
+    # the largest tau stays the largest: one step
+    converter.set_stage(3, 31.0, 0.2)
+    assert converter.recursion_steps == steps + 1
+    converter.append_stage(1000.0, 0.5)
+    assert converter.recursion_steps == steps + 2
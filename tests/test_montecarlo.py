@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+import MonteCarlo
+from fostercauer import write_mycr
+from fostercauer.cauer2foster import cauer_to_foster_numeric
+from fostercauer.foster2cauer import foster_to_cauer_numeric
+from fostercauer.montecarlo import BATCH_CONVERTERS, monte_carlo, \
+    sample_network, zth_batch
+from fostercauer.zth import time_grid, zth_foster
+
+C_LIST = [1e-6, 1.1e-3, 0.5, 2.0]
+R_LIST = [0.05, 0.7, 4.0, 1.5]
+SINGLE_CONVERTERS = {"foster2cauer": foster_to_cauer_numeric,
+                     "cauer2foster": cauer_to_foster_numeric}
+
+
+@pytest.mark.parametrize("distribution", ["normal", "uniform", "lognormal"])
+def test_sample_network(distribution):
+    c_arr, r_arr = sample_network(C_LIST, R_LIST, 2000, 0.1, 0.02,
+                                  distribution, seed=5)
+    assert c_arr.shape == r_arr.shape == (2000, 4)
+    again = sample_network(C_LIST, R_LIST, 2000, 0.1, 0.02, distribution,
+                           seed=5)
+    assert np.array_equal(again[0], c_arr)
+    assert np.array_equal(again[1], r_arr)
+
+    c_ratio = c_arr / C_LIST
+    r_ratio = r_arr / R_LIST
+    assert np.allclose(np.median(c_ratio, axis=0), 1.0, atol=0.02)
+    if distribution == "uniform":
+        assert np.all(np.abs(c_ratio - 1) <= 0.1)
+        assert np.all(np.abs(r_ratio - 1) <= 0.02)
+    else:
+        assert np.allclose(np.std(np.log(c_ratio), axis=0), 0.1, rtol=0.1)
+    if distribution == "lognormal":
+        assert np.all(c_arr > 0)
+
+    with pytest.raises(ValueError, match="unknown distribution"):
+        sample_network(C_LIST, R_LIST, 10, distribution="triangular")
+
+
+@pytest.mark.parametrize("direction", ["foster2cauer", "cauer2foster"])
+def test_batch_engines_equal_single_engines(direction):
+    c_arr, r_arr = sample_network(C_LIST, R_LIST, 50, seed=6)
+    ResultMat = BATCH_CONVERTERS[direction](c_arr, r_arr)
+    assert ResultMat.shape == (50, 4, 3)
+    for k in range(50):
+        expected = SINGLE_CONVERTERS[direction](c_arr[k], r_arr[k])
+        assert np.allclose(ResultMat[k], expected, rtol=1e-10, atol=0)
+
+
+def test_zth_batch_equals_zth_foster():
+    c_arr, r_arr = sample_network(C_LIST, R_LIST, 20, seed=7)
+    tau_arr = c_arr * r_arr
+    tm = time_grid(C_LIST, 60, 1e-9)
+    zth = zth_batch(tm, r_arr, tau_arr)
+    assert zth.shape == (20, 60)
+    for k in range(20):
+        assert np.allclose(zth[k], zth_foster(tm, r_arr[k], tau_arr[k]),
+                           rtol=1e-13, atol=0)
+
+
+@pytest.mark.parametrize("direction", ["foster2cauer", "cauer2foster"])
+def test_monte_carlo_percentiles(direction):
+    percentiles = (10, 50, 90)
+    result = monte_carlo(C_LIST, R_LIST, direction, 300, seed=8,
+                         percentiles=percentiles, power=2.0, pulse=1e-2)
+    assert result["valid"] == 300
+
+    # the same samples converted one by one
+    c_arr, r_arr = sample_network(C_LIST, R_LIST, 300, seed=8)
+    results = np.array([SINGLE_CONVERTERS[direction](c, r)
+                        for c, r in zip(c_arr, r_arr)])
+    assert np.allclose(result["stages"],
+                       np.percentile(results, percentiles, axis=0),
+                       rtol=1e-10)
+    if direction == "foster2cauer":
+        r_foster, tau_foster = r_arr, c_arr * r_arr
+    else:
+        r_foster, tau_foster = results[:, :, 1], results[:, :, 2]
+    peak = [2.0 * zth_foster([1e-2], r, tau)[0]
+            for r, tau in zip(r_foster, tau_foster)]
+    assert np.allclose(result["peak"], np.percentile(peak, percentiles),
+                       rtol=1e-10)
+    zth = [zth_foster(result["tm"], r, tau)
+           for r, tau in zip(r_foster, tau_foster)]
+    assert np.allclose(result["zth"], np.percentile(zth, percentiles,
+                                                    axis=0), rtol=1e-10)
+
+
+def test_monte_carlo_without_tolerance():
+    result = monte_carlo(C_LIST, R_LIST, "foster2cauer", 10, 0.0, 0.0)
+    expected = foster_to_cauer_numeric(C_LIST, R_LIST)
+    for band in result["stages"]:
+        assert np.allclose(band, expected, rtol=1e-14)
+    assert np.allclose(result["peak"], sum(R_LIST))
+
+
+def test_monte_carlo_script(tmp_path, capsys):
+    input_file = str(tmp_path / "foster.txt")
+    write_mycr(input_file, C_LIST, R_LIST)
+    output_file = str(tmp_path / "bands.csv")
+    zth_file = str(tmp_path / "zth.csv")
+    assert MonteCarlo.main([input_file, output_file, "-N", "200",
+                            "--seed", "1", "-p", "5,95", "-z",
+                            zth_file]) == 0
+    out = capsys.readouterr().out
+    assert "samples = 200, converted = 200" in out
+    assert "peak temperature rise: p5 = " in out
+
+    with open(output_file) as fileobj:
+        rows = fileobj.read().split("\n")
+    assert rows[0] == "stage,quantity,p5,p95"
+    assert rows[1].startswith("1,C_cauer,")
+    assert rows[-2].startswith("4,Tau_cauer,")
+    assert len(rows) == 1 + 3 * 4 + 1            # the last row is empty
+    for row in rows[1:-1]:
+        low, high = (float(v) for v in row.split(",")[2:])
+        assert 0 < low <= high
+    with open(zth_file) as fileobj:
+        assert fileobj.readline() == "t,p5,p95\n"
@@ -0,0 +1,92 @@
+import io
+
+import numpy as np
+import pytest
+
+from fostercauer.mycr import format_mycr, iter_mycr, parse_mycr
+
+C_LIST = ["1.00E-06", "1.10E-03", "1.20E-00"]
+R_LIST = ["5.00E-02", "7.00E-01", "4.00E-00"]
+
+
+def many_networks(count):
+    """myCR text of count networks of 1, 2, 3... stages."""
+    text = ""
+    for k in range(count):
+        stages = k % 5 + 1
+        c_arr = np.arange(1, stages + 1) * 1e-3 * (k + 1)
+        r_arr = np.arange(stages, 0, -1) * 0.5
+        text += format_mycr(c_arr, r_arr, header=["# network %d" % k])
+    return text
+
+
+def test_parse_keeps_the_decimal_strings():
+    text = format_mycr(C_LIST, R_LIST, header=["# sample"])
+    c_arr, r_arr = parse_mycr(text)
+    assert list(c_arr) == C_LIST
+    assert list(r_arr) == R_LIST
+    c_arr, r_arr = parse_mycr(text, numeric=True)
+    assert c_arr.dtype == float
+    assert np.array_equal(r_arr, np.array(R_LIST, dtype=float))
+
+
+def test_inline_comments_of_data_rows():
+    text = "\n".join([
+        "STAGES=\t3",
+        "1 1.00E-06 5.00E-02 # junction",
+        "2\t1.10E-03\t7.00E-01#die attach",
+        "3 1.20E-00 4.00E-00 4.8 # tau ignored",
+        ""])
+    c_arr, r_arr = parse_mycr(text)
+    assert list(c_arr) == C_LIST
+    assert list(r_arr) == R_LIST
+
+
+@pytest.mark.parametrize("rows, line, message", [
+    (["1 1e-6 0.05", "2 1e-3 # 0.7", "3 1 4"], 3, "Cth and Rth"),
+    (["1 1e-6 0.05", "3 1e-3 0.7", "2 1 4"], 3, "invalid stage"),
+    (["1 1e-6 0.05", "2 -1e-3 0.7", "3 1 4"], 3, "invalid stage"),
+    (["1 1e-6 0.05", "2 1e-3 abc", "3 1 4"], 3, "invalid stage"),
+    (["1 1e-6 0.05", "2 1e-3 0.7"], 1, "# of rows"),
+    (["1 1e-6 0.05", "2 1e-3 0.7", "3 1 4", "4 1 1"], 1, "# of rows"),
+])
+def test_errors_report_the_line(rows, line, message):
+    text = "\n".join(["STAGES= 3"] + rows) + "\n"
+    with pytest.raises(ValueError) as info:
+        parse_mycr(text)
+    assert ("line %d:" % line) in str(info.value)
+    assert message in str(info.value)
+
+
+def test_errors_before_stages():
+    with pytest.raises(ValueError, match="line 3: STAGES is not found"):
+        parse_mycr("# header\n\n  1 1e-6 0.05\n")
+    with pytest.raises(ValueError, match="line 2: invalid STAGES"):
+        parse_mycr("# header\nSTAGES=\n1 1e-6 0.05\n")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000])
+def test_chunk_boundaries(chunk_size):
+    text = many_networks(12)
+    whole = list(iter_mycr(io.StringIO(text)))
+    chunked = list(iter_mycr(io.StringIO(text), chunk_size=chunk_size))
+    assert len(whole) == 12
+    assert len(chunked) == 12
+    for (c_arr, r_arr, comments), (c_chunk, r_chunk, comments_chunk) in \
+            zip(whole, chunked):
+        assert list(c_chunk) == list(c_arr)
+        assert list(r_chunk) == list(r_arr)
+        assert comments_chunk == comments
+    assert whole[4][2][0] == "# network 4"
+    assert len(whole[4][0]) == 5
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 33])
+def test_chunked_errors_report_the_line(chunk_size):
+    text = many_networks(4)
+    lines = text.split("\n")
+    bad = len(lines) - 3                 # a row of the last network
+    lines[bad - 1] = lines[bad - 1].replace("\t", "\tx", 1)
+    with pytest.raises(ValueError, match="line %d: invalid" % bad):
+        list(iter_mycr(io.StringIO("\n".join(lines)),
+                       chunk_size=chunk_size))
@@ -0,0 +1,47 @@
+import numpy as np
+
+from fostercauer.foster2cauer import foster_to_cauer_numeric
+from fostercauer.precision import cauer_to_foster_adaptive, \
+    foster_to_cauer_adaptive, foster_to_cauer_mpmath, stage_error
+
+
+def clustered_foster():
+    """Foster network of nearly repeated time constants, whose float
+    conversion is wrong at the 1e-8 level in both directions although
+    its Z(s) is right to about 1e-15."""
+    tau = [1e-3, 1.0, 1.0 + 1e-7, 1.0 + 2e-7, 10.0]
+    r_list = [0.1, 0.2, 0.3, 0.2, 0.5]
+    return [repr(t / r) for t, r in zip(tau, r_list)], \
+        [repr(r) for r in r_list]
+
+
+def test_adaptive_keeps_float_when_accurate():
+    c_list = ["1.00E-06", "1.10E-03", "1.20E-00"]
+    r_list = ["5.00E-02", "7.00E-01", "4.00E-00"]
+    CauerMat, dps, error = foster_to_cauer_adaptive(c_list, r_list)
+    assert dps is None and error <= 1e-9
+
+
+def test_foster_to_cauer_adaptive_escalates():
+    c_list, r_list = clustered_foster()
+    reference = foster_to_cauer_mpmath(c_list, r_list, 60)
+    assert stage_error(foster_to_cauer_numeric(c_list, r_list),
+                       reference) > 1e-9
+
+    CauerMat, dps, error = foster_to_cauer_adaptive(c_list, r_list)
+    assert dps is not None and error <= 1e-9
+    assert stage_error(CauerMat, reference) <= 1e-9
+
+
+def test_cauer_to_foster_adaptive_escalates():
+    c_list, r_list = clustered_foster()
+    CauerMat = foster_to_cauer_mpmath(c_list, r_list, 60)
+    c_cauer = [repr(float(c)) for c in CauerMat[:, 0]]
+    r_cauer = [repr(float(r)) for r in CauerMat[:, 1]]
+
+    FosterMat, dps, error = cauer_to_foster_adaptive(c_cauer, r_cauer)
+    assert dps is not None and error <= 1e-9
+    order = np.argsort(np.array(c_list, dtype=float) *
+                       np.array(r_list, dtype=float))
+    c_arr = np.array(c_list, dtype=float)[order]
+    assert np.max(np.abs(FosterMat[:, 0] - c_arr) / c_arr) < 1e-6
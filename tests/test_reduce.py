@@ -0,0 +1,63 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import ReduceNetwork
+from fostercauer import write_mycr
+from fostercauer.fit import fit_foster
+from fostercauer.reduce import reduce_foster, reduction_error
+from fostercauer.zth import zth_foster
+
+
+def network(stages):
+    rng = np.random.default_rng(0)
+    tau_arr = np.logspace(-6, 3, stages) * rng.uniform(0.8, 1.25, stages)
+    r_arr = rng.uniform(0.05, 1.0, stages)
+    return tau_arr / r_arr, r_arr
+
+
+@pytest.mark.parametrize("tolerance", [1e-2, 1e-3, 3e-4])
+def test_fewest_stages_within_tolerance(tolerance):
+    c_arr, r_arr = network(40)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        FosterMat, error = reduce_foster(c_arr, r_arr, tolerance=tolerance)
+    assert error <= tolerance
+    assert np.isclose(np.sum(FosterMat[:, 1]), np.sum(r_arr))
+
+    # one stage less misses the tolerance
+    tau_arr = c_arr * r_arr
+    tm = np.logspace(np.log10(np.min(tau_arr) / 10),
+                     np.log10(np.max(tau_arr) * 10), 400)
+    fewer = fit_foster(tm, zth_foster(tm, r_arr, tau_arr),
+                       FosterMat.shape[0] - 1, tm[0], tm[-1],
+                       r_total=np.sum(r_arr))
+    assert reduction_error(tm, r_arr, tau_arr, fewer) > tolerance
+
+
+def test_unreachable_tolerance_warns():
+    c_arr, r_arr = network(40)
+    with pytest.warns(UserWarning, match="did not reach the tolerance"):
+        FosterMat, error = reduce_foster(c_arr, r_arr, tolerance=1e-12)
+    assert error > 1e-12
+    assert FosterMat.shape[0] <= 40
+
+
+def test_given_stages():
+    c_arr, r_arr = network(40)
+    FosterMat, error = reduce_foster(c_arr, r_arr, stages=5)
+    assert FosterMat.shape[0] == 5
+    assert error > 0
+
+
+def test_script_exit_status(tmp_path):
+    c_arr, r_arr = network(40)
+    input_file = str(tmp_path / "foster.txt")
+    output_file = str(tmp_path / "reduced.txt")
+    write_mycr(input_file, c_arr, r_arr)
+    assert ReduceNetwork.main([input_file, output_file, "-t", "1e-2"]) == 0
+    with pytest.warns(UserWarning):
+        assert ReduceNetwork.main([input_file, output_file,
+                                   "-t", "1e-12"]) == 1
+    assert ReduceNetwork.main([input_file, output_file, "-N", "2"]) == 1
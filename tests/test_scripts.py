@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import Cauer2Foster
+import Foster2Cauer
+from fostercauer import foster_to_cauer, read_mycr, write_mycr
+
+
+C_LIST = [1e-6, 1.1e-3, 0.5]
+R_LIST = [0.05, 0.7, 4.0]
+
+
+@pytest.mark.parametrize("flags", [[], ["-n"], ["-a"], ["-e"], ["-x"]])
+def test_foster2cauer_script(tmp_path, capsys, flags):
+    input_file = str(tmp_path / "foster.txt")
+    output_file = str(tmp_path / "cauer.txt")
+    write_mycr(input_file, C_LIST, R_LIST)
+    assert Foster2Cauer.main([input_file, output_file] + flags) == 0
+    c_c, r_c = read_mycr(output_file)
+    expected = foster_to_cauer(C_LIST, R_LIST, "numeric")
+    assert np.allclose(c_c.astype(float), expected[:, 0], rtol=1e-12)
+    assert np.allclose(r_c.astype(float), expected[:, 1], rtol=1e-12)
+    if "-a" in flags:
+        assert "digits = float" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("flags", [[], ["-n"], ["-a"]])
+def test_round_trip_scripts(tmp_path, flags):
+    input_file = str(tmp_path / "foster.txt")
+    write_mycr(input_file, C_LIST, R_LIST)
+    cauer_file = str(tmp_path / "cauer.txt")
+    foster_file = str(tmp_path / "foster_out.txt")
+    assert Foster2Cauer.main([input_file, cauer_file, "-n"]) == 0
+    assert Cauer2Foster.main([cauer_file, foster_file] + flags) == 0
+    c_f, r_f = read_mycr(foster_file)
+    assert np.allclose(c_f.astype(float), C_LIST, rtol=1e-9)
+    assert np.allclose(r_f.astype(float), R_LIST, rtol=1e-9)
+
+
+def test_cauer2foster_has_no_exact_flag(tmp_path):
+    with pytest.raises(SystemExit):
+        Cauer2Foster.main([str(tmp_path / "a.txt"), str(tmp_path / "b.txt"),
+                           "-e"])
+
+
+def test_cache_is_opt_in(tmp_path, capsys, monkeypatch):
+    monkeypatch.setenv("FOSTERCAUER_CACHE_DIR", str(tmp_path / "default"))
+    input_file = str(tmp_path / "foster.txt")
+    output_file = str(tmp_path / "cauer.txt")
+    write_mycr(input_file, C_LIST, R_LIST)
+
+    assert Foster2Cauer.main([input_file, output_file, "-n"]) == 0
+    assert "cache" not in capsys.readouterr().out
+    assert not (tmp_path / "default").exists()
+
+    cache_dir = str(tmp_path / "cache")
+    for status in ("miss", "hit"):
+        assert Foster2Cauer.main([input_file, output_file, "-n",
+                                  "--cache", cache_dir]) == 0
+        assert "cache " + status in capsys.readouterr().out
+    # without DIR, the default directory
+    assert Foster2Cauer.main([input_file, output_file, "-n", "--cache"]) \
+        == 0
+    assert "cache miss" in capsys.readouterr().out
+    assert (tmp_path / "default").exists()
+
+
+def test_adaptive_reports_with_cache(tmp_path, capsys):
+    input_file = str(tmp_path / "foster.txt")
+    output_file = str(tmp_path / "cauer.txt")
+    write_mycr(input_file, C_LIST, R_LIST)
+    for _ in range(2):
+        assert Foster2Cauer.main([input_file, output_file, "-a", "--cache",
+                                  str(tmp_path / "cache")]) == 0
+        assert "digits = float" in capsys.readouterr().out
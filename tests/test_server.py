@@ -0,0 +1,157 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from fostercauer.server import ConversionPool, Session, check_request
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ConversionPool(workers=1)
+    yield pool
+    pool.close()
+
+
+def run_session(pool, lines):
+    replies = list()
+    session = Session(pool, lambda line: replies.append(json.loads(line)))
+    for line in lines:
+        session.handle(line)
+    session.wait()
+    return {reply["id"]: reply for reply in replies}
+
+
+@pytest.mark.parametrize("request_", [
+    {"direction": "foster2cauer", "c": 5, "r": [1]},
+    {"direction": "foster2cauer", "c": [1, 2], "r": [1]},
+    {"direction": "foster2cauer", "c": [1, "x"], "r": [1, 2]},
+    {"direction": "foster2cauer", "c": [1], "r": [1], "method": "bogus"},
+    {"direction": "cauer2foster", "c": [1], "r": [1], "method": "exact"},
+    {"direction": "foster2cauer", "c": [1], "r": [1], "timeout": "abc"},
+    {"direction": "foster2cauer", "c": [1], "r": [1], "timeout": 0},
+])
+def test_invalid_requests(request_):
+    assert check_request(request_) is not None
+
+
+def test_bad_lines_are_replied(pool):
+    replies = run_session(pool, [
+        '{"id": 1, "direction": "foster2cauer", "c": 5, "r": [1]}',
+        '{"id": 2, "direction": "foster2cauer", "c": [1, 2], ' +
+        '"r": [1, 0.25], "timeout": "abc"}',
+        '[1, 2]',
+        '{"id": 3, "direction": "foster2cauer", "c": [1, 2], ' +
+        '"r": [1, 0.25]}'])
+    assert replies[1]["ok"] is False and replies[2]["ok"] is False
+    assert replies[None]["error"] == "invalid JSON"
+    assert replies[3]["ok"] is True and len(replies[3]["result"]) == 2
+
+
+def test_cancel_finished_job(pool):
+    replies = list()
+    session = Session(pool, lambda line: replies.append(json.loads(line)))
+    session.handle('{"id": 1, "direction": "foster2cauer", "c": [1, 2], ' +
+                   '"r": [1, 0.25]}')
+    job = session.jobs[1]
+    session.wait()
+    assert pool.cancel(job) is False
+
+
+def test_slot_survives_errors(pool, monkeypatch):
+    calls = list()
+    original = ConversionPool._run
+
+    def broken(self, job, process, conn):
+        if not calls:
+            calls.append(job)
+            raise RuntimeError("broken worker")
+        return original(self, job, process, conn)
+
+    monkeypatch.setattr(ConversionPool, "_run", broken)
+    replies = run_session(pool, [
+        '{"id": %d, "direction": "foster2cauer", "c": [1, 2], ' % i +
+        '"r": [1, 0.25]}' for i in (1, 2)])
+    assert replies[1]["error"] == "broken worker"
+    assert replies[2]["ok"] is True
+    assert all(thread.is_alive() for thread in pool._threads)
+
+
+# symbolic Cauer to Foster with rational_rth takes minutes
+SLOW = '"direction": "cauer2foster", "method": "symbolic", ' + \
+    '"rational_rth": true, "c": [1, 2, 3, 4], "r": [1, 0.5, 0.3, 0.2]'
+QUICK = '"direction": "foster2cauer", "c": [1, 2], "r": [1, 0.25]'
+
+
+def test_timeout_of_running_job(pool):
+    replies = run_session(pool, ['{"id": 1, "timeout": 0.5, %s}' % SLOW,
+                                 '{"id": 2, %s}' % QUICK])
+    assert replies[1]["ok"] is False and replies[1]["error"] == "timeout"
+    assert replies[2]["ok"] is True
+
+
+def test_cancel_running_job(pool):
+    replies = list()
+    session = Session(pool, lambda line: replies.append(json.loads(line)))
+    session.handle('{"id": 1, %s}' % SLOW)
+    while pool.busy == 0:
+        time.sleep(0.01)
+    session.handle('{"id": 2, "op": "cancel", "target": 1}')
+    session.handle('{"id": 3, %s}' % QUICK)
+    session.wait()
+    replies = {reply["id"]: reply for reply in replies}
+    assert replies[1]["error"] == "cancelled"
+    assert replies[2]["ok"] is True
+    assert replies[3]["ok"] is True
+
+
+def test_missing_and_duplicate_ids(pool):
+    replies = list()
+    session = Session(pool, lambda line: replies.append(json.loads(line)))
+    session.handle('{%s}' % QUICK)
+    session.handle('{"id": 1, "timeout": 5, %s}' % SLOW)
+    session.handle('{"id": 1, %s}' % QUICK)
+    session.handle('{"id": 2, "op": "cancel", "target": 1}')
+    session.wait()
+    assert replies[0] == {"id": None, "ok": False,
+                          "error": "convert needs an id"}
+    assert replies[1] == {"id": 1, "ok": False, "error": "duplicate id: 1"}
+    by_id = {reply["id"]: reply for reply in replies[2:]}
+    assert by_id[1]["error"] == "cancelled"
+    assert by_id[2]["ok"] is True
+    # the id is free again once replied
+    assert run_session(pool, ['{"id": 1, %s}' % QUICK])[1]["ok"] is True
+
+
+def test_server_script_over_stdin():
+    script = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), "ConversionServer.py")
+    # the timeout replaces a worker while stdin is being read
+    requests = ['{"id": 0, "timeout": 0.3, %s}' % SLOW] + \
+        ['{"id": %d, %s}' % (i, QUICK) for i in (1, 2, 3)]
+    # stdin is kept open until the replies are read, as a client does
+    process = subprocess.Popen([sys.executable, script, "-j", "2"],
+                               stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, text=True)
+    lines = queue.Queue()
+    threading.Thread(target=lambda: [lines.put(line)
+                                     for line in process.stdout],
+                     daemon=True).start()
+    try:
+        process.stdin.write("\n".join(requests) + "\n")
+        process.stdin.flush()
+        replies = [json.loads(lines.get(timeout=30)) for _ in requests]
+        process.stdin.write('{"id": 4, "op": "shutdown"}\n')
+        process.stdin.flush()
+        assert json.loads(lines.get(timeout=30))["ok"] is True
+        assert process.wait(30) == 0
+    finally:
+        process.kill()
+    replies = {reply["id"]: reply for reply in replies}
+    assert replies[0]["error"] == "timeout"
+    assert all(replies[i]["ok"] for i in (1, 2, 3))
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+import Spice2myCRformat
+from fostercauer.spice import SPICE_DIALECTS, format_spice_value, \
+    format_subckt, iter_subckts
+
+C_LIST = ["1.00E-06", "2.2e6", "0.5", "3.3e-4"]
+R_LIST = ["5.00E-02", "1e3", "12345.0", "47"]
+
+
+@pytest.mark.parametrize("value, text", [
+    ("1.00E-06", "1u"), (0.0011, "1.1m"), (2.5e7, "25meg"), ("1000", "1k"),
+    ("1.234560e-03", "1.23456m"), (999.9, "999.9"), ("0", "0"),
+    (1e-20, "1e-20")])
+def test_format_spice_value(value, text):
+    assert format_spice_value(value) == text
+
+
+@pytest.mark.parametrize("dialect", sorted(SPICE_DIALECTS))
+@pytest.mark.parametrize("foster", [False, True])
+def test_dialects_parse_back(dialect, foster):
+    text = format_subckt("TH", C_LIST, R_LIST, foster, dialect)
+    networks = list(iter_subckts(text.split("\n")))
+    assert len(networks) == 1
+    name, topology, c_arr, r_arr, _ = networks[0]
+    assert name == "TH"
+    assert topology == ("foster" if foster else "cauer")
+    assert np.allclose(c_arr, np.array(C_LIST, dtype=float), rtol=1e-15)
+    assert np.allclose(r_arr, np.array(R_LIST, dtype=float), rtol=1e-15)
+
+
+def test_dialect_differences():
+    lines = {dialect: format_subckt("TH", C_LIST, R_LIST, False,
+                                    dialect).split("\n")
+             for dialect in SPICE_DIALECTS}
+    assert lines["spice"][2] == "R1 1 2 5.00E-02"
+    assert lines["ngspice"][2] == "R1 1 2 50m $ tau1 = 5e-08 s"
+    assert lines["ltspice"][3] == "C2 2 0 2.2Meg"
+    assert lines["pspice"][3] == "C2 2 0 2.2MEG"
+    assert lines["spice"][-2] == ".ENDS TH"
+    assert lines["pspice"][-2] == ".ENDS"
+
+
+def test_inline_comments_of_continuation_rows():
+    text = "\n".join([
+        "* thermal model",
+        ".SUBCKT TH 1 ; Junction",
+        "+ 3 $ ambient",
+        "C1 1 0 ; first stage",
+        "* comment inside a continued line",
+        "+ 1u ; 1 uF",
+        "",
+        "R1 1 2 10m",
+        "C2 2 0 2.2Meg ; ignored 3.3",
+        "; a comment row",
+        "R2 2",
+        "+ 3 ; to ambient",
+        "+ 0.5",
+        ".ENDS TH"])
+    (name, topology, c_arr, r_arr, comment_list), = \
+        iter_subckts(text.split("\n"))
+    assert (name, topology) == ("TH", "cauer")
+    assert np.allclose(c_arr, [1e-6, 2.2e6])
+    assert np.allclose(r_arr, [10e-3, 0.5])
+    assert comment_list == ["* thermal model",
+                            "* comment inside a continued line"]
+
+
+@pytest.mark.parametrize("text, status", [
+    (format_subckt("TH", C_LIST, R_LIST), 0),
+    ("* no network\nR1 1 2 1k\n", 1),
+    (".SUBCKT\nR1 1 2 1k\n.ENDS\n", 1)])
+def test_script_exit_status(tmp_path, text, status):
+    input_file = tmp_path / "model.lib"
+    input_file.write_text(text)
+    assert Spice2myCRformat.main([str(input_file),
+                                  str(tmp_path / "out.txt")]) == status
+    assert Spice2myCRformat.main([str(input_file), "-l"]) == \
+        (1 if text.startswith(".SUBCKT\n") else 0)
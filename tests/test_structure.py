@@ -0,0 +1,124 @@
+import csv
+
+import numpy as np
+import pytest
+
+import StructureFunction
+from fostercauer import write_mycr
+from fostercauer.structure import _interp_rows, cumulative_structure, \
+    differential_structure, resample_structure, stack_networks, \
+    structure_functions, write_structure
+
+
+def cauer_networks(count):
+    """count Cauer networks of 3, 4, 5... stages."""
+    rng = np.random.default_rng(3)
+    return [(rng.uniform(1e-4, 1.0, k + 3) * 10.0 ** np.arange(k + 3),
+             rng.uniform(0.05, 1.0, k + 3)) for k in range(count)]
+
+
+def interp_loop(x_grid, xp, fp):
+    """np.interp() of each row, NaN out of the range of the row."""
+    result = np.full((xp.shape[0], len(x_grid)), np.nan)
+    for i in range(xp.shape[0]):
+        inside = (x_grid >= xp[i, 0]) & (x_grid <= xp[i, -1])
+        result[i, inside] = np.interp(x_grid[inside], xp[i], fp[i])
+    return result
+
+
+def test_interp_rows_equals_np_interp():
+    rng = np.random.default_rng(4)
+    xp = np.cumsum(rng.uniform(0.1, 1.0, (6, 9)), axis=1) + \
+        rng.uniform(-3.0, 3.0, (6, 1))
+    fp = np.cumsum(rng.uniform(0.0, 1.0, (6, 9)), axis=1)
+    x_grid = np.linspace(np.min(xp) - 1, np.max(xp) + 1, 301)
+    x_grid = np.sort(np.concatenate([x_grid, xp[:, 0], xp[:, -1], xp[2]]))
+    result = _interp_rows(x_grid, xp, fp)
+    expected = interp_loop(x_grid, xp, fp)
+    assert np.array_equal(np.isnan(result), np.isnan(expected))
+    assert np.allclose(result, expected, rtol=1e-13, atol=1e-13,
+                       equal_nan=True)
+
+
+def test_cumulative_structure():
+    c_stack, r_stack = stack_networks(cauer_networks(3))
+    r_sum, c_sum = cumulative_structure(c_stack, r_stack)
+    for i, (c_arr, r_arr) in enumerate(cauer_networks(3)):
+        assert np.array_equal(r_sum[i, :len(r_arr)], np.cumsum(r_arr))
+        assert np.array_equal(c_sum[i, :len(c_arr)], np.cumsum(c_arr))
+        # the padding stages keep the sums
+        assert np.all(r_sum[i, len(r_arr):] == r_sum[i, len(r_arr) - 1])
+    r_one, c_one = cumulative_structure(*cauer_networks(1)[0])
+    assert r_one.ndim == 1
+
+
+def test_stack_equals_single_networks():
+    networks = cauer_networks(4)
+    c_stack, r_stack = stack_networks(networks)
+    assert c_stack.shape == (4, 6)
+    r_sum, c_sum = cumulative_structure(c_stack, r_stack)
+    c_grid, r_grid, k_grid = resample_structure(r_sum, c_sum, 150)
+    for i, (c_arr, r_arr) in enumerate(networks):
+        r_one, c_one = cumulative_structure(c_arr, r_arr)
+        grid, r_row, k_row = resample_structure(r_one, c_one, 150,
+                                                c_grid[0], c_grid[-1])
+        assert np.array_equal(grid, c_grid)
+        assert np.allclose(r_grid[i], r_row[0], equal_nan=True)
+        # the range of the network is taken in log Cth, as the grid
+        x_grid, xp = np.log10(c_grid), np.log10(c_one)
+        expected = np.interp(x_grid, xp, r_one)
+        inside = (x_grid >= xp[0]) & (x_grid <= xp[-1])
+        assert np.allclose(r_grid[i, inside], expected[inside])
+        assert np.all(np.isnan(r_grid[i, ~inside]))
+
+
+def test_differential_structure():
+    c_grid = np.logspace(-3, 2, 50)
+    r_grid = np.vstack([2.0 * c_grid, 0.5 * c_grid])
+    assert np.allclose(differential_structure(c_grid, r_grid),
+                       [[0.5], [2.0]])
+    flat = differential_structure(c_grid, np.ones(50))
+    assert np.all(np.isnan(flat) | np.isinf(flat))
+
+
+@pytest.mark.parametrize("extension", [".csv", ".npz"])
+def test_write_structure(tmp_path, extension):
+    c_stack, r_stack = stack_networks(cauer_networks(2))
+    result = structure_functions(c_stack, r_stack, 40)
+    output_file = str(tmp_path / ("structure" + extension))
+    write_structure(output_file, result, ["a", "b"])
+
+    if extension == ".npz":
+        with np.load(output_file) as data:
+            assert list(data["names"]) == ["a", "b"]
+            for key, value in result.items():
+                assert np.array_equal(data[key], value, equal_nan=True)
+        return
+
+    with open(output_file, newline="") as fileobj:
+        rows = list(csv.reader(fileobj))
+    assert rows[0] == ["network", "Rth_sum", "Cth_sum", "K"]
+    valid = ~np.isnan(result["r_grid"])
+    assert len(rows) - 1 == np.count_nonzero(valid)
+    b_rows = [row for row in rows[1:] if row[0] == "b"]
+    assert [float(row[1]) for row in b_rows] == \
+        list(result["r_grid"][1, valid[1]])
+    assert [float(row[2]) for row in b_rows] == \
+        list(result["c_grid"][valid[1]])
+
+
+def test_structure_script_batch(tmp_path, capsys):
+    networks = cauer_networks(3)
+    for k, (c_arr, r_arr) in enumerate(networks):
+        write_mycr(str(tmp_path / ("net%d.txt" % k)), c_arr, r_arr)
+    output_file = str(tmp_path / "structure.npz")
+    assert StructureFunction.main(["-b", str(tmp_path / "net*.txt"),
+                                   output_file, "--points", "30"]) == 0
+    assert "networks = 3" in capsys.readouterr().out
+    with np.load(output_file) as data:
+        assert list(data["names"]) == ["net0.txt", "net1.txt", "net2.txt"]
+        assert data["r_grid"].shape == (3, 30)
+        assert np.allclose(data["r_sum"][2], np.cumsum(networks[2][1]))
+
+    assert StructureFunction.main(["-b", str(tmp_path / "none*.txt"),
+                                   output_file]) == 1
@@ -0,0 +1,151 @@
+import math
+
+import numpy as np
+import pytest
+
+import Transient
+from fostercauer import write_mycr
+from fostercauer.transient import ConvolutionSimulator, FosterSimulator, \
+    iter_power_profile, linear_recurrence, simulate
+from fostercauer.zth import zth_foster
+
+R_LIST = [0.05, 0.7, 4.0]
+TAU_LIST = [5e-5, 7.7e-3, 0.2]
+
+
+def recurrence_loop(a, u, x0):
+    x = np.zeros(a.shape)
+    for i in range(a.shape[0]):
+        value = x0[i]
+        for k in range(a.shape[1]):
+            value = a[i, k] * value + u[i, k]
+            x[i, k] = value
+    return x
+
+
+def simulate_loop(tm, power, r_list, tau_list):
+    """Temperature rise of a Foster network, one sample and stage at a
+    time, the power of a sample held until the next one."""
+    state = [0.0] * len(r_list)
+    rise = list()
+    for k in range(len(tm)):
+        if k > 0:
+            dt = tm[k] - tm[k-1]
+            for i, (r, tau) in enumerate(zip(r_list, tau_list)):
+                decay = math.exp(-dt / tau)
+                state[i] = state[i] * decay + r * power[k-1] * (1 - decay)
+        rise.append(sum(state))
+    return np.array(rise)
+
+
+def pulse_profile(samples, dt=None, seed=9):
+    rng = np.random.default_rng(seed)
+    if dt is None:
+        tm = np.cumsum(rng.uniform(1e-5, 2e-3, samples))
+    else:
+        tm = np.arange(samples) * dt
+    power = np.where(rng.uniform(size=samples) < 0.3, 0.0,
+                     rng.uniform(1.0, 20.0, samples))
+    return tm, power
+
+
+@pytest.mark.parametrize("n", [1, 5, 32, 33, 1000, 1500])
+def test_linear_recurrence_equals_loop(n):
+    rng = np.random.default_rng(n)
+    a = rng.uniform(0.0, 1.0, (3, n))
+    u = rng.normal(size=(3, n))
+    x0 = rng.normal(size=3)
+    assert np.allclose(linear_recurrence(a, u, x0), recurrence_loop(a, u, x0),
+                       rtol=1e-12, atol=1e-12)
+
+
+def test_step_response_is_zth():
+    tm = np.logspace(-6, 1, 300)
+    tm = np.concatenate([[0.0], tm])
+    rise = FosterSimulator(R_LIST, TAU_LIST).feed(tm, np.full(len(tm), 2.0))
+    assert rise[0] == 0.0
+    assert np.allclose(rise, 2.0 * zth_foster(tm, R_LIST, TAU_LIST),
+                       rtol=1e-12, atol=1e-15)
+
+
+def test_foster_simulator_equals_loop_in_chunks():
+    tm, power = pulse_profile(2000)
+    expected = simulate_loop(tm, power, R_LIST, TAU_LIST)
+    assert np.allclose(FosterSimulator(R_LIST, TAU_LIST).feed(tm, power),
+                       expected, rtol=1e-11, atol=1e-12)
+
+    simulator = FosterSimulator(R_LIST, TAU_LIST)
+    bounds = [0, 1, 7, 500, 501, 1999, 2000]
+    rise = np.concatenate([simulator.feed(tm[start:stop], power[start:stop])
+                           for start, stop in zip(bounds[:-1], bounds[1:])])
+    assert np.allclose(rise, expected, rtol=1e-11, atol=1e-12)
+    assert len(simulator.feed([], [])) == 0
+
+
+@pytest.mark.parametrize("chunk", [100, 777, 5000])
+def test_convolution_equals_loop(chunk):
+    dt = 1e-3
+    tm, power = pulse_profile(5000, dt)
+    expected = simulate_loop(tm, power, R_LIST, TAU_LIST)
+    simulator = ConvolutionSimulator(R_LIST, TAU_LIST, dt)
+    rise = np.concatenate([simulator.feed(tm[k:k+chunk], power[k:k+chunk])
+                           for k in range(0, len(tm), chunk)])
+    assert np.allclose(rise, expected, rtol=0, atol=1e-10 * np.max(expected))
+
+    with pytest.raises(ValueError, match="too long"):
+        ConvolutionSimulator(R_LIST, TAU_LIST, dt, max_length=100)
+
+
+def test_iter_power_profile(tmp_path):
+    tm, power = pulse_profile(25, 0.5)
+    csv_file = tmp_path / "profile.csv"
+    csv_file.write_text("# profile\nt,P\n" + "".join(
+        "%r;%r\n" % (float(t), float(p)) for t, p in zip(tm, power)))
+    chunks = list(iter_power_profile(str(csv_file), chunk_size=10))
+    assert [len(chunk[0]) for chunk in chunks] == [8, 10, 7]
+    assert np.array_equal(np.concatenate([c[0] for c in chunks]), tm)
+    assert np.array_equal(np.concatenate([c[1] for c in chunks]), power)
+
+    npy_file = str(tmp_path / "power.npy")
+    np.save(npy_file, power)
+    chunks = list(iter_power_profile(npy_file, chunk_size=10, dt=0.5))
+    assert np.array_equal(np.concatenate([c[0] for c in chunks]), tm)
+    assert np.array_equal(np.concatenate([c[1] for c in chunks]), power)
+
+    csv_file.write_text("0,1\n1\n")
+    with pytest.raises(ValueError, match="2 columns"):
+        list(iter_power_profile(str(csv_file)))
+
+
+def test_simulate_adds_ambient():
+    tm, power = pulse_profile(100)
+    result = list(simulate([(tm[:40], power[:40]), (tm[40:], power[40:])],
+                           FosterSimulator(R_LIST, TAU_LIST), 25.0))
+    Tj = np.concatenate([chunk[1] for chunk in result])
+    assert np.allclose(Tj - 25.0, simulate_loop(tm, power, R_LIST, TAU_LIST),
+                       rtol=1e-11, atol=1e-12)
+
+
+@pytest.mark.parametrize("flags", [[], ["--convolution"]])
+def test_transient_script(tmp_path, capsys, flags):
+    network_file = str(tmp_path / "foster.txt")
+    write_mycr(network_file, np.array(TAU_LIST) / R_LIST, R_LIST)
+    tm, power = pulse_profile(1000, 1e-3)
+    profile_file = str(tmp_path / "power.npy")
+    np.save(profile_file, power)
+    output_file = str(tmp_path / "tj.csv")
+    assert Transient.main([network_file, profile_file, output_file,
+                           "--dt", "1e-3", "--chunk", "300", "--every", "7"]
+                          + flags) == 0
+    assert "samples = 1000" in capsys.readouterr().out
+
+    data = np.loadtxt(output_file, delimiter=",", skiprows=1)
+    assert np.allclose(data[:, 0], tm[::7])
+    expected = 25.0 + simulate_loop(tm, power, R_LIST, TAU_LIST)
+    assert np.allclose(data[:, 1], expected[::7], rtol=1e-8)
+
+
+def test_convolution_needs_dt(tmp_path, capsys):
+    assert Transient.main(["a.txt", "b.csv", str(tmp_path / "c.csv"),
+                           "--convolution"]) == 1
+    assert "needs --dt" in capsys.readouterr().out
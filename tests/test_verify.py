@@ -0,0 +1,101 @@
+import pytest
+
+import Cauer2Foster
+import Foster2Cauer
+from fostercauer import convert, foster_to_cauer, write_mycr
+from fostercauer.cauer2foster import cauer_to_foster_numeric
+from fostercauer.verify import VERIFY_FIELDS, format_verify, rsum_check, \
+    verify_conversion, verify_ok
+
+C_LIST = [1e-6, 1.1e-3, 0.5, 2.0]
+R_LIST = [0.05, 0.7, 4.0, 1.5]
+
+
+def perturbed(ResultMat, factor):
+    """ResultMat with Cth of the 2nd stage scaled, the Rth sum kept."""
+    ResultMat = ResultMat.copy()
+    ResultMat[1, 0] *= factor
+    ResultMat[1, 2] = ResultMat[1, 0] * ResultMat[1, 1]
+    return ResultMat
+
+
+def test_rsum_check():
+    assert rsum_check(["1", "2"], [2.0, 1.0 + 1e-9]) == (3.0, 3.0 + 1e-9,
+                                                         True)
+    assert rsum_check([1, 2], [3.1])[2] is False
+    assert rsum_check([1, 2], [3.1], epsilon=0.2)[2] is True
+
+
+@pytest.mark.parametrize("direction", ["foster2cauer", "cauer2foster"])
+def test_exact_conversion_passes(direction):
+    if direction == "foster2cauer":
+        ResultMat = foster_to_cauer(C_LIST, R_LIST, "numeric")
+    else:
+        ResultMat = cauer_to_foster_numeric(C_LIST, R_LIST)
+    report = verify_conversion(C_LIST, R_LIST, ResultMat, direction)
+    assert sorted(report) == sorted(VERIFY_FIELDS)
+    assert report["stage_rel"] is None
+    assert report["zth_rel"] < 1e-10 and report["zjw_rel"] < 1e-10
+    assert report["zth_abs"] <= sum(R_LIST) * report["zth_rel"]
+    assert verify_ok(report, 1e-6)
+
+    report = verify_conversion(C_LIST, R_LIST, ResultMat, direction,
+                               round_trip=True)
+    assert report["stage_rel"] < 1e-10
+    assert verify_ok(report, 1e-6)
+    assert "round trip stage error" in format_verify(report)
+
+
+@pytest.mark.parametrize("direction", ["foster2cauer", "cauer2foster"])
+@pytest.mark.parametrize("factor, ok", [(1 + 1e-9, True),
+                                        (1 + 1e-4, False)])
+def test_perturbed_conversion_at_the_tolerance(direction, factor, ok):
+    if direction == "foster2cauer":
+        ResultMat = foster_to_cauer(C_LIST, R_LIST, "numeric")
+    else:
+        ResultMat = cauer_to_foster_numeric(C_LIST, R_LIST)
+    report = verify_conversion(C_LIST, R_LIST, perturbed(ResultMat, factor),
+                               direction, round_trip=True)
+    assert verify_ok(report, 1e-6) is ok
+    # a relative change of Cth shows up in Z(jw) at the same order
+    assert 1e-3 * (factor - 1) < report["zjw_rel"] < 10 * (factor - 1)
+    assert verify_ok(report, 1.0)
+
+
+def test_verify_ok_skips_missing_errors():
+    report = dict.fromkeys(VERIFY_FIELDS, 0.0)
+    report["stage_rel"] = None
+    report["zth_abs"] = 1.0              # absolute errors are not checked
+    assert verify_ok(report, 1e-6)
+    report["zjw_rel"] = 2e-6
+    assert not verify_ok(report, 1e-6)
+    assert verify_ok(report, 2e-6)
+
+
+@pytest.mark.parametrize("script, direction", [
+    (Foster2Cauer, "foster2cauer"), (Cauer2Foster, "cauer2foster")])
+@pytest.mark.parametrize("factor, status", [(1 + 1e-9, 0),
+                                            (1 + 1e-4, 1)])
+def test_script_exit_status(tmp_path, capsys, monkeypatch, script,
+                            direction, factor, status):
+    input_file = str(tmp_path / "input.txt")
+    output_file = str(tmp_path / "output.txt")
+    write_mycr(input_file, C_LIST, R_LIST)
+
+    # an engine off by factor in one Cth
+    converter, title, first_stage, labels = convert.DIRECTIONS[direction]
+
+    def inaccurate(*args, **kwargs):
+        return perturbed(converter(*args, **kwargs), factor)
+
+    monkeypatch.setitem(convert.DIRECTIONS, direction,
+                        (inaccurate, title, first_stage, labels))
+    assert script.main([input_file, output_file, "-n"]) == status
+    out = capsys.readouterr().out
+    assert "Zth error = " in out
+    assert ("verification error exceeds 1e-06" in out) is bool(status)
+
+    # no check, no error
+    assert script.main([input_file, output_file, "-n",
+                        "--no_verify"]) == 0
+    assert "Zth error = " not in capsys.readouterr().out
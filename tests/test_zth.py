@@ -0,0 +1,81 @@
+import argparse
+import math
+import os
+
+import numpy as np
+import pytest
+
+from fostercauer.zth import add_graph_arguments, draw_zth, plot_zth, \
+    time_grid, zth_foster
+
+R_LIST = [0.05, 0.7, 4.0, 1.5]
+TAU_LIST = [5e-8, 7.7e-4, 4.8, 120.0]
+
+
+def zth_loop(tm, r_list, tau_list):
+    """Zth(t) of a Foster network, one time point and stage at a time."""
+    Zth = list()
+    for t in tm:
+        total = 0.0
+        for r, tau in zip(r_list, tau_list):
+            total -= r * math.expm1(-t / tau)
+        Zth.append(total)
+    return np.array(Zth)
+
+
+def test_time_grid():
+    tm = time_grid(TAU_LIST)
+    assert len(tm) == 50
+    assert tm[0] == pytest.approx(1e-6)
+    assert tm[-1] == pytest.approx(1e4)          # 120 s * 10, rounded up
+    assert np.allclose(np.diff(np.log10(tm)), 10.0 / 49)
+    tm = time_grid(TAU_LIST, 5, 1e-3, 10.0)
+    assert np.allclose(tm, [1e-3, 1e-2, 1e-1, 1.0, 10.0])
+
+
+def test_zth_foster_equals_scalar_loop():
+    tm = time_grid(TAU_LIST, 200, 1e-9)
+    Zth = zth_foster(tm, R_LIST, TAU_LIST)
+    assert Zth.shape == tm.shape
+    assert np.allclose(Zth, zth_loop(tm, R_LIST, TAU_LIST), rtol=1e-12,
+                       atol=0)
+
+    Zth_all, Zth_each = zth_foster(tm, R_LIST, TAU_LIST, each=True)
+    assert np.array_equal(Zth_all, Zth)
+    assert Zth_each.shape == (len(R_LIST), len(tm))
+    for j, (r, tau) in enumerate(zip(R_LIST, TAU_LIST)):
+        assert np.allclose(Zth_each[j], zth_loop(tm, [r], [tau]),
+                           rtol=1e-12, atol=0)
+    assert np.allclose(Zth_each.sum(axis=0), Zth, rtol=1e-15)
+
+
+def test_zth_foster_limits():
+    # expm1 keeps the relative accuracy at short times, where
+    # 1 - exp(-t/tau) loses the digits
+    tm = np.array([1e-15, 1e-12])
+    assert np.allclose(zth_foster(tm, [2.0], [1.0]), 2.0 * tm, rtol=1e-12)
+    assert zth_foster([1e6], R_LIST, TAU_LIST)[0] == \
+        pytest.approx(sum(R_LIST), rel=1e-15)
+    assert zth_foster([0.0], R_LIST, TAU_LIST)[0] == 0.0
+
+
+def graph_args(argv):
+    parser = argparse.ArgumentParser()
+    add_graph_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def test_draw_zth_is_off_by_default():
+    args = graph_args([])
+    assert (args.points, args.t_min, args.t_max) == (50, 1e-6, None)
+    assert draw_zth(args, R_LIST, TAU_LIST, "unused_") == []
+
+
+def test_plot_zth_saves_both_scales(tmp_path):
+    pytest.importorskip("matplotlib")
+    tm = time_grid(TAU_LIST, 20)
+    Zth, Zth_each = zth_foster(tm, R_LIST, TAU_LIST, each=True)
+    prefix = str(tmp_path / "Zth_")
+    saved = plot_zth(tm, Zth, Zth_each, prefix, stamp="test")
+    assert saved == [prefix + "test_semilog.png", prefix + "test_loglog.png"]
+    assert all(os.path.getsize(filename) > 0 for filename in saved)